@@ -1,9 +1,160 @@
+import sys
 import asyncio
-from src.ETL.ETL_main import YouTubeTranscriptWriter, BlogTranscriptWriter
+import argparse
+import uvicorn
+from src.ETL.ETL_main import (
+    ETLOrchestrator,
+    BlogTranscriptWriter,
+    JobProducer,
+    QueueWorker,
+)
+from src.Agent.Agent_main import IndexBuilder, ContextReport, default_index_manager
+from src.Agent.Agent_config import IndexConfig
+from src.Benchmark.Benchmark_main import LoadTester, GatewayCheck, RetrievalBenchmark
+from src.Benchmark.Benchmark_config import LoadTestConfig, RetrievalBenchConfig
+from src.API.API_config import ServerConfig
+from src.Entity.config_entity import ProfileConfig
+from src.Utils.profile_utils import StageProfiler, run_profiled
+from src.Logging.logger import log_flk
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="JAP chatbot data pipeline")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="write per stage cpu profiles, flamegraph stacks and a hotspot summary",
+    )
+    parser.add_argument("--top", type=int, default=15, help="hotspots per stage")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser(
+        "etl",
+        help="scrape every source concurrently, dedup, publish the index (default)",
+    )
+    reextract = commands.add_parser(
+        "reextract", help="re-apply the blog css schema to the raw html archive"
+    )
+    reextract.add_argument(
+        "--workers", type=int, default=None, help="extraction processes"
+    )
+    enqueue = commands.add_parser(
+        "enqueue", help="queue the missing transcripts as jobs in mongodb"
+    )
+    enqueue.add_argument("--sources", nargs="+", default=["youtube", "blog"])
+    enqueue.add_argument(
+        "--requeue-failed", action="store_true", help="retry failed jobs as well"
+    )
+    worker = commands.add_parser(
+        "worker", help="drain the mongodb job queue, run any number of these"
+    )
+    worker.add_argument("--sources", nargs="+", default=["youtube", "blog"])
+    worker.add_argument("--threads", type=int, default=4, help="youtube claim loops")
+    worker.add_argument(
+        "--forever", action="store_true", help="keep polling once the queue is empty"
+    )
+    index = commands.add_parser(
+        "index", help="publish new transcripts as a retrieval index segment"
+    )
+    index.add_argument(
+        "--full", action="store_true", help="rebuild one compacted segment"
+    )
+    commands.add_parser(
+        "context-report",
+        help="prompt tokens / prefix cache hits of the assembled prompts vs a naive layout",
+    )
+    serve = commands.add_parser("serve", help="run the chat API")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--workers", type=int, default=1)
+    loadtest = commands.add_parser(
+        "loadtest", help="load test the chat API, exits 1 when an SLO is missed"
+    )
+    loadtest.add_argument("--users", type=int, default=20)
+    loadtest.add_argument("--duration", type=float, default=60.0, help="seconds")
+    loadtest.add_argument("--workers", type=int, default=1, help="local server workers")
+    loadtest.add_argument("--url", default=None, help="test a running server instead")
+    commands.add_parser(
+        "gateway-check", help="llm gateway coalescing / caching / tools vs the stub"
+    )
+    bench = commands.add_parser(
+        "retrieval-bench",
+        help="recall@k / mrr / latency / memory of retrieval variants on the golden set",
+    )
+    bench.add_argument("--golden", default=None, help="golden set json file")
+    bench.add_argument(
+        "--variants", nargs="+", default=None, help="subset of the configured variants"
+    )
+    bench.add_argument(
+        "--repeats", type=int, default=5, help="timed searches per query"
+    )
+    return parser.parse_args()
 
-if __name__ == "__main__":
-    # get youtube transcripts
-    YouTubeTranscriptWriter().run()
 
-    # get blog transcripts
-    asyncio.run(BlogTranscriptWriter().run())
+def main(args: argparse.Namespace) -> None:
+    if args.command == "reextract":
+        # offline, no browser / network needed
+        BlogTranscriptWriter().reextract(max_workers=args.workers)
+    elif args.command == "enqueue":
+        asyncio.run(
+            run_profiled(
+                JobProducer().run(
+                    sources=args.sources, requeue_failed=args.requeue_failed
+                )
+            )
+        )
+    elif args.command == "worker":
+        worker = QueueWorker(
+            sources=args.sources, threads=args.threads, forever=args.forever
+        )
+        asyncio.run(run_profiled(worker.run()))
+    elif args.command == "index":
+        IndexBuilder().run(full=args.full)
+    elif args.command == "context-report":
+        ContextReport().run()
+    elif args.command == "serve":
+        config = ServerConfig(host=args.host, port=args.port, workers=args.workers)
+        if config.workers > 1:
+            log_flk.info(
+                f"API: {config.workers} workers keep their own conversations, "
+                "route each session to one worker (sticky load balancer)"
+            )
+            # read the published index into the page cache once, so the workers
+            # only map already resident pages instead of racing for the disk
+            default_index_manager(IndexConfig())
+        uvicorn.run(
+            config.app, host=config.host, port=config.port, workers=config.workers
+        )
+    elif args.command == "loadtest":
+        tester = LoadTester(
+            load_config=LoadTestConfig(
+                users=args.users, duration_s=args.duration, url=args.url
+            ),
+            workers=args.workers,
+        )
+        sys.exit(0 if tester.run()["passed"] else 1)
+    elif args.command == "gateway-check":
+        GatewayCheck().run()
+    elif args.command == "retrieval-bench":
+        report = RetrievalBenchmark(
+            bench_config=RetrievalBenchConfig(
+                golden_path=args.golden, repeats=args.repeats
+            ),
+            variants=args.variants,
+        ).run()
+        sys.exit(0 if report["passed"] else 1)
+    else:
+        # get youtube / blog / skool transcripts concurrently, then dedup them
+        try:
+            asyncio.run(run_profiled(ETLOrchestrator().run()))
+        finally:
+            # serve whatever the sources did fetch, even when one of them failed
+            IndexBuilder().run()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.profile:
+        with StageProfiler(ProfileConfig(top_n=args.top)):
+            main(args)
+    else:
+        main(args)
@@ -0,0 +1,18 @@
+class ServerConfig:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: int = 1,
+        app: str = "src.API.API_main:app",
+    ) -> None:
+        self.host = host
+        self.port = port
+        # uvicorn worker processes. Conversations live in the worker that
+        # served them and uvicorn does not route by session, so with more than
+        # one worker put a load balancer with session affinity in front (or
+        # keep each client on one keep-alive connection), otherwise follow up
+        # turns that land on another worker start without their history
+        self.workers = workers
+        # import string, `src.API.API_stub:app` serves the stub llm backend
+        self.app = app
@@ -0,0 +1,98 @@
+import os
+import time
+import asyncio
+import resource
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+
+from src.Agent.Agent_main import ChatAgent
+from src.Entity.api_entity import ChatRequest, ChatResponse
+
+from src.Logging.logger import log_flk
+from src.Exception.exception import LogException
+
+
+def _memory_mb() -> dict:
+    """rss / pss / uss of this process. The mapped index pages count as
+    shared, `uss_mb` is what the worker costs on its own (linux only)."""
+    # linux reports ru_maxrss in KiB
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    memory = {"peak_rss_mb": round(peak_rss / 1024, 1)}
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        return memory
+    kib = {}
+    with open("/proc/self/smaps_rollup", "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                kib[parts[0].rstrip(":")] = int(parts[1])
+    private = kib.get("Private_Clean", 0) + kib.get("Private_Dirty", 0)
+    shared = kib.get("Shared_Clean", 0) + kib.get("Shared_Dirty", 0)
+    memory.update(
+        rss_mb=round(kib.get("Rss", 0) / 1024, 1),
+        pss_mb=round(kib.get("Pss", 0) / 1024, 1),
+        uss_mb=round(private / 1024, 1),
+        shared_mb=round(shared / 1024, 1),
+    )
+    return memory
+
+
+def create_app() -> FastAPI:
+    """Chat API, every uvicorn worker builds its own app (and `ChatAgent`)."""
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        log_flk.info(f"API: Worker {os.getpid()} loading the transcript index")
+        start = time.perf_counter()
+        # maps the published segments and faults their pages in, uvicorn only
+        # accepts connections once this returns
+        app.state.agent = ChatAgent()
+        app.state.ready_ms = round((time.perf_counter() - start) * 1e3, 1)
+        with app.state.agent.index_manager.acquire() as index:
+            log_flk.info(
+                f"API: Worker {os.getpid()} ready in {app.state.ready_ms}ms "
+                f"(index version {index.version}, {index.nbytes / 2**20:.1f} MiB mapped)"
+            )
+        # pick up index versions the etl publishes, no restart needed
+        watcher = asyncio.create_task(app.state.agent.index_manager.watch())
+        yield
+        watcher.cancel()
+
+    app = FastAPI(title="JAP chatbot", lifespan=lifespan)
+
+    @app.get("/health")
+    async def health() -> dict:
+        with app.state.agent.index_manager.acquire() as index:
+            return {
+                "status": "ok",
+                "version": index.version,
+                "chunks": len(index),
+                "ready_ms": app.state.ready_ms,
+            }
+
+    @app.get("/metrics")
+    async def metrics() -> dict:
+        return {"pid": os.getpid(), "ready_ms": app.state.ready_ms, **_memory_mb()}
+
+    # plain def: fastapi runs it in its thread pool, the blocking search and
+    # generation never stall /health, /metrics or the streams on this worker
+    @app.post("/chat", response_model=ChatResponse)
+    def chat(request: ChatRequest) -> dict:
+        try:
+            return app.state.agent.answer(request.session_id, request.question)
+        except Exception as e:
+            LogException(e, "API", log_flk)
+            raise HTTPException(status_code=500, detail="Failed to answer")
+
+    @app.post("/chat/stream")
+    async def chat_stream(request: ChatRequest) -> StreamingResponse:
+        return StreamingResponse(
+            app.state.agent.stream(request.session_id, request.question),
+            media_type="text/plain",
+        )
+
+    return app
+
+
+app = create_app()
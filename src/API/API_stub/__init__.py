@@ -0,0 +1,86 @@
+import json
+import asyncio
+from fastapi import FastAPI, Request
+
+from src.Agent.Agent_utils import StandInLLM
+
+# share of the stand-in's simulated latency actually slept, keeps checks quick
+LATENCY_SCALE = 0.25
+
+
+def create_stub_app() -> FastAPI:
+    """Openai compatible `/v1/chat/completions` stub backed by the stand-in model.
+
+    With `tools` in the request and a user message last, it asks for every
+    tool at once (parallel tool calls) with the question as `query`.
+    Otherwise it answers from the first tool result, or the stand-in's
+    extractive answer, after sleeping out the simulated prefill and decode.
+    """
+    app = FastAPI(title="stub llm")
+    app.state.llm = StandInLLM()
+    app.state.requests = 0
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"status": "ok"}
+
+    @app.get("/stats")
+    async def stats() -> dict:
+        return {"requests": app.state.requests, "hit_rate": app.state.llm.hit_rate}
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request) -> dict:
+        app.state.requests += 1
+        body = await request.json()
+        messages = body["messages"]
+        reply = app.state.llm.generate(messages, body.get("max_tokens"))
+
+        if body.get("tools") and messages[-1]["role"] == "user":
+            await asyncio.sleep(reply["ttft_ms"] * LATENCY_SCALE / 1000)
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": f"call_{i}",
+                        "type": "function",
+                        "function": {
+                            "name": tool["function"]["name"],
+                            "arguments": json.dumps({"query": messages[-1]["content"]}),
+                        },
+                    }
+                    for i, tool in enumerate(body["tools"])
+                ],
+            }
+            finish_reason = "tool_calls"
+        else:
+            await asyncio.sleep(reply["latency_ms"] * LATENCY_SCALE / 1000)
+            text = reply["text"]
+            tool_results = [m for m in messages if m["role"] == "tool"]
+            for result in tool_results:
+                passages = json.loads(result["content"])
+                if passages and isinstance(passages, list):
+                    words = passages[0]["text"].split()
+                    text = " ".join(words[: reply["completion_tokens"]]) + " [1]"
+                    break
+            message = {"role": "assistant", "content": text}
+            finish_reason = "stop"
+
+        return {
+            "id": f"stub-{app.state.requests}",
+            "object": "chat.completion",
+            "model": body.get("model", "stand-in"),
+            "choices": [
+                {"index": 0, "message": message, "finish_reason": finish_reason}
+            ],
+            "usage": {
+                "prompt_tokens": reply["prompt_tokens"],
+                "completion_tokens": reply["completion_tokens"],
+                "prompt_tokens_details": {"cached_tokens": reply["cached_tokens"]},
+            },
+        }
+
+    return app
+
+
+app = create_stub_app()
@@ -0,0 +1,112 @@
+import os
+from dotenv import load_dotenv
+
+from src.Agent.Agent_constants import AgentData
+
+
+class IndexConfig:
+    def __init__(
+        self,
+        chunk_words: int = 180,
+        overlap_words: int = 30,
+        dense_dim: int = 256,
+        bm25_k1: float = 1.2,
+        bm25_b: float = 0.75,
+        lexical_weight: float = 1.0,
+        dense_weight: float = 0.5,
+        rrf_k: int = 60,
+        candidates: int = 100,
+        max_segments: int = 8,
+        gc_grace_s: float = 3600.0,
+        poll_interval_s: float = 5.0,
+    ) -> None:
+        if overlap_words >= chunk_words:
+            raise ValueError(
+                f"overlap_words ({overlap_words}) must be below chunk_words ({chunk_words})"
+            )
+        # word windows, consecutive chunks of an episode share `overlap_words`
+        self.chunk_words = chunk_words
+        self.overlap_words = overlap_words
+        # hashed bag of words vectors, stand-in until a sentence encoder is wired in
+        self.dense_dim = dense_dim
+        self.bm25_k1 = bm25_k1
+        self.bm25_b = bm25_b
+        # weighted reciprocal rank fusion: w / (rrf_k + rank) summed over both rankings
+        self.lexical_weight = lexical_weight
+        self.dense_weight = dense_weight
+        self.rrf_k = rrf_k
+        # best chunks taken from each ranking before fusing
+        self.candidates = candidates
+        self.source_dirs = AgentData.SOURCE_DIRS
+        self.source_names = AgentData.SOURCE_NAMES
+        self.segment_dir = AgentData.SEGMENT_DIR
+        self.manifest_path = AgentData.MANIFEST_PATH
+        # publishing over this many segments rebuilds one compacted segment
+        self.max_segments = max_segments
+        # unpublished segments are deleted only after this long, servers that
+        # have not polled the new manifest yet may still open them
+        self.gc_grace_s = gc_grace_s
+        # how often serving processes look for a new manifest
+        self.poll_interval_s = poll_interval_s
+
+
+class ContextConfig:
+    def __init__(
+        self,
+        top_k: int = 12,
+        context_budget: int = 1200,
+        history_budget: int = 1500,
+        history_keep: float = 0.5,
+    ) -> None:
+        # chunks retrieved per question, the assembler packs what fits
+        self.top_k = top_k
+        # tokens for the numbered context passages of the current turn
+        self.context_budget = context_budget
+        # tokens for earlier question / answer turns. Once over budget the oldest
+        # turns are dropped down to `history_keep` of it in one go, so the
+        # history prefix stays identical (cacheable) for the next few turns
+        self.history_budget = history_budget
+        self.history_keep = history_keep
+
+
+class StandInConfig:
+    def __init__(
+        self,
+        block_size: int = 16,
+        cache_blocks: int = 8192,
+        prefill_ms_per_token: float = 0.2,
+        decode_ms_per_token: float = 20.0,
+        max_tokens: int = 120,
+    ) -> None:
+        # prefix cache granularity (tokens), like vllm / sglang kv blocks
+        self.block_size = block_size
+        # lru capacity of the prefix cache in blocks
+        self.cache_blocks = cache_blocks
+        # simulated cost, only uncached prompt tokens pay prefill
+        self.prefill_ms_per_token = prefill_ms_per_token
+        self.decode_ms_per_token = decode_ms_per_token
+        self.max_tokens = max_tokens
+
+
+class GatewayConfig:
+    def __init__(
+        self,
+        base_url: str = "http://127.0.0.1:8001/v1",
+        model: str = "stand-in",
+        max_connections: int = 32,
+        max_concurrency: int = 8,
+        cache_size: int = 1024,
+        timeout_s: float = 60.0,
+    ) -> None:
+        # any openai compatible `/chat/completions` backend (vllm, sglang, the stub)
+        self.base_url = base_url
+        self.model = model
+        load_dotenv("src/Secrets/Secrets.env")
+        self.api_key = os.getenv("LLM_API_KEY", "")
+        # pooled keep-alive connections to the backend
+        self.max_connections = max_connections
+        # llm requests in flight at once, the rest wait in the gateway
+        self.max_concurrency = max_concurrency
+        # lru entries for temperature 0 completions
+        self.cache_size = cache_size
+        self.timeout_s = timeout_s
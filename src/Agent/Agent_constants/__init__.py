@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+
+from src.ETL.ETL_constants import DedupData
+
+
+@dataclass
+class AgentData:
+    # immutable segments (one `.npy` file per array plus `meta.json`, see
+    # `TranscriptIndex`) and the manifest naming the live ones
+    SEGMENT_DIR = "src/Data/3_Index/segments"
+    MANIFEST_PATH = "src/Data/3_Index/manifest.json"
+    REPORT_DIR = "src/Data/4_Reports"
+    # transcript folders indexed for retrieval, youtube (`JAPRAGYouTube`) then blog
+    SOURCE_DIRS = DedupData.SOURCE_DIRS
+    SOURCE_NAMES = ["youtube", "blog"]
+
+
+@dataclass
+class PromptData:
+    # both are sent first and never change, so the backend can reuse their kv cache
+    SYSTEM_PROMPT = (
+        "You are an assistant specialised in Jungian Analytical Psychology (JAP) "
+        "as taught by CS Joseph. Answer only from the numbered context passages, "
+        "cite them as [n], and say so when the context does not cover the question."
+    )
+    CORPUS_PREAMBLE = (
+        "The context passages are excerpts of CS Joseph's YouTube video transcripts "
+        "and blog articles on the 16 types, cognitive functions, the four sides of "
+        "the mind, interaction styles, temples and type development. Transcripts are "
+        "auto generated, expect missing punctuation and misheard type codes."
+    )
+    CONTEXT_HEADER = "Context:"
+    QUESTION_HEADER = "Question:"
+
+
+@dataclass
+class LexicalData:
+    STOPWORDS = {
+        "a", "an", "and", "are", "as", "at", "be", "but", "by", "do", "does",
+        "for", "from", "how", "i", "if", "in", "into", "is", "it", "its", "me",
+        "my", "of", "on", "or", "so", "that", "the", "their", "them", "then",
+        "there", "these", "they", "this", "to", "um", "uh", "was", "what",
+        "when", "where", "which", "who", "why", "will", "with", "you", "your",
+    }  # fmt: skip
+
+
+@dataclass
+class SampleSessions:
+    # realistic multi turn conversations, follow ups lean on the previous turn
+    SESSIONS = [
+        [
+            "What is the difference between Ni and Ne?",
+            "How does that show up in an INFJ compared to an INTJ?",
+            "What is the INFJ's biggest blind spot?",
+            "How can they develop their inferior function?",
+        ],
+        [
+            "What are the four sides of the mind?",
+            "What is the subconscious side of an ESTP?",
+            "How does the unconscious side affect relationships?",
+        ],
+        [
+            "Explain the interaction styles.",
+            "Which types are in the get things going quadrant?",
+            "Why do ENFPs and INTJs get along?",
+            "What does CS Joseph say about the golden pair?",
+            "Is the golden pair always the best relationship?",
+        ],
+        [
+            "What is Ti hero?",
+            "How does Fe inferior show up under stress?",
+            "What is the ISTP's demon function?",
+        ],
+    ]
+    # one off questions, most users ask a single thing and leave
+    SINGLE_QUESTIONS = [
+        "What is Se inferior?",
+        "Are INFJs rare?",
+        "What is the ENTP's parent function?",
+        "How do I find my type?",
+        "What is the difference between Fi and Fe?",
+        "What does the crossroads mean for an ISFJ?",
+        "Which type is the hardest to read?",
+        "What is the mirror type of an INTP?",
+    ]
@@ -0,0 +1,305 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from typing import AsyncIterator, Dict, List, Tuple
+
+from src.Agent.Agent_utils import (
+    IndexManager,
+    publish_index,
+    load_corpus,
+    AssembledPrompt,
+    ContextAssembler,
+    Conversation,
+    StandInLLM,
+    LLMGateway,
+    ToolRegistry,
+)
+from src.Agent.Agent_constants import AgentData, SampleSessions
+from src.Agent.Agent_config import (
+    IndexConfig,
+    ContextConfig,
+    StandInConfig,
+    GatewayConfig,
+)
+
+from src.Logging.logger import log_agt
+from src.Exception.exception import CustomException, LogException
+
+
+class IndexBuilder:
+    """Publish the new and changed (non duplicate) transcripts as a new index
+    segment and retire the removed ones, serving processes swap the new
+    version in on their next manifest poll."""
+
+    def __init__(self, index_config: IndexConfig = IndexConfig()) -> None:
+        self.index_config = index_config
+
+    def run(self, full: bool = False) -> dict:
+        try:
+            documents = load_corpus(index_config=self.index_config)
+            log_agt.info(
+                f"Index: {'Rebuilding' if full else 'Updating'} index over "
+                f"{len(documents):04d} transcripts"
+            )
+            return publish_index(documents, index_config=self.index_config, full=full)
+
+        except Exception as e:
+            LogException(e, "Index", log_agt)
+            raise CustomException(e)
+
+
+def default_index_manager(index_config: IndexConfig) -> IndexManager:
+    manager = IndexManager(index_config=index_config)
+    manager.refresh()
+    return manager
+
+
+class ChatAgent:
+    """Retrieve, assemble a budgeted prompt and answer, one conversation per session."""
+
+    def __init__(
+        self,
+        index_manager: IndexManager | None = None,
+        index_config: IndexConfig = IndexConfig(),
+        context_config: ContextConfig = ContextConfig(),
+        llm: StandInLLM | None = None,
+    ) -> None:
+        # queries pin one index version, new versions are swapped in underneath
+        self.index_manager = index_manager or default_index_manager(index_config)
+        self.context_config = context_config
+        self.assembler = ContextAssembler(context_config=context_config)
+        self.llm = llm or StandInLLM()
+        self.conversations: Dict[str, Conversation] = {}
+        # sync requests run on the api threadpool: one turn per session at a time
+        self._locks: Dict[str, threading.Lock] = {}
+        self._sessions_lock = threading.Lock()
+
+    def _session(self, session_id: str) -> Tuple[Conversation, threading.Lock]:
+        with self._sessions_lock:
+            conversation = self.conversations.setdefault(session_id, Conversation())
+            return conversation, self._locks.setdefault(session_id, threading.Lock())
+
+    def _prepare(self, question: str, conversation: Conversation) -> AssembledPrompt:
+        with self.index_manager.acquire() as index:
+            chunks = index.search(question, k=self.context_config.top_k)
+        return self.assembler.assemble(question, chunks, conversation)
+
+    def respond(self, session_id: str, question: str) -> Tuple[AssembledPrompt, dict]:
+        try:
+            conversation, lock = self._session(session_id)
+            with lock:
+                prompt = self._prepare(question, conversation)
+                reply = self.llm.generate(prompt.messages)
+                conversation.add_turn(question, reply["text"], prompt.context)
+            return prompt, reply
+
+        except Exception as e:
+            LogException(e, "Agent", log_agt)
+            raise CustomException(e)
+
+    async def stream(self, session_id: str, question: str) -> AsyncIterator[str]:
+        """Answer text as it is generated, the turn is recorded once it is complete."""
+        conversation, lock = self._session(session_id)
+        # poll instead of blocking the event loop, and nothing is left
+        # holding the lock when the client goes away while waiting
+        while not lock.acquire(blocking=False):
+            await asyncio.sleep(0.01)
+        try:
+            # search and packing are blocking numpy work, keep them off the event loop
+            prompt = await asyncio.to_thread(self._prepare, question, conversation)
+            pieces = []
+            async for piece in self.llm.stream(prompt.messages):
+                pieces.append(piece)
+                yield piece
+            conversation.add_turn(question, "".join(pieces), prompt.context)
+        finally:
+            lock.release()
+
+    def answer(self, session_id: str, question: str) -> dict:
+        prompt, reply = self.respond(session_id, question)
+        return {
+            "answer": reply["text"],
+            "sources": [
+                {
+                    "title": c.title,
+                    "url": c.url,
+                    "source": c.source,
+                    "start_s": c.start_s,
+                    "link": c.link,
+                }
+                for c in prompt.chunks
+            ],
+            "usage": {
+                "prompt_tokens": reply["prompt_tokens"],
+                "cached_tokens": reply["cached_tokens"],
+                "completion_tokens": reply["completion_tokens"],
+            },
+        }
+
+
+class ToolAgent:
+    """Agentic turn over the llm gateway.
+
+    The model can search the youtube (`JAPRAGYouTube`) and blog
+    (`JAPRAGBlog`) corpora. All tool calls of one model message run
+    concurrently, the turn ends on the first message without tool calls or
+    after `max_steps` model calls.
+    """
+
+    SEARCH_PARAMETERS = {
+        "type": "object",
+        "properties": {"query": {"type": "string"}},
+        "required": ["query"],
+    }
+
+    def __init__(
+        self,
+        gateway: LLMGateway | None = None,
+        index_manager: IndexManager | None = None,
+        index_config: IndexConfig = IndexConfig(),
+        context_config: ContextConfig = ContextConfig(),
+        max_steps: int = 3,
+    ) -> None:
+        self.gateway = gateway or LLMGateway(GatewayConfig())
+        self.index_manager = index_manager or default_index_manager(index_config)
+        self.context_config = context_config
+        self.assembler = ContextAssembler(context_config=context_config)
+        self.max_steps = max_steps
+        self.registry = ToolRegistry()
+        for source, corpus in (
+            ("youtube", "video transcripts"),
+            ("blog", "blog articles"),
+        ):
+            self.registry.register(
+                name=f"search_{source}",
+                description=f"Search CS Joseph's {corpus} for passages about the query.",
+                parameters=self.SEARCH_PARAMETERS,
+                func=lambda query, source=source: self._search(query, source),
+            )
+
+    def _search(self, query: str, source: str) -> List[dict]:
+        with self.index_manager.acquire() as index:
+            chunks = index.search(query, k=self.context_config.top_k, source=source)
+        return [
+            {
+                "title": c.title,
+                "url": c.link,
+                "source": c.source,
+                "text": c.text,
+            }
+            for c in self.assembler.pack(chunks)
+        ]
+
+    async def run_turn(self, question: str, history: List[dict] | None = None) -> dict:
+        try:
+            start = time.perf_counter()
+            messages = [self.assembler.system_message, *(history or [])]
+            messages.append({"role": "user", "content": question})
+            steps = []
+            for step in range(self.max_steps):
+                # the last step must answer, no more tools offered
+                tools = self.registry.specs if step < self.max_steps - 1 else None
+                reply = await self.gateway.complete(messages, tools=tools)
+                calls = reply["message"].get("tool_calls") or []
+                record = {"llm": reply["timing"], "tools": {}}
+                steps.append(record)
+                if not calls:
+                    break
+
+                messages.append(reply["message"])
+                tool_start = time.perf_counter()
+                results = await self.registry.run_calls(calls)
+                record["tools"] = {
+                    r["name"]: round(r["elapsed_ms"], 1) for r in results
+                }
+                record["tools_wall_ms"] = round(
+                    (time.perf_counter() - tool_start) * 1e3, 1
+                )
+                messages.extend(
+                    {
+                        "role": "tool",
+                        "tool_call_id": r["tool_call_id"],
+                        "content": r["content"],
+                    }
+                    for r in results
+                )
+
+            return {
+                "answer": reply["message"].get("content") or "",
+                "steps": steps,
+                "total_ms": round((time.perf_counter() - start) * 1e3, 1),
+            }
+
+        except Exception as e:
+            LogException(e, "Agent", log_agt)
+            raise CustomException(e)
+
+
+class ContextReport:
+    """Replay the sample sessions and compare the assembled prompts with the
+    naive layout on two stand-in models: prompt tokens and prefix cache hits."""
+
+    def __init__(
+        self,
+        context_config: ContextConfig = ContextConfig(),
+        standin_config: StandInConfig = StandInConfig(),
+        report_path: str = os.path.join(AgentData.REPORT_DIR, "context_report.json"),
+    ) -> None:
+        self.context_config = context_config
+        self.standin_config = standin_config
+        self.report_path = report_path
+
+    def run(self) -> dict:
+        try:
+            agent = ChatAgent(
+                context_config=self.context_config,
+                llm=StandInLLM(self.standin_config),
+            )
+            naive_llm = StandInLLM(self.standin_config)
+            turns = []
+            for session_id, questions in enumerate(SampleSessions.SESSIONS):
+                for turn, question in enumerate(questions, start=1):
+                    prompt, reply = agent.respond(str(session_id), question)
+                    naive = naive_llm.generate(prompt.baseline_messages)
+                    turns.append(
+                        {
+                            "session": session_id,
+                            "turn": turn,
+                            "retrieved": prompt.retrieved,
+                            "passages": len(prompt.chunks),
+                            "prompt_tokens": reply["prompt_tokens"],
+                            "baseline_tokens": naive["prompt_tokens"],
+                            "cached_tokens": reply["cached_tokens"],
+                            "baseline_cached_tokens": naive["cached_tokens"],
+                            "ttft_ms": round(reply["ttft_ms"], 1),
+                            "baseline_ttft_ms": round(naive["ttft_ms"], 1),
+                        }
+                    )
+
+            prompt_tokens = sum(t["prompt_tokens"] for t in turns)
+            baseline_tokens = sum(t["baseline_tokens"] for t in turns)
+            report = {
+                "turns": len(turns),
+                "prompt_tokens": prompt_tokens,
+                "baseline_tokens": baseline_tokens,
+                "tokens_saved": baseline_tokens - prompt_tokens,
+                "saved_ratio": round(1 - prompt_tokens / max(baseline_tokens, 1), 4),
+                "prefix_hit_rate": round(agent.llm.hit_rate, 4),
+                "baseline_prefix_hit_rate": round(naive_llm.hit_rate, 4),
+                "per_turn": turns,
+            }
+            os.makedirs(os.path.dirname(self.report_path), exist_ok=True)
+            with open(self.report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            log_agt.info(
+                f"Context: Saved {report['tokens_saved']} prompt tokens "
+                f"({report['saved_ratio']:.1%}), prefix hit rate "
+                f"{report['prefix_hit_rate']:.1%} vs {report['baseline_prefix_hit_rate']:.1%}"
+            )
+            return report
+
+        except Exception as e:
+            LogException(e, "Context", log_agt)
+            raise CustomException(e)
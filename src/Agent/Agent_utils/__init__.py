@@ -0,0 +1,23 @@
+from src.Agent.Agent_utils.token_utils import tokenize, count_tokens, index_terms
+from src.Agent.Agent_utils.index_utils import (
+    TranscriptIndex,
+    fuse_rankings,
+    chunk_spans,
+    hashed_embedding,
+    content_hash,
+    load_corpus,
+)
+from src.Agent.Agent_utils.context_utils import (
+    AssembledPrompt,
+    ContextAssembler,
+    Conversation,
+)
+from src.Agent.Agent_utils.standin_utils import PrefixCache, StandInLLM, render_messages
+from src.Agent.Agent_utils.gateway_utils import LLMGateway, ToolRegistry, request_key
+from src.Agent.Agent_utils.segment_utils import (
+    IndexManager,
+    SegmentedIndex,
+    publish_index,
+    read_manifest,
+    manifest_lock,
+)
@@ -0,0 +1,195 @@
+from typing import Dict, List
+
+from src.Agent.Agent_config import ContextConfig
+from src.Agent.Agent_constants import PromptData
+from src.Agent.Agent_utils.token_utils import count_tokens
+from src.Entity.transcript_entity import TranscriptChunk
+
+
+class Conversation:
+    """Question / answer turns of one chat session.
+
+    History is append-only and `start` only ever jumps forward, so the
+    rendered history of turn `n` is a prefix of the one of turn `n + 1`
+    until the next trim.
+    """
+
+    def __init__(self) -> None:
+        self.turns: List[Dict[str, str | int]] = []
+        self.start = 0
+
+    def add_turn(self, question: str, answer: str, context: str) -> None:
+        self.turns.append(
+            {
+                "question": question,
+                "answer": answer,
+                "tokens": count_tokens(question) + count_tokens(answer),
+                # only replayed by the naive layout the stats compare against
+                "context": context,
+            }
+        )
+
+    def history(self) -> List[Dict[str, str | int]]:
+        return self.turns[self.start :]
+
+
+class AssembledPrompt:
+    def __init__(
+        self,
+        messages: List[Dict[str, str]],
+        chunks: List[TranscriptChunk],
+        context: str,
+        prompt_tokens: int,
+        baseline_messages: List[Dict[str, str]],
+        baseline_tokens: int,
+        retrieved: int,
+    ) -> None:
+        self.messages = messages
+        # passages in the order they are numbered in the prompt
+        self.chunks = chunks
+        self.context = context
+        self.prompt_tokens = prompt_tokens
+        # naive layout: every retrieved chunk unmerged in the system message,
+        # every earlier turn replayed with its context
+        self.baseline_messages = baseline_messages
+        self.baseline_tokens = baseline_tokens
+        self.retrieved = retrieved
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.baseline_tokens - self.prompt_tokens
+
+
+def passage_text(number: int, chunk: TranscriptChunk) -> str:
+    where = chunk.source
+    if chunk.start_s is not None:
+        # lets the model cite the moment in the video, not just the episode
+        minutes, seconds = divmod(int(chunk.start_s), 60)
+        where += f" at {minutes}:{seconds:02d}"
+    return f"[{number}] {chunk.title} ({where})\n{chunk.text}"
+
+
+def user_content(context: str, question: str) -> str:
+    return (
+        f"{PromptData.CONTEXT_HEADER}\n{context}\n\n"
+        f"{PromptData.QUESTION_HEADER} {question}"
+    )
+
+
+def count_messages(messages: List[Dict[str, str]]) -> int:
+    return sum(count_tokens(m["content"]) for m in messages)
+
+
+class ContextAssembler:
+    """Build cache friendly, token budgeted prompts from retrieved chunks.
+
+    Message order, from most to least stable:
+    1. system prompt + corpus preamble, identical for every request
+    2. earlier question / answer turns (their context passages are dropped)
+    3. the current turn's numbered passages and question
+
+    so the backend's prefix cache can reuse 1 across all sessions and 1 + 2
+    across the turns of a session.
+    """
+
+    def __init__(self, context_config: ContextConfig = ContextConfig()) -> None:
+        self.config = context_config
+        self.system_message = {
+            "role": "system",
+            "content": f"{PromptData.SYSTEM_PROMPT}\n\n{PromptData.CORPUS_PREAMBLE}",
+        }
+
+    @staticmethod
+    def _merge(chunks: List[TranscriptChunk]) -> List[TranscriptChunk]:
+        """Merge overlapping chunks of the same episode, ordered by episode and position."""
+        merged: List[TranscriptChunk] = []
+        for chunk in sorted(chunks, key=lambda c: (c.doc_id, c.start)):
+            if merged and merged[-1].touches(chunk):
+                merged[-1] = merged[-1].merge(chunk)
+            else:
+                merged.append(chunk)
+        return merged
+
+    def _context_tokens(self, chunks: List[TranscriptChunk]) -> int:
+        return sum(
+            count_tokens(passage_text(n, c)) for n, c in enumerate(chunks, start=1)
+        )
+
+    def pack(self, chunks: List[TranscriptChunk]) -> List[TranscriptChunk]:
+        """Greedily add chunks by score while the merged passages fit the budget.
+
+        Merging runs after every addition, an overlapping neighbour only costs
+        the words it adds, so it often still fits where a stranger would not.
+        """
+        selected: List[TranscriptChunk] = []
+        packed: List[TranscriptChunk] = []
+        for chunk in sorted(chunks, key=lambda c: -c.score):
+            candidate = self._merge(selected + [chunk])
+            if self._context_tokens(candidate) <= self.config.context_budget:
+                selected.append(chunk)
+                packed = candidate
+        return packed
+
+    def trim_history(self, conversation: Conversation) -> None:
+        history = conversation.history()
+        if sum(t["tokens"] for t in history) <= self.config.history_budget:
+            return
+        # drop a block of old turns at once instead of one per turn, see `ContextConfig`
+        keep = self.config.history_budget * self.config.history_keep
+        while history and sum(t["tokens"] for t in history) > keep:
+            conversation.start += 1
+            history = conversation.history()
+
+    def assemble(
+        self,
+        question: str,
+        chunks: List[TranscriptChunk],
+        conversation: Conversation | None = None,
+    ) -> AssembledPrompt:
+        conversation = conversation or Conversation()
+        self.trim_history(conversation)
+        packed = self.pack(chunks)
+
+        messages = [self.system_message]
+        for turn in conversation.history():
+            messages.append({"role": "user", "content": turn["question"]})
+            messages.append({"role": "assistant", "content": turn["answer"]})
+        context = "\n\n".join(passage_text(n, c) for n, c in enumerate(packed, 1))
+        messages.append({"role": "user", "content": user_content(context, question)})
+
+        baseline = self.baseline(question, chunks, conversation)
+        return AssembledPrompt(
+            messages=messages,
+            chunks=packed,
+            context=context,
+            prompt_tokens=count_messages(messages),
+            baseline_messages=baseline,
+            baseline_tokens=count_messages(baseline),
+            retrieved=len(chunks),
+        )
+
+    def baseline(
+        self,
+        question: str,
+        chunks: List[TranscriptChunk],
+        conversation: Conversation,
+    ) -> List[Dict[str, str]]:
+        ranked = sorted(chunks, key=lambda c: -c.score)
+        context = "\n\n".join(passage_text(n, c) for n, c in enumerate(ranked, 1))
+        messages = [
+            {
+                "role": "system",
+                "content": f"{PromptData.SYSTEM_PROMPT}\n\n"
+                f"{PromptData.CONTEXT_HEADER}\n{context}\n\n{PromptData.CORPUS_PREAMBLE}",
+            }
+        ]
+        for turn in conversation.turns:
+            messages.append(
+                {
+                    "role": "user",
+                    "content": user_content(turn["context"], turn["question"]),
+                }
+            )
+            messages.append({"role": "assistant", "content": turn["answer"]})
+        messages.append({"role": "user", "content": question})
+        return messages
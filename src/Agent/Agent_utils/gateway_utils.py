@@ -0,0 +1,200 @@
+import json
+import time
+import asyncio
+import inspect
+import hashlib
+import httpx
+from collections import OrderedDict
+from typing import Callable, Dict, List
+
+from src.Agent.Agent_config import GatewayConfig
+
+from src.Logging.logger import log_agt
+from src.Exception.exception import CustomException, LogException
+
+
+def request_key(payload: dict) -> str:
+    """Stable hash of a completion request, equal payloads coalesce / cache together."""
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()
+    ).hexdigest()
+
+
+class LLMGateway:
+    """Async client for an openai compatible chat completions backend.
+
+    - one pooled `httpx.AsyncClient`, keep-alive connections are reused
+    - at most `max_concurrency` requests reach the backend at once
+    - identical temperature 0 requests in flight share a single backend call
+    - temperature 0 completions are kept in an lru cache
+
+    Sampled (temperature > 0) requests always get their own backend call.
+
+    Every result carries a `timing` breakdown: `queue_ms` waiting for a
+    slot, `backend_ms` spent on the http call, `total_ms`, and how it was
+    served (`backend`, `coalesced` or `cache`).
+    """
+
+    def __init__(self, gateway_config: GatewayConfig = GatewayConfig()) -> None:
+        self.config = gateway_config
+        self._client: httpx.AsyncClient | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._cache: OrderedDict = OrderedDict()
+        self.stats = {"requests": 0, "backend": 0, "coalesced": 0, "cache": 0}
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        # created lazily so the gateway binds to the loop that first uses it
+        if self._client is None:
+            headers = {}
+            if self.config.api_key:
+                headers["Authorization"] = f"Bearer {self.config.api_key}"
+            self._client = httpx.AsyncClient(
+                base_url=self.config.base_url,
+                headers=headers,
+                timeout=self.config.timeout_s,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_connections,
+                ),
+            )
+            self._slots = asyncio.Semaphore(self.config.max_concurrency)
+        return self._client
+
+    async def _call_backend(self, payload: dict) -> dict:
+        client = self._ensure_client()
+        queued = time.perf_counter()
+        async with self._slots:
+            started = time.perf_counter()
+            response = await client.post("/chat/completions", json=payload)
+            response.raise_for_status()
+            body = response.json()
+        finished = time.perf_counter()
+        return {
+            "response": body,
+            "timing": {
+                "queue_ms": (started - queued) * 1e3,
+                "backend_ms": (finished - started) * 1e3,
+            },
+        }
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        # `exception()` also marks a failure as retrieved when every caller left
+        if not task.cancelled() and task.exception() is None:
+            self._cache[key] = task.result()
+            if len(self._cache) > self.config.cache_size:
+                self._cache.popitem(last=False)
+
+    async def complete(
+        self,
+        messages: List[Dict],
+        temperature: float = 0.0,
+        max_tokens: int = 256,
+        tools: List[dict] | None = None,
+    ) -> dict:
+        """`{"message": {...}, "usage": {...}, "timing": {...}}` of one completion."""
+        try:
+            start = time.perf_counter()
+            self.stats["requests"] += 1
+            payload = {
+                "model": self.config.model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+            }
+            if tools:
+                payload["tools"] = tools
+            key = request_key(payload)
+
+            if temperature != 0:
+                # sampled completions are independent draws, never shared
+                result, served_by = await self._call_backend(payload), "backend"
+            elif key in self._cache:
+                self._cache.move_to_end(key)
+                result, served_by = self._cache[key], "cache"
+            else:
+                task = self._in_flight.get(key)
+                served_by = "coalesced" if task else "backend"
+                if task is None:
+                    task = asyncio.ensure_future(self._call_backend(payload))
+                    self._in_flight[key] = task
+                    task.add_done_callback(lambda done: self._finish(key, done))
+                # shielded, a cancelled caller does not cancel the shared call
+                result = await asyncio.shield(task)
+            self.stats[served_by] += 1
+
+            choice = result["response"]["choices"][0]
+            timing = {"queue_ms": 0.0, "backend_ms": 0.0}
+            if served_by == "backend":
+                timing.update(result["timing"])
+            timing["total_ms"] = (time.perf_counter() - start) * 1e3
+            timing = {k: round(v, 2) for k, v in timing.items()}
+            timing["served_by"] = served_by
+            return {
+                "message": choice["message"],
+                "finish_reason": choice.get("finish_reason"),
+                "usage": result["response"].get("usage", {}),
+                "timing": timing,
+            }
+
+        except Exception as e:
+            LogException(e, "Gateway", log_agt)
+            raise CustomException(e)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "LLMGateway":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+
+class ToolRegistry:
+    """Named tools the model may call, blocking tools run on worker threads."""
+
+    def __init__(self) -> None:
+        self.tools: Dict[str, Callable] = {}
+        self.specs: List[dict] = []
+
+    def register(self, name: str, description: str, parameters: dict, func: Callable):
+        self.tools[name] = func
+        self.specs.append(
+            {
+                "type": "function",
+                "function": {
+                    "name": name,
+                    "description": description,
+                    "parameters": parameters,
+                },
+            }
+        )
+
+    async def _call(self, call: dict) -> dict:
+        name = call["function"]["name"]
+        start = time.perf_counter()
+        try:
+            arguments = json.loads(call["function"].get("arguments") or "{}")
+            func = self.tools[name]
+            if inspect.iscoroutinefunction(func):
+                output = await func(**arguments)
+            else:
+                output = await asyncio.to_thread(func, **arguments)
+        except Exception as e:
+            # the model gets the error as the tool result and can recover
+            LogException(e, "Tool", log_agt)
+            output = {"error": str(e) or type(e).__name__}
+        return {
+            "tool_call_id": call["id"],
+            "name": name,
+            "content": json.dumps(output, ensure_ascii=False),
+            "elapsed_ms": (time.perf_counter() - start) * 1e3,
+        }
+
+    async def run_calls(self, calls: List[dict]) -> List[dict]:
+        """Run the tool calls of one model message concurrently, results in call order."""
+        return list(await asyncio.gather(*(self._call(call) for call in calls)))
@@ -0,0 +1,443 @@
+import os
+import re
+import json
+import zlib
+import hashlib
+import numpy as np
+from glob import glob
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from src.Agent.Agent_config import IndexConfig
+from src.Agent.Agent_utils.token_utils import index_terms
+from src.Entity.transcript_entity import CompactTranscript, TranscriptChunk
+from src.Utils.main_utils import (
+    read_transcript_body,
+    read_transcript_header,
+    load_duplicate_paths,
+)
+from src.ETL.ETL_constants import DedupData
+
+from src.Logging.logger import log_agt
+from src.Exception.exception import CustomException, LogException
+
+_WORD_SPAN_RE = re.compile(r"\S+")
+
+
+def chunk_spans(body: str, chunk_words: int, overlap_words: int) -> List[List[int]]:
+    """`[start, end]` character ranges of overlapping word windows over `body`."""
+    words = [m.span() for m in _WORD_SPAN_RE.finditer(body)]
+    spans, step = [], chunk_words - overlap_words
+    for i in range(0, max(len(words) - overlap_words, 1), step):
+        window = words[i : i + chunk_words]
+        if window:
+            spans.append([window[0][0], window[-1][1]])
+    return spans
+
+
+def hashed_embedding(term_counts: Dict[str, int], dim: int) -> np.ndarray:
+    """Signed feature hashing of sublinear term counts, L2 normalised.
+
+    Stand-in for a sentence encoder: swapping in a real model only changes
+    how the `embeddings` matrix and the query vector are produced.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for term, count in term_counts.items():
+        h = zlib.crc32(term.encode())
+        vector[h % dim] += (1.0 if h & 0x80000000 else -1.0) * (1.0 + np.log(count))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def term_hash(term: str) -> int:
+    """Stable 64 bit hash of a term, the same in every process."""
+    return int.from_bytes(
+        hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def content_hash(body: str) -> str:
+    return hashlib.blake2b(body.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def vocab_arrays(vocab: Dict[str, int]) -> Dict[str, np.ndarray]:
+    """`vocab_hash` (sorted term hashes) and `vocab_ids` (their term ids)."""
+    hashes = np.array([term_hash(term) for term in vocab], dtype=np.uint64)
+    ids = np.array(list(vocab.values()), dtype=np.int64)
+    order = np.argsort(hashes, kind="stable")
+    return {"vocab_hash": hashes[order], "vocab_ids": ids[order]}
+
+
+class HashedVocab:
+    """Term -> id lookup by binary search over two sorted arrays.
+
+    Unlike a dict it can be memory mapped, so every server process shares
+    one copy of the vocabulary instead of parsing its own. A query term
+    outside the vocabulary could only be mistaken for one inside it on a
+    64 bit hash collision.
+    """
+
+    def __init__(self, hashes: np.ndarray, ids: np.ndarray) -> None:
+        self.hashes = hashes
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def get(self, term: str, default: int | None = None) -> int | None:
+        h = np.uint64(term_hash(term))
+        i = int(np.searchsorted(self.hashes, h))
+        if i < len(self.hashes) and self.hashes[i] == h:
+            return int(self.ids[i])
+        return default
+
+
+def top_chunks(scores: np.ndarray, n: int) -> np.ndarray:
+    """Ids of the `n` best positive scores, best first."""
+    n = min(n, len(scores))
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-scores, n - 1)[:n]
+    top = top[scores[top] > 0]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def fuse_rankings(
+    rankings: List[Tuple[float, np.ndarray]], k: int, index_config: IndexConfig
+) -> List[Tuple[int, float]]:
+    """Weighted reciprocal rank fusion, `[(chunk_id, fused score)]` best first.
+
+    Tied scores share the best rank of their group, so the fused scores do
+    not depend on the order chunks happen to be stored in (segments).
+    """
+    fused: Dict[int, float] = {}
+    for weight, scores in rankings:
+        if weight <= 0:
+            continue
+        top = top_chunks(scores, index_config.candidates)
+        descending = -scores[top]
+        ranks = np.searchsorted(descending, descending, side="left")
+        for rank, chunk_id in zip(ranks.tolist(), top.tolist()):
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + weight / (
+                index_config.rrf_k + rank + 1
+            )
+    return sorted(fused.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
+
+
+class TranscriptIndex:
+    """Chunked lexical (BM25) and dense retrieval index over the transcripts.
+
+    Everything lives in flat numpy arrays, each saved as its own `.npy` file,
+    so an index can be opened with `mmap_mode="r"` instead of being parsed.
+
+    text        uint8   utf-8 chunk texts back to back, chunk `i` is `text[text_ptr[i]:text_ptr[i + 1]]`
+    chunk_doc   int32   document of each chunk, chunks of a document are consecutive
+    chunk_start int32   character range of the chunk in its document body
+    chunk_end   int32
+    chunk_len   int32   number of index terms (BM25 length normalisation)
+    chunk_time  float32 second the chunk starts at in its video, NaN for blog text
+    term_ptr    int64   postings of term `t` are `post_chunk/post_tf[term_ptr[t]:term_ptr[t + 1]]`
+    post_chunk  int32
+    post_tf     float32
+    embeddings  float32 (chunks x dense_dim), L2 normalised
+    vocab_hash  uint64  sorted term hashes and the id of each term, see `HashedVocab`
+    vocab_ids   int64
+
+    Only the document list is kept in `meta.json`.
+    """
+
+    ARRAYS = [
+        "text",
+        "text_ptr",
+        "chunk_doc",
+        "chunk_start",
+        "chunk_end",
+        "chunk_len",
+        "chunk_time",
+        "term_ptr",
+        "post_chunk",
+        "post_tf",
+        "embeddings",
+        "vocab_hash",
+        "vocab_ids",
+    ]
+
+    def __init__(
+        self,
+        arrays: Dict[str, np.ndarray],
+        docs: List[dict],
+        index_config: IndexConfig = IndexConfig(),
+    ) -> None:
+        self.arrays = arrays
+        self.vocab = HashedVocab(arrays["vocab_hash"], arrays["vocab_ids"])
+        self.docs = docs
+        self.config = index_config
+        self.doc_source = np.array([doc["source"] for doc in docs], dtype=str)
+
+    def __len__(self) -> int:
+        return len(self.arrays["chunk_doc"])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(int(a.nbytes) for a in self.arrays.values())
+
+    @property
+    def live_docs(self) -> List[dict]:
+        return self.docs
+
+    @classmethod
+    def build(
+        cls, documents: List[dict], index_config: IndexConfig = IndexConfig()
+    ) -> "TranscriptIndex":
+        """documents: `{path, title, url, source, body}` dicts, plus the
+        `transcript` (`CompactTranscript`) of timestamped youtube bodies."""
+        texts, chunk_doc, chunk_start, chunk_end, chunk_counts = [], [], [], [], []
+        chunk_time = []
+        for doc_id, doc in enumerate(documents):
+            body, transcript = doc["body"], doc.get("transcript")
+            for start, end in chunk_spans(
+                body, index_config.chunk_words, index_config.overlap_words
+            ):
+                texts.append(body[start:end].encode("utf-8"))
+                chunk_doc.append(doc_id)
+                chunk_start.append(start)
+                chunk_end.append(end)
+                chunk_time.append(transcript.time_at(start) if transcript else np.nan)
+                chunk_counts.append(Counter(index_terms(body[start:end])))
+
+        vocab: Dict[str, int] = {}
+        post_term, post_chunk, post_tf = [], [], []
+        for chunk_id, counts in enumerate(chunk_counts):
+            for term, tf in counts.items():
+                post_term.append(vocab.setdefault(term, len(vocab)))
+                post_chunk.append(chunk_id)
+                post_tf.append(tf)
+
+        post_term = np.array(post_term, dtype=np.int64)
+        order = np.argsort(post_term, kind="stable")
+        df = np.bincount(post_term, minlength=len(vocab))
+        term_ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(df, out=term_ptr[1:])
+        num_chunks = len(texts)
+
+        text_ptr = np.zeros(num_chunks + 1, dtype=np.int64)
+        np.cumsum([len(t) for t in texts], out=text_ptr[1:])
+        embeddings = np.zeros((num_chunks, index_config.dense_dim), dtype=np.float32)
+        for chunk_id, counts in enumerate(chunk_counts):
+            embeddings[chunk_id] = hashed_embedding(counts, index_config.dense_dim)
+
+        arrays = {
+            "text": np.frombuffer(b"".join(texts), dtype=np.uint8),
+            "text_ptr": text_ptr,
+            "chunk_doc": np.array(chunk_doc, dtype=np.int32),
+            "chunk_start": np.array(chunk_start, dtype=np.int32),
+            "chunk_end": np.array(chunk_end, dtype=np.int32),
+            "chunk_len": np.array(
+                [sum(c.values()) for c in chunk_counts], dtype=np.int32
+            ),
+            "chunk_time": np.array(chunk_time, dtype=np.float32),
+            "term_ptr": term_ptr,
+            "post_chunk": np.array(post_chunk, dtype=np.int32)[order],
+            "post_tf": np.array(post_tf, dtype=np.float32)[order],
+            "embeddings": embeddings,
+            **vocab_arrays(vocab),
+        }
+        docs = [
+            {k: doc[k] for k in ("path", "title", "url", "source")} for doc in documents
+        ]
+        return cls(arrays, docs, index_config)
+
+    def save(self, index_dir: str) -> None:
+        os.makedirs(index_dir, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(index_dir, f"{name}.npy"), self.arrays[name])
+        tmp_path = os.path.join(index_dir, "meta.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"docs": self.docs}, f)
+        os.replace(tmp_path, os.path.join(index_dir, "meta.json"))
+
+    @classmethod
+    def load(
+        cls,
+        index_dir: str,
+        index_config: IndexConfig = IndexConfig(),
+        mmap: bool = True,
+    ) -> "TranscriptIndex":
+        paths = {name: os.path.join(index_dir, f"{name}.npy") for name in cls.ARRAYS}
+        if mmap and hasattr(os, "posix_fadvise"):
+            # start reading the files into the page cache before `warm` touches them
+            for path in paths.values():
+                if os.path.exists(path):
+                    fd = os.open(path, os.O_RDONLY)
+                    try:
+                        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                    finally:
+                        os.close(fd)
+        arrays = {
+            name: np.load(path, mmap_mode="r" if mmap else None)
+            for name, path in paths.items()
+            if os.path.exists(path)
+        }
+        with open(os.path.join(index_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if "vocab_hash" not in arrays:
+            # segment published before the vocabulary moved out of `meta.json`
+            arrays.update(vocab_arrays(meta["vocab"]))
+        if "chunk_time" not in arrays:
+            # segment published before chunks carried timestamps
+            arrays["chunk_time"] = np.full(
+                len(arrays["chunk_doc"]), np.nan, dtype=np.float32
+            )
+        return cls(arrays, meta["docs"], index_config)
+
+    def chunk(self, chunk_id: int, score: float = 0.0) -> TranscriptChunk:
+        a = self.arrays
+        text_start, text_end = a["text_ptr"][chunk_id], a["text_ptr"][chunk_id + 1]
+        doc_id = int(a["chunk_doc"][chunk_id])
+        doc = self.docs[doc_id]
+        start_s = float(a["chunk_time"][chunk_id])
+        return TranscriptChunk(
+            chunk_id=chunk_id,
+            doc_id=doc_id,
+            start=int(a["chunk_start"][chunk_id]),
+            end=int(a["chunk_end"][chunk_id]),
+            text=a["text"][text_start:text_end].tobytes().decode("utf-8"),
+            score=score,
+            title=doc["title"],
+            url=doc["url"],
+            source=doc["source"],
+            start_s=None if np.isnan(start_s) else start_s,
+        )
+
+    def bm25_totals(self, live: np.ndarray | None = None) -> Tuple[int, int]:
+        """`(chunks, summed chunk lengths)`, of the `live` chunks only when given."""
+        lengths = self.arrays["chunk_len"]
+        if live is not None:
+            lengths = lengths[live]
+        return len(lengths), int(lengths.sum())
+
+    def doc_freqs(
+        self, terms: List[str], live: np.ndarray | None = None
+    ) -> Dict[str, int]:
+        """Chunks holding each of `terms`, counting `live` chunks only when given."""
+        a, df = self.arrays, {}
+        for term in set(terms):
+            t = self.vocab.get(term)
+            if t is None:
+                continue
+            lo, hi = a["term_ptr"][t], a["term_ptr"][t + 1]
+            df[term] = (
+                int(hi - lo)
+                if live is None
+                else int(np.count_nonzero(live[a["post_chunk"][lo:hi]]))
+            )
+        return df
+
+    def bm25_stats(self, terms: List[str]) -> dict:
+        chunks, length = self.bm25_totals()
+        return {
+            "chunks": chunks,
+            "avg_len": length / chunks if chunks else 0.0,
+            "df": self.doc_freqs(terms),
+        }
+
+    def lexical_scores(self, terms: List[str], stats: dict | None = None) -> np.ndarray:
+        """BM25 of every chunk. `stats` (see `bm25_stats`) default to this
+        index's own, a segmented index passes its corpus wide ones."""
+        stats = stats or self.bm25_stats(terms)
+        a, k1, b = self.arrays, self.config.bm25_k1, self.config.bm25_b
+        scores = np.zeros(len(self), dtype=np.float32)
+        for term, df in stats["df"].items():
+            t = self.vocab.get(term)
+            if t is None or df == 0:
+                continue
+            idf = np.float32(np.log(1.0 + (stats["chunks"] - df + 0.5) / (df + 0.5)))
+            lo, hi = a["term_ptr"][t], a["term_ptr"][t + 1]
+            chunks, tf = a["post_chunk"][lo:hi], a["post_tf"][lo:hi]
+            norm = k1 * (1.0 - b + b * a["chunk_len"][chunks] / stats["avg_len"])
+            # a term lists each chunk once, so plain fancy-index add is safe
+            scores[chunks] += idf * tf * (k1 + 1.0) / (tf + norm)
+        return scores
+
+    def dense_scores(self, terms: List[str]) -> np.ndarray:
+        query = hashed_embedding(Counter(terms), self.config.dense_dim)
+        return self.arrays["embeddings"] @ query
+
+    def rankings(
+        self,
+        terms: List[str],
+        source: str | None = None,
+        stats: dict | None = None,
+        live: np.ndarray | None = None,
+    ) -> List[Tuple[float, np.ndarray]]:
+        """`(fusion weight, per chunk scores)` of the BM25 and dense rankings,
+        chunks outside `source` (`youtube` / `blog`) or the `live` mask scored 0."""
+        rankings = [
+            (self.config.lexical_weight, self.lexical_scores(terms, stats)),
+            (self.config.dense_weight, self.dense_scores(terms)),
+        ]
+        allowed = live
+        if source:
+            in_source = self.doc_source[self.arrays["chunk_doc"]] == source
+            allowed = in_source if allowed is None else allowed & in_source
+        if allowed is not None:
+            rankings = [(w, np.where(allowed, s, 0.0)) for w, s in rankings]
+        return rankings
+
+    def warm(self) -> int:
+        """Fault every mapped page in (one byte per 4 KiB page), returns bytes touched."""
+        touched = 0
+        for array in self.arrays.values():
+            flat = np.asarray(array).reshape(-1).view(np.uint8)
+            int(flat[::4096].sum())
+            touched += flat.nbytes
+        return touched
+
+    def search(
+        self, query: str, k: int = 10, source: str | None = None
+    ) -> List[TranscriptChunk]:
+        """Weighted reciprocal rank fusion of the BM25 and dense rankings,
+        optionally restricted to one corpus (`youtube` / `blog`)."""
+        try:
+            terms = index_terms(query)
+            if not terms or len(self) == 0:
+                return []
+            best = fuse_rankings(self.rankings(terms, source), k, self.config)
+            return [self.chunk(chunk_id, score) for chunk_id, score in best]
+
+        except Exception as e:
+            LogException(e, "Retrieve", log_agt)
+            raise CustomException(e)
+
+
+def load_corpus(index_config: IndexConfig = IndexConfig()) -> List[dict]:
+    """Transcript files of every source folder, minus near duplicates found by the dedup stage."""
+    skip = load_duplicate_paths(DedupData.REPORT_PATH)
+    documents = []
+    for source, folder in zip(index_config.source_names, index_config.source_dirs):
+        for path in sorted(glob(f"{folder}/**/*.txt", recursive=True)):
+            if path in skip:
+                continue
+            body = read_transcript_body(path)
+            if not body.strip():
+                continue
+            title, url = read_transcript_header(path)
+            # youtube transcripts saved with their snippet timings
+            transcript = (
+                CompactTranscript.from_sidecar(body, path)
+                if os.path.exists(CompactTranscript.sidecar_path(path))
+                else None
+            )
+            documents.append(
+                {
+                    "path": path,
+                    "title": title,
+                    "url": url,
+                    "source": source,
+                    "body": body,
+                    "transcript": transcript,
+                    # tells a rewritten / re-extracted transcript from the indexed one
+                    "hash": content_hash(body),
+                }
+            )
+    return documents
@@ -0,0 +1,408 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import asyncio
+import threading
+import numpy as np
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from src.Agent.Agent_config import IndexConfig
+from src.Agent.Agent_utils.token_utils import index_terms
+from src.Agent.Agent_utils.index_utils import TranscriptIndex, fuse_rankings
+from src.Entity.transcript_entity import TranscriptChunk
+
+from src.Logging.logger import log_agt
+from src.Exception.exception import CustomException, LogException
+
+try:
+    import fcntl
+except ImportError:  # windows, concurrent publishers are not serialised there
+    fcntl = None
+
+
+def read_manifest(manifest_path: str) -> dict:
+    if not os.path.exists(manifest_path):
+        return {"version": 0, "segments": []}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _fsync(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_segment(index: TranscriptIndex, segment_dir: str, version: int) -> str:
+    """Save `index` as a new immutable segment, visible only once complete
+    and on disk, a crash never leaves a published segment with torn files."""
+    name = f"seg-{version:05d}-{uuid.uuid4().hex[:8]}"
+    tmp_path = os.path.join(segment_dir, f".tmp-{name}")
+    index.save(tmp_path)
+    for file_name in os.listdir(tmp_path):
+        _fsync(os.path.join(tmp_path, file_name))
+    _fsync(tmp_path)
+    os.rename(tmp_path, os.path.join(segment_dir, name))
+    _fsync(segment_dir)
+    return name
+
+
+@contextmanager
+def manifest_lock(manifest_path: str) -> Iterator[None]:
+    """Exclusive lock around a publisher's read / build / write of the
+    manifest, so concurrent publishers (etl workers, a manual `index` run)
+    queue up instead of dropping each other's segments."""
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(f"{manifest_path}.lock", "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def write_manifest(manifest_path: str, manifest: dict) -> None:
+    """Atomically replace the manifest, readers see the old or the new one."""
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, manifest_path)
+
+
+def collect_garbage(index_config: IndexConfig, manifest: dict) -> List[str]:
+    """Delete segments retired more than `gc_grace_s` ago, plus temp / orphan
+    dirs older than that. Servers that still map a deleted segment keep
+    reading it, the kernel frees the files once they are unmapped."""
+    removed = []
+    if not os.path.isdir(index_config.segment_dir):
+        return removed
+    cutoff = time.time() - index_config.gc_grace_s
+    retired = manifest.setdefault("retired", {})
+    for name in os.listdir(index_config.segment_dir):
+        if name in manifest["segments"]:
+            continue
+        path = os.path.join(index_config.segment_dir, name)
+        retired_at = retired.get(name, os.path.getmtime(path))
+        if retired_at > cutoff:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        retired.pop(name, None)
+        removed.append(name)
+    return removed
+
+
+class SegmentedIndex:
+    """One published index version: its segments searched as a single index.
+
+    Chunk and document ids are global, segment `i` owns the ids from
+    `chunk_offsets[i]` / `doc_offsets[i]`. `deleted[i]` lists the documents
+    of segment `i` that were replaced or removed since it was written, their
+    chunks are never returned. Every segment is scored with BM25 statistics
+    (chunk count, length, document frequencies) summed over the live chunks
+    of all segments, so rankings match those of one compacted segment.
+    """
+
+    def __init__(
+        self,
+        segments: List[TranscriptIndex],
+        version: int = 0,
+        index_config: IndexConfig = IndexConfig(),
+        deleted: List[List[int]] | None = None,
+    ) -> None:
+        self.segments = segments
+        self.version = version
+        self.config = index_config
+        self.chunk_offsets = np.cumsum([0] + [len(s) for s in segments])
+        self.doc_offsets = np.cumsum([0] + [len(s.docs) for s in segments])
+        self.docs = [doc for segment in segments for doc in segment.docs]
+        deleted = deleted or [[] for _ in segments]
+        self.deleted = {
+            int(self.doc_offsets[i]) + doc_id
+            for i, doc_ids in enumerate(deleted)
+            for doc_id in doc_ids
+        }
+        # per segment mask of the chunks still served, None when all are
+        self.live = [
+            ~np.isin(segment.arrays["chunk_doc"], doc_ids) if doc_ids else None
+            for segment, doc_ids in zip(segments, deleted)
+        ]
+        self._totals = [
+            segment.bm25_totals(live) for segment, live in zip(segments, self.live)
+        ]
+
+    def __len__(self) -> int:
+        return int(self.chunk_offsets[-1])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(segment.nbytes for segment in self.segments)
+
+    @property
+    def live_docs(self) -> List[dict]:
+        return [doc for i, doc in enumerate(self.docs) if i not in self.deleted]
+
+    def warm(self) -> int:
+        return sum(segment.warm() for segment in self.segments)
+
+    def bm25_stats(self, terms: List[str]) -> dict:
+        """BM25 statistics of all live chunks, see `TranscriptIndex.bm25_stats`."""
+        chunks = sum(count for count, _ in self._totals)
+        length = sum(length for _, length in self._totals)
+        per_segment = [
+            segment.doc_freqs(terms, live)
+            for segment, live in zip(self.segments, self.live)
+        ]
+        df = {}
+        for term in set(terms):
+            count = sum(freqs.get(term, 0) for freqs in per_segment)
+            if count:
+                df[term] = count
+        return {
+            "chunks": chunks,
+            "avg_len": length / chunks if chunks else 0.0,
+            "df": df,
+        }
+
+    def chunk(self, chunk_id: int, score: float = 0.0) -> TranscriptChunk:
+        i = int(np.searchsorted(self.chunk_offsets, chunk_id, side="right")) - 1
+        chunk = self.segments[i].chunk(chunk_id - int(self.chunk_offsets[i]), score)
+        chunk.chunk_id = chunk_id
+        chunk.doc_id += int(self.doc_offsets[i])
+        return chunk
+
+    def search(
+        self, query: str, k: int = 10, source: str | None = None
+    ) -> List[TranscriptChunk]:
+        try:
+            terms = index_terms(query)
+            if not terms or len(self) == 0:
+                return []
+            stats = self.bm25_stats(terms)
+            per_segment = [
+                segment.rankings(terms, source, stats, live)
+                for segment, live in zip(self.segments, self.live)
+            ]
+            # each ranking of every segment side by side, indexed by global chunk id
+            rankings = [
+                (weight, np.concatenate([ranks[r][1] for ranks in per_segment]))
+                for r, (weight, _) in enumerate(per_segment[0])
+            ]
+            best = fuse_rankings(rankings, k, self.config)
+            return [self.chunk(chunk_id, score) for chunk_id, score in best]
+
+        except Exception as e:
+            LogException(e, "Retrieve", log_agt)
+            raise CustomException(e)
+
+
+class _Handle:
+    def __init__(self, index: SegmentedIndex) -> None:
+        self.index: SegmentedIndex | None = index
+        self.refs = 0
+        self.retired = False
+
+
+class IndexManager:
+    """Serve the newest published index version and swap in new ones live.
+
+    A query pins the version it started on (`acquire`), so it never sees a
+    partial index. `refresh` maps the new segments, faults their pages in
+    and only then swaps the pointer. The old version is dropped (and its
+    unshared segments unmapped) once its last query finishes. Segments
+    shared by both versions are reused, not mapped again.
+    """
+
+    def __init__(self, index_config: IndexConfig = IndexConfig()) -> None:
+        self.config = index_config
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._current = _Handle(SegmentedIndex([], 0, index_config))
+        self._segments: Dict[str, TranscriptIndex] = {}
+        self._manifest_key: tuple = (0, (), ())
+
+    @property
+    def version(self) -> int:
+        return self._current.index.version
+
+    def refresh(self) -> bool:
+        """Load the manifest if it differs from the served one, True when swapped.
+
+        Compared by version, segment list and deletions rather than only a
+        growing version, so a reset or rebuilt index is picked up too.
+        """
+        with self._refresh_lock:
+            try:
+                manifest = read_manifest(self.config.manifest_path)
+                deleted = manifest.get("deleted", {})
+                key = (
+                    manifest["version"],
+                    tuple(manifest["segments"]),
+                    tuple(sorted((k, tuple(v)) for k, v in deleted.items())),
+                )
+                if key == self._manifest_key:
+                    return False
+
+                segments = {
+                    name: (
+                        self._segments[name]
+                        if name in self._segments
+                        else TranscriptIndex.load(
+                            os.path.join(self.config.segment_dir, name), self.config
+                        )
+                    )
+                    for name in manifest["segments"]
+                }
+                index = SegmentedIndex(
+                    [segments[name] for name in manifest["segments"]],
+                    manifest["version"],
+                    self.config,
+                    [deleted.get(name, []) for name in manifest["segments"]],
+                )
+                warmed = index.warm()
+
+                with self._lock:
+                    old, self._current = self._current, _Handle(index)
+                    old.retired = True
+                    self._release_if_idle(old)
+                self._segments = segments
+                self._manifest_key = key
+                log_agt.info(
+                    f"Index: Swapped in version {index.version} ({len(index)} chunks, "
+                    f"{warmed / 2**20:.1f} MiB warmed) in process {os.getpid()}"
+                )
+                return True
+
+            except Exception as e:
+                # keep serving the current version, the next poll retries
+                LogException(e, "Index", log_agt)
+                return False
+
+    def _release_if_idle(self, handle: _Handle) -> None:
+        if handle.retired and handle.refs == 0 and handle.index is not None:
+            if handle.index.version:
+                log_agt.info(f"Index: Dropped version {handle.index.version}")
+            handle.index = None
+
+    @contextmanager
+    def acquire(self) -> Iterator[SegmentedIndex]:
+        with self._lock:
+            handle = self._current
+            handle.refs += 1
+        try:
+            yield handle.index
+        finally:
+            with self._lock:
+                handle.refs -= 1
+                self._release_if_idle(handle)
+
+    async def watch(self) -> None:
+        """Poll the manifest forever, meant to run as a background task."""
+        while True:
+            await asyncio.sleep(self.config.poll_interval_s)
+            await asyncio.to_thread(self.refresh)
+
+
+def publish_index(
+    documents: List[dict],
+    index_config: IndexConfig = IndexConfig(),
+    full: bool = False,
+) -> dict:
+    """Publish the new and changed documents as a new segment.
+
+    The manifest maps every indexed path to its segment, document id and
+    content hash. A document whose hash changed is indexed again and its old
+    copy marked deleted, so is every indexed path missing from `documents`
+    (removed, or a near duplicate by now). Segments left without a live
+    document are dropped. `full` (or going over `max_segments`, or a
+    manifest from before paths were tracked) rebuilds everything into a
+    single compacted segment instead. Returns the new manifest, or the
+    current one when nothing changed.
+    """
+    with manifest_lock(index_config.manifest_path):
+        manifest = read_manifest(index_config.manifest_path)
+        files = manifest.get("files", {})
+        current = {doc["path"]: doc for doc in documents}
+        changed = [
+            doc
+            for doc in documents
+            if files.get(doc["path"], {}).get("hash") != doc["hash"]
+        ]
+        stale = [
+            path
+            for path, entry in files.items()
+            if path not in current or current[path]["hash"] != entry["hash"]
+        ]
+        if not changed and not stale and not full:
+            return manifest
+
+        untracked = bool(manifest["segments"]) and "files" not in manifest
+        compact = (
+            full
+            or untracked
+            or len(manifest["segments"]) + bool(changed) > index_config.max_segments
+        )
+        if compact:
+            files, deleted, live, changed = {}, {}, [], documents
+        else:
+            files = dict(files)
+            deleted = {
+                name: list(doc_ids)
+                for name, doc_ids in manifest.get("deleted", {}).items()
+            }
+            for path in stale:
+                entry = files.pop(path)
+                deleted.setdefault(entry["segment"], []).append(entry["doc"])
+            in_use = {entry["segment"] for entry in files.values()}
+            live = [name for name in manifest["segments"] if name in in_use]
+            deleted = {name: sorted(deleted[name]) for name in live if name in deleted}
+
+        version = manifest["version"] + 1
+        if changed:
+            os.makedirs(index_config.segment_dir, exist_ok=True)
+            name = write_segment(
+                TranscriptIndex.build(changed, index_config),
+                index_config.segment_dir,
+                version,
+            )
+            live.append(name)
+            files.update(
+                {
+                    doc["path"]: {"segment": name, "doc": doc_id, "hash": doc["hash"]}
+                    for doc_id, doc in enumerate(changed)
+                }
+            )
+        now = time.time()
+        new_manifest = {
+            "version": version,
+            "segments": live,
+            "published_at": datetime.now().isoformat(timespec="seconds"),
+            "documents": len(files),
+            # path -> where its live copy is indexed and the hash it had then
+            "files": files,
+            # segment -> document ids replaced or removed since it was written
+            "deleted": deleted,
+            # segments that left the manifest, kept for `gc_grace_s` after this
+            "retired": {
+                **manifest.get("retired", {}),
+                **{old: now for old in manifest["segments"] if old not in live},
+            },
+        }
+        removed = collect_garbage(index_config, new_manifest)
+        write_manifest(index_config.manifest_path, new_manifest)
+    log_agt.info(
+        f"Index: Published version {version} with {len(live)} segments, "
+        f"{len(changed)} documents indexed, {len(stale)} replaced or removed"
+        + (f", deleted {len(removed)} old segments" if removed else "")
+    )
+    return new_manifest
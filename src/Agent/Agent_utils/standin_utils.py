@@ -0,0 +1,120 @@
+import re
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List
+
+from src.Agent.Agent_config import StandInConfig
+from src.Agent.Agent_constants import PromptData
+from src.Agent.Agent_utils.token_utils import tokenize
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def render_messages(messages: List[Dict[str, str]]) -> str:
+    """Chat template used by the stand-in, one tagged block per message."""
+    return "".join(f"<|{m['role']}|>\n{m['content']}\n" for m in messages)
+
+
+class PrefixCache:
+    """Block hashed, LRU evicted prompt prefix cache (vllm style automatic prefix caching).
+
+    Block `i` is keyed by the hash of its tokens chained with the key of
+    block `i - 1`, so a hit on block `i` implies the whole prefix up to it
+    matched. Only full blocks are cached.
+    """
+
+    def __init__(self, block_size: int, capacity: int) -> None:
+        self.block_size = block_size
+        self.capacity = capacity
+        self.blocks: OrderedDict = OrderedDict()
+
+    def lookup_and_insert(self, tokens: List[str]) -> int:
+        """Number of leading tokens already cached, then cache every full block."""
+        cached, parent, hit = 0, 0, True
+        for i in range(0, len(tokens) - self.block_size + 1, self.block_size):
+            key = hash((parent, tuple(tokens[i : i + self.block_size])))
+            if hit and key in self.blocks:
+                cached += self.block_size
+                self.blocks.move_to_end(key)
+            else:
+                hit = False
+                self.blocks[key] = True
+                if len(self.blocks) > self.capacity:
+                    self.blocks.popitem(last=False)
+            parent = key
+        return cached
+
+
+class StandInLLM:
+    """Local stand-in for the chat model backend.
+
+    Tokenises with the same approximation as the budgeting code, runs the
+    prompt through a prefix cache and prices the call with a simple
+    prefill / decode cost model, so prompt layouts can be compared without a
+    gpu. The answer is the first sentences of the best context passage.
+    """
+
+    def __init__(self, standin_config: StandInConfig = StandInConfig()) -> None:
+        self.config = standin_config
+        self.cache = PrefixCache(standin_config.block_size, standin_config.cache_blocks)
+        # the chat api calls `generate` from several threads
+        self._lock = threading.Lock()
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.calls = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    @staticmethod
+    def _answer(messages: List[Dict[str, str]], max_tokens: int) -> str:
+        content = messages[-1]["content"]
+        if not content.startswith(PromptData.CONTEXT_HEADER):
+            return "I could not find that in the transcripts."
+        context = content[len(PromptData.CONTEXT_HEADER) :].split("\n\n")[0]
+        # skip the `[1] title (source)` line
+        passage = context.strip().split("\n", 1)[-1]
+        words: List[str] = []
+        for sentence in _SENTENCE_RE.split(passage):
+            words.extend(sentence.split())
+            if len(words) >= max_tokens // 2:
+                break
+        return " ".join(words[: max_tokens // 2]) + " [1]" if words else ""
+
+    def generate(
+        self, messages: List[Dict[str, str]], max_tokens: int | None = None
+    ) -> dict:
+        max_tokens = max_tokens or self.config.max_tokens
+        tokens = tokenize(render_messages(messages))
+        text = self._answer(messages, max_tokens)
+        completion = len(tokenize(text))
+        with self._lock:
+            cached = self.cache.lookup_and_insert(tokens)
+            self.calls += 1
+            self.prompt_tokens += len(tokens)
+            self.cached_tokens += cached
+        prefill_ms = (len(tokens) - cached) * self.config.prefill_ms_per_token
+        return {
+            "text": text,
+            "prompt_tokens": len(tokens),
+            "cached_tokens": cached,
+            "completion_tokens": completion,
+            # time to first token is the prefill, then one decode step per token
+            "ttft_ms": prefill_ms,
+            "latency_ms": prefill_ms + completion * self.config.decode_ms_per_token,
+        }
+
+    async def stream(
+        self, messages: List[Dict[str, str]], max_tokens: int | None = None
+    ) -> AsyncIterator[str]:
+        """`generate`, but waits out the simulated prefill and decode and yields
+        the answer word by word, for load tests that measure time to first token."""
+        reply = self.generate(messages, max_tokens)
+        await asyncio.sleep(reply["ttft_ms"] / 1000)
+        words = reply["text"].split(" ")
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(self.config.decode_ms_per_token / 1000)
+            yield word if i == len(words) - 1 else f"{word} "
@@ -0,0 +1,22 @@
+import re
+from typing import List
+
+from src.Agent.Agent_constants import LexicalData
+
+# words and single punctuation marks, within ~10% of a bpe token count on english
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_TERM_RE = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Approximate llm tokens, used for budgeting and by the stand-in model."""
+    return _TOKEN_RE.findall(text)
+
+
+def count_tokens(text: str) -> int:
+    return sum(1 for _ in _TOKEN_RE.finditer(text))
+
+
+def index_terms(text: str) -> List[str]:
+    """Lower cased search terms without stopwords, for the lexical index."""
+    return [t for t in _TERM_RE.findall(text.lower()) if t not in LexicalData.STOPWORDS]
@@ -0,0 +1,96 @@
+import os
+from typing import Dict
+
+from src.Agent.Agent_constants import AgentData
+
+
+class SLOConfig:
+    def __init__(
+        self,
+        p95_ttft_ms: float = 1000.0,
+        p99_ttft_ms: float = 2000.0,
+        p95_latency_ms: float = 4000.0,
+        p99_latency_ms: float = 6000.0,
+        min_throughput_rps: float | None = None,
+        max_error_rate: float = 0.01,
+        max_worker_rss_mb: float = 1024.0,
+        max_worker_uss_mb: float = 512.0,
+        max_worker_ready_ms: float = 1000.0,
+    ) -> None:
+        # a load test fails if any of these is crossed
+        self.p95_ttft_ms = p95_ttft_ms
+        self.p99_ttft_ms = p99_ttft_ms
+        self.p95_latency_ms = p95_latency_ms
+        self.p99_latency_ms = p99_latency_ms
+        # None: derived from the offered load, see `throughput_floor`
+        self.min_throughput_rps = min_throughput_rps
+        self.max_error_rate = max_error_rate
+        self.max_worker_rss_mb = max_worker_rss_mb
+        # rss counts the shared index pages in every worker, uss only private memory
+        self.max_worker_uss_mb = max_worker_uss_mb
+        # lifespan start up (index mapped and warmed) of the slowest worker
+        self.max_worker_ready_ms = max_worker_ready_ms
+
+
+class LoadTestConfig:
+    def __init__(
+        self,
+        users: int = 20,
+        duration_s: float = 60.0,
+        ramp_up_s: float = 5.0,
+        think_time_s: tuple = (0.5, 3.0),
+        session_share: float = 0.6,
+        timeout_s: float = 30.0,
+        seed: int = 42,
+        url: str | None = None,
+        slo_config: SLOConfig = SLOConfig(),
+    ) -> None:
+        # concurrent virtual users, started evenly over `ramp_up_s`
+        self.users = users
+        self.duration_s = duration_s
+        self.ramp_up_s = ramp_up_s
+        # uniform pause between a user's requests
+        self.think_time_s = think_time_s
+        # share of visits that are multi turn sessions, the rest ask one question
+        self.session_share = session_share
+        self.timeout_s = timeout_s
+        # same seed, same question sequence per user
+        self.seed = seed
+        # target an already running server, otherwise one is started locally
+        self.url = url
+        self.slo = slo_config
+        self.report_path = os.path.join(AgentData.REPORT_DIR, "loadtest_report.json")
+
+
+class RetrievalBenchConfig:
+    def __init__(
+        self,
+        ks: tuple = (1, 3, 5, 10),
+        search_k: int = 50,
+        repeats: int = 5,
+        golden_path: str | None = None,
+        variants: Dict[str, dict] | None = None,
+    ) -> None:
+        # cut offs for recall@k, counted in distinct episodes not chunks
+        self.ks = ks
+        # chunks fetched per query, enough to fill the largest k with episodes
+        self.search_k = search_k
+        # per query latency is the median of this many timed searches
+        self.repeats = repeats
+        # json golden set (`{version, questions}`) instead of `GoldenSet`
+        self.golden_path = golden_path
+        # `IndexConfig` overrides per variant, chunking changes rebuild the
+        # index, fusion weights reuse it. The published index is added as `live`
+        self.variants = variants or {
+            "hybrid": {},
+            "lexical": {"dense_weight": 0.0},
+            "dense": {"lexical_weight": 0.0},
+            "hybrid-lexical-heavy": {"dense_weight": 0.25},
+            "hybrid-even": {"dense_weight": 1.0},
+            "hybrid-rrf-20": {"rrf_k": 20},
+            "hybrid-chunk-120": {"chunk_words": 120, "overlap_words": 20},
+            "hybrid-chunk-300": {"chunk_words": 300, "overlap_words": 50},
+            "hybrid-no-overlap": {"overlap_words": 0},
+            "hybrid-dense-512": {"dense_dim": 512},
+        }
+        self.report_path = os.path.join(AgentData.REPORT_DIR, "retrieval_report.json")
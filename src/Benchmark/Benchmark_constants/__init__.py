@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class GoldenSet:
+    # bump on every edit, reports carry it so only same-version runs are compared
+    VERSION = "2026.10-2"
+    # `expected`: the 1-3 episodes that answer the question, as
+    # `<source>/<episode id>`, the id being the `<season key>E<nn>` prefix of
+    # the transcript file name (`S02E04-Title.txt` -> `youtube/S02E04`)
+    QUESTIONS = [
+        {
+            "id": "ni-vs-ne",
+            "question": "What is the difference between Ni and Ne?",
+            "expected": ["youtube/S01E04", "youtube/S01E05"],
+        },
+        {
+            "id": "four-sides",
+            "question": "What are the four sides of the mind?",
+            "expected": ["youtube/S02E01"],
+        },
+        {
+            "id": "subconscious",
+            "question": "What is the subconscious side of the mind?",
+            "expected": ["youtube/S02E03"],
+        },
+        {
+            "id": "unconscious",
+            "question": "How does the unconscious side affect relationships?",
+            "expected": ["youtube/S02E04"],
+        },
+        {
+            "id": "interaction-styles",
+            "question": "Explain the interaction styles.",
+            "expected": ["youtube/S01E18", "youtube/S01E19"],
+        },
+        {
+            "id": "golden-pair",
+            "question": "What does CS Joseph say about the golden pair?",
+            "expected": ["youtube/S03E02"],
+        },
+        {
+            "id": "pedagogue-pair",
+            "question": "What is a pedagogue pair?",
+            "expected": ["youtube/S03E03"],
+        },
+        {
+            "id": "hero-function",
+            "question": "What is the hero function?",
+            "expected": ["youtube/S01E10"],
+        },
+        {
+            "id": "inferior-function",
+            "question": "How does the inferior function show up under stress?",
+            "expected": ["youtube/S01E13"],
+        },
+        {
+            "id": "demon-function",
+            "question": "What is the demon function?",
+            "expected": ["youtube/S01E17"],
+        },
+        {
+            "id": "cognitive-transitions",
+            "question": "What are cognitive transitions?",
+            "expected": ["youtube/S04E01", "youtube/S04E02"],
+        },
+        {
+            "id": "temples",
+            "question": "What are the four temples?",
+            "expected": ["youtube/S05E01"],
+        },
+        {
+            "id": "quadras",
+            "question": "What are the quadras and how do they differ?",
+            "expected": ["youtube/S03E06"],
+        },
+        {
+            "id": "infj",
+            "question": "What is the INFJ's biggest blind spot?",
+            "expected": ["youtube/S06E07"],
+        },
+        {
+            "id": "intj",
+            "question": "How does an INTJ make decisions?",
+            "expected": ["youtube/S06E08"],
+        },
+        {
+            "id": "estp",
+            "question": "What motivates an ESTP?",
+            "expected": ["youtube/S06E13"],
+        },
+        {
+            "id": "enfp",
+            "question": "Why do ENFPs struggle with follow through?",
+            "expected": ["youtube/S06E02"],
+        },
+        {
+            "id": "istp",
+            "question": "What is the ISTP's demon function?",
+            "expected": ["youtube/S06E09"],
+        },
+    ]
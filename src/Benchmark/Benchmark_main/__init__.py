@@ -0,0 +1,279 @@
+import os
+import json
+import time
+import asyncio
+import httpx
+import numpy as np
+from typing import List
+
+from src.API.API_config import ServerConfig
+from src.Agent.Agent_main import ToolAgent
+from src.Agent.Agent_utils import (
+    IndexManager,
+    LLMGateway,
+    TranscriptIndex,
+    load_corpus,
+    read_manifest,
+)
+from src.Agent.Agent_config import GatewayConfig, IndexConfig
+from src.Agent.Agent_constants import AgentData, SampleSessions
+from src.Benchmark.Benchmark_config import LoadTestConfig, RetrievalBenchConfig
+from src.Benchmark.Benchmark_utils import (
+    LocalServer,
+    free_port,
+    run_load_test,
+    evaluate_index,
+    load_golden_set,
+)
+
+from src.Logging.logger import log_flk, log_agt
+from src.Exception.exception import CustomException, LogException
+
+
+class LoadTester:
+    """Drive the streamed chat endpoint with concurrent virtual users and
+    check latency / throughput / memory against the SLOs.
+
+    Without `load_config.url` the API is started locally with the stand-in
+    model and the current transcript index, so runs are reproducible.
+    """
+
+    def __init__(
+        self,
+        load_config: LoadTestConfig = LoadTestConfig(),
+        workers: int = 1,
+    ) -> None:
+        self.load_config = load_config
+        self.server_config = ServerConfig(port=free_port(), workers=workers)
+
+    def run(self) -> dict:
+        try:
+            if self.load_config.url:
+                report = asyncio.run(
+                    run_load_test(
+                        self.load_config.url,
+                        self.load_config,
+                        self.server_config.workers,
+                    )
+                )
+            else:
+                with LocalServer(self.server_config) as server:
+                    report = asyncio.run(
+                        run_load_test(
+                            server.url, self.load_config, self.server_config.workers
+                        )
+                    )
+
+            os.makedirs(os.path.dirname(self.load_config.report_path), exist_ok=True)
+            with open(self.load_config.report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            log_flk.info(
+                f"Load: {report['requests']} requests, {report['throughput_rps']} rps, "
+                f"ttft p95 {report['ttft_ms']['p95']}ms, latency p95 "
+                f"{report['latency_ms']['p95']}ms"
+            )
+            log_flk.info(
+                f"Load: {len(report['workers'])} workers, max uss "
+                f"{report['max_worker_uss_mb']} MiB, slowest ready in "
+                f"{report['max_worker_ready_ms']}ms"
+            )
+            for violation in report["violations"]:
+                log_flk.info(f"Load: SLO violated: {violation}")
+            return report
+
+        except Exception as e:
+            LogException(e, "Load", log_flk)
+            raise CustomException(e)
+
+
+class GatewayCheck:
+    """Exercise the llm gateway against the local stub backend.
+
+    1. a burst of identical temperature 0 requests, coalesced into one call
+    2. the same burst again, served from the cache
+    3. more distinct requests than `max_concurrency`, the extra ones queue
+    4. agent turns whose two corpus searches run concurrently
+
+    and report the per-call latency breakdowns.
+    """
+
+    def __init__(
+        self,
+        burst: int = 16,
+        max_concurrency: int = 4,
+        report_path: str = os.path.join(AgentData.REPORT_DIR, "gateway_report.json"),
+    ) -> None:
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.report_path = report_path
+
+    @staticmethod
+    def _summary(results: List[dict]) -> dict:
+        timings = [r["timing"] for r in results]
+        served = [t["served_by"] for t in timings]
+        return {
+            "calls": len(results),
+            "served_by": {k: served.count(k) for k in sorted(set(served))},
+            "queue_ms_p50": round(
+                float(np.median([t["queue_ms"] for t in timings])), 1
+            ),
+            "backend_ms_p50": round(
+                float(np.median([t["backend_ms"] for t in timings])), 1
+            ),
+            "total_ms_max": round(max(t["total_ms"] for t in timings), 1),
+        }
+
+    async def _run(self, base_url: str) -> dict:
+        config = GatewayConfig(
+            base_url=f"{base_url}/v1", max_concurrency=self.max_concurrency
+        )
+        async with LLMGateway(config) as gateway:
+            same = [{"role": "user", "content": SampleSessions.SINGLE_QUESTIONS[0]}]
+            burst = [gateway.complete(same) for _ in range(self.burst)]
+            coalesced = self._summary(await asyncio.gather(*burst))
+            cached = self._summary(
+                await asyncio.gather(
+                    *(gateway.complete(same) for _ in range(self.burst))
+                )
+            )
+            distinct = self._summary(
+                await asyncio.gather(
+                    *(
+                        gateway.complete([{"role": "user", "content": f"{q} ({i})"}])
+                        for i, q in enumerate(SampleSessions.SINGLE_QUESTIONS * 2)
+                    )
+                )
+            )
+
+            agent = ToolAgent(gateway=gateway)
+            turns = [
+                await agent.run_turn(session[0]) for session in SampleSessions.SESSIONS
+            ]
+            async with httpx.AsyncClient(base_url=base_url) as client:
+                backend = (await client.get("/stats")).json()
+
+        return {
+            "coalesced_burst": coalesced,
+            "cached_burst": cached,
+            "distinct_burst": distinct,
+            "agent_turns": turns,
+            "gateway_stats": gateway.stats,
+            "backend_requests": backend["requests"],
+        }
+
+    def run(self) -> dict:
+        try:
+            server_config = ServerConfig(port=free_port(), app="src.API.API_stub:app")
+            with LocalServer(server_config) as server:
+                report = asyncio.run(self._run(server.url))
+
+            os.makedirs(os.path.dirname(self.report_path), exist_ok=True)
+            with open(self.report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            log_flk.info(
+                f"Gateway: {report['gateway_stats']['requests']} calls, "
+                f"{report['backend_requests']} reached the backend"
+            )
+            return report
+
+        except Exception as e:
+            LogException(e, "Gateway", log_flk)
+            raise CustomException(e)
+
+
+class RetrievalBenchmark:
+    """recall@k / MRR / latency / memory of retrieval variants on the golden set.
+
+    Every variant of `bench_config.variants` is an `IndexConfig` built over
+    the current corpus; variants that only change fusion settings share one
+    build. The published index (what the chat API serves) is scored as
+    `live` when a manifest exists.
+    """
+
+    def __init__(
+        self,
+        bench_config: RetrievalBenchConfig = RetrievalBenchConfig(),
+        variants: List[str] | None = None,
+    ) -> None:
+        self.bench_config = bench_config
+        self.variants = {
+            name: overrides
+            for name, overrides in bench_config.variants.items()
+            if variants is None or name in variants
+        }
+
+    def _score(self, name: str, index, golden: dict, **extra) -> dict:
+        result = evaluate_index(index, golden, self.bench_config)
+        result = {
+            "chunks": len(index),
+            "index_mb": round(index.nbytes / 2**20, 2),
+            **extra,
+            **result,
+        }
+        recall = " ".join(f"@{k} {v:.2f}" for k, v in result["recall_at"].items())
+        log_agt.info(
+            f"Bench: {name:<22} recall {recall} | mrr {result['mrr']:.3f} | "
+            f"p50 {result['latency_ms']['p50']:.2f}ms p95 {result['latency_ms']['p95']:.2f}ms | "
+            f"{result['index_mb']:.1f} MiB"
+        )
+        return result
+
+    def run(self) -> dict:
+        try:
+            golden = load_golden_set(self.bench_config.golden_path)
+            documents = load_corpus()
+            log_agt.info(
+                f"Bench: Golden set {golden['version']} ({len(golden['questions'])} "
+                f"questions) over {len(documents)} transcripts"
+            )
+            results, builds = {}, {}
+            for name, overrides in self.variants.items():
+                index_config = IndexConfig(**overrides)
+                key = (
+                    index_config.chunk_words,
+                    index_config.overlap_words,
+                    index_config.dense_dim,
+                )
+                if key not in builds:
+                    start = time.perf_counter()
+                    built = TranscriptIndex.build(documents, index_config)
+                    builds[key] = (built, time.perf_counter() - start)
+                built, build_s = builds[key]
+                # same arrays, this variant's fusion settings
+                index = TranscriptIndex(built.arrays, built.docs, index_config)
+                results[name] = self._score(
+                    name,
+                    index,
+                    golden,
+                    config=overrides,
+                    build_s=round(build_s, 3),
+                )
+
+            if read_manifest(AgentData.MANIFEST_PATH)["version"]:
+                manager = IndexManager()
+                manager.refresh()
+                with manager.acquire() as index:
+                    results["live"] = self._score(
+                        "live", index, golden, version=index.version
+                    )
+
+            # the golden set no longer fits the corpus, pinned episodes renamed or gone
+            unmatched = sorted({q for r in results.values() for q in r["unmatched"]})
+            report = {
+                "golden_version": golden["version"],
+                "documents": len(documents),
+                "unmatched": unmatched,
+                "passed": not unmatched,
+                "ks": list(self.bench_config.ks),
+                "variants": results,
+            }
+            os.makedirs(os.path.dirname(self.bench_config.report_path), exist_ok=True)
+            with open(self.bench_config.report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            for question in unmatched:
+                log_agt.info(f"Bench: Failed '{question}', no expected episode indexed")
+            return report
+
+        except Exception as e:
+            LogException(e, "Bench", log_agt)
+            raise CustomException(e)
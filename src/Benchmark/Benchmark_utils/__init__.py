@@ -0,0 +1,10 @@
+from src.Benchmark.Benchmark_utils.loadtest_utils import (
+    LocalServer,
+    free_port,
+    check_slos,
+    run_load_test,
+)
+from src.Benchmark.Benchmark_utils.retrieval_utils import (
+    evaluate_index,
+    load_golden_set,
+)
@@ -0,0 +1,234 @@
+import sys
+import time
+import uuid
+import random
+import socket
+import asyncio
+import subprocess
+import httpx
+import numpy as np
+from typing import Dict, List
+
+from src.API.API_config import ServerConfig
+from src.Benchmark.Benchmark_config import LoadTestConfig, SLOConfig
+from src.Agent.Agent_constants import SampleSessions
+
+from src.Logging.logger import log_flk
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LocalServer:
+    """Start the chat API with uvicorn in a subprocess and wait until it is healthy."""
+
+    def __init__(self, server_config: ServerConfig = ServerConfig()) -> None:
+        self.config = server_config
+        self.process: subprocess.Popen | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.config.host}:{self.config.port}"
+
+    def start(self, timeout_s: float = 60.0) -> str:
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                self.config.app,
+                "--host",
+                self.config.host,
+                "--port",
+                str(self.config.port),
+                "--workers",
+                str(self.config.workers),
+                "--log-level",
+                "warning",
+            ]
+        )
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {self.process.returncode}")
+            try:
+                if httpx.get(f"{self.url}/health", timeout=1.0).status_code == 200:
+                    return self.url
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise TimeoutError(f"Server not healthy after {timeout_s}s")
+
+    def stop(self) -> None:
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+    def __enter__(self) -> "LocalServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+
+def pick_visit(rng: random.Random, session_share: float) -> List[str]:
+    """Questions of one visit: a whole multi turn session or a single question."""
+    if rng.random() < session_share:
+        return rng.choice(SampleSessions.SESSIONS)
+    return [rng.choice(SampleSessions.SINGLE_QUESTIONS)]
+
+
+async def ask(client: httpx.AsyncClient, session_id: str, question: str) -> dict:
+    """One streamed chat request, timed to the first and the last body chunk."""
+    start = time.perf_counter()
+    ttft, words = None, 0
+    try:
+        async with client.stream(
+            "POST",
+            "/chat/stream",
+            json={"session_id": session_id, "question": question},
+        ) as response:
+            response.raise_for_status()
+            async for piece in response.aiter_text():
+                if ttft is None and piece:
+                    ttft = time.perf_counter() - start
+                words += len(piece.split())
+        return {
+            "ok": True,
+            "ttft_ms": (ttft if ttft is not None else time.perf_counter() - start)
+            * 1e3,
+            "latency_ms": (time.perf_counter() - start) * 1e3,
+            "words": words,
+        }
+    except httpx.HTTPError as e:
+        return {"ok": False, "error": str(e) or type(e).__name__}
+
+
+async def virtual_user(
+    user_id: int, base_url: str, config: LoadTestConfig, deadline: float
+) -> List[dict]:
+    rng = random.Random(config.seed + user_id)
+    await asyncio.sleep(config.ramp_up_s * user_id / max(config.users, 1))
+    results = []
+    # one keep-alive connection per user, follow ups usually land on the same worker
+    async with httpx.AsyncClient(base_url=base_url, timeout=config.timeout_s) as client:
+        while time.monotonic() < deadline:
+            session_id = uuid.UUID(int=rng.getrandbits(128)).hex
+            for turn, question in enumerate(pick_visit(rng, config.session_share), 1):
+                if time.monotonic() >= deadline:
+                    break
+                result = await ask(client, session_id, question)
+                results.append({"user": user_id, "turn": turn, **result})
+                await asyncio.sleep(rng.uniform(*config.think_time_s))
+    return results
+
+
+async def worker_memory(base_url: str, polls: int) -> Dict[int, dict]:
+    """Latest `/metrics` per worker pid (memory, startup time), fresh
+    connections so the polls spread over workers."""
+    memory: Dict[int, dict] = {}
+    for _ in range(polls):
+        async with httpx.AsyncClient(base_url=base_url, timeout=5.0) as client:
+            try:
+                data = (await client.get("/metrics")).json()
+                memory[data.pop("pid")] = data
+            except httpx.HTTPError:
+                continue
+    return memory
+
+
+def percentiles(values: List[float], digits: int = 1) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50": round(float(p50), digits),
+        "p95": round(float(p95), digits),
+        "p99": round(float(p99), digits),
+    }
+
+
+def throughput_floor(config: LoadTestConfig) -> float:
+    """Requests per second the users send when every request takes the p95
+    latency SLO, less the ramp up. A server inside its latency SLOs serves
+    about this much or more, users who think longer can never send more."""
+    mean_think_s = sum(config.think_time_s) / 2
+    cycle_s = mean_think_s + config.slo.p95_latency_ms / 1e3
+    active = 1.0 - min(config.ramp_up_s / 2, config.duration_s) / config.duration_s
+    return round(config.users / cycle_s * active, 2)
+
+
+def check_slos(report: dict, slo: SLOConfig) -> List[str]:
+    checks = [
+        ("p95 ttft", report["ttft_ms"]["p95"], slo.p95_ttft_ms, "max"),
+        ("p99 ttft", report["ttft_ms"]["p99"], slo.p99_ttft_ms, "max"),
+        ("p95 latency", report["latency_ms"]["p95"], slo.p95_latency_ms, "max"),
+        ("p99 latency", report["latency_ms"]["p99"], slo.p99_latency_ms, "max"),
+        ("throughput", report["throughput_rps"], report["min_throughput_rps"], "min"),
+        ("error rate", report["error_rate"], slo.max_error_rate, "max"),
+        ("worker rss", report["max_worker_rss_mb"], slo.max_worker_rss_mb, "max"),
+        ("worker uss", report["max_worker_uss_mb"], slo.max_worker_uss_mb, "max"),
+        ("worker ready", report["max_worker_ready_ms"], slo.max_worker_ready_ms, "max"),
+    ]
+    return [
+        f"{name} {value} {'>' if kind == 'max' else '<'} {limit}"
+        for name, value, limit, kind in checks
+        if (value > limit if kind == "max" else value < limit)
+    ]
+
+
+async def run_load_test(base_url: str, config: LoadTestConfig, workers: int) -> dict:
+    log_flk.info(
+        f"Load: {config.users} users for {config.duration_s:.0f}s against {base_url}"
+    )
+    start = time.monotonic()
+    deadline = start + config.duration_s
+    per_user = await asyncio.gather(
+        *(virtual_user(u, base_url, config, deadline) for u in range(config.users))
+    )
+    elapsed = time.monotonic() - start
+    results = [r for user in per_user for r in user]
+    ok = [r for r in results if r["ok"]]
+    memory = await worker_memory(base_url, polls=max(8, 4 * workers))
+
+    report = {
+        "users": config.users,
+        "duration_s": round(elapsed, 1),
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "error_rate": round((len(results) - len(ok)) / max(len(results), 1), 4),
+        "throughput_rps": round(len(ok) / elapsed, 2),
+        "min_throughput_rps": (
+            config.slo.min_throughput_rps
+            if config.slo.min_throughput_rps is not None
+            else throughput_floor(config)
+        ),
+        "throughput_wps": round(sum(r["words"] for r in ok) / elapsed, 1),
+        "ttft_ms": percentiles([r["ttft_ms"] for r in ok]),
+        "latency_ms": percentiles([r["latency_ms"] for r in ok]),
+        "follow_up_latency_ms": percentiles(
+            [r["latency_ms"] for r in ok if r["turn"] > 1]
+        ),
+        "workers": {str(pid): metrics for pid, metrics in sorted(memory.items())},
+        "max_worker_rss_mb": max(
+            (m["peak_rss_mb"] for m in memory.values()), default=0.0
+        ),
+        # private memory only, the mapped index is shared between workers
+        "max_worker_uss_mb": max(
+            (m.get("uss_mb", 0.0) for m in memory.values()), default=0.0
+        ),
+        "max_worker_ready_ms": max(
+            (m.get("ready_ms", 0.0) for m in memory.values()), default=0.0
+        ),
+    }
+    report["violations"] = check_slos(report, config.slo)
+    report["passed"] = not report["violations"]
+    return report
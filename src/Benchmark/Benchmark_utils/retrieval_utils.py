@@ -0,0 +1,103 @@
+import os
+import json
+import time
+import numpy as np
+
+from src.Benchmark.Benchmark_config import RetrievalBenchConfig
+from src.Benchmark.Benchmark_constants import GoldenSet
+from src.Benchmark.Benchmark_utils.loadtest_utils import percentiles
+
+
+def load_golden_set(golden_path: str | None = None) -> dict:
+    """`{version, questions}`, from `golden_path` or the built in `GoldenSet`."""
+    if golden_path is None:
+        golden = {"version": GoldenSet.VERSION, "questions": GoldenSet.QUESTIONS}
+    else:
+        with open(golden_path, "r", encoding="utf-8") as f:
+            golden = json.load(f)
+        if not golden.get("version") or not golden.get("questions"):
+            raise ValueError(f"'{golden_path}' needs a `version` and `questions`")
+    for question in golden["questions"]:
+        expected = question.get("expected") or []
+        # pinned episodes, not title patterns that match half the corpus
+        if not 1 <= len(expected) <= 3 or not all("/" in e for e in expected):
+            raise ValueError(
+                f"'{question.get('id')}' needs 1-3 `<source>/<episode id>` expected"
+            )
+    return golden
+
+
+def episode_id(doc: dict) -> str:
+    """`<source>/<episode id>` of a transcript, `S02E04-Title.txt` -> `youtube/S02E04`."""
+    stem = os.path.splitext(os.path.basename(doc["path"]))[0]
+    return f"{doc['source']}/{stem.split('-', 1)[0]}"
+
+
+def evaluate_query(index, question: dict, bench_config) -> dict:
+    """Search `question` on `index`, rank its episodes against the expected
+    ones and time the search."""
+    latencies = []
+    for _ in range(bench_config.repeats):
+        start = time.perf_counter()
+        chunks = index.search(question["question"], k=bench_config.search_k)
+        latencies.append((time.perf_counter() - start) * 1e3)
+
+    # rank episodes by their best chunk, an episode counts once
+    episodes = []
+    for chunk in chunks:
+        episode = episode_id(index.docs[chunk.doc_id])
+        if episode not in episodes:
+            episodes.append(episode)
+
+    expected = question["expected"]
+    found = {e: episodes.index(e) + 1 for e in expected if e in episodes}
+    first_hit = min(found.values(), default=None)
+    return {
+        "id": question["id"],
+        "recall": {
+            k: sum(rank <= k for rank in found.values()) / len(expected)
+            for k in bench_config.ks
+        },
+        "reciprocal_rank": 1.0 / first_hit if first_hit else 0.0,
+        "first_hit": first_hit,
+        "latency_ms": round(float(np.median(latencies)), 3),
+        "top": episodes[: max(bench_config.ks)],
+    }
+
+
+def evaluate_index(
+    index, golden: dict, bench_config: RetrievalBenchConfig = RetrievalBenchConfig()
+) -> dict:
+    """recall@k, MRR and search latency of `index` over the golden questions.
+
+    Expected episodes missing from the index count as misses. Questions
+    with none of them indexed score zero and are listed as `unmatched`, a
+    golden set that no longer fits the corpus is a failure, not a skip.
+    """
+    indexed = {episode_id(doc) for doc in index.live_docs}
+    # one untimed search so lazy work (page faults, caches) is not billed to query 1
+    index.search(golden["questions"][0]["question"], k=bench_config.search_k)
+
+    per_query, unmatched = [], []
+    for question in golden["questions"]:
+        result = evaluate_query(index, question, bench_config)
+        result["missing"] = [e for e in question["expected"] if e not in indexed]
+        if len(result["missing"]) == len(question["expected"]):
+            unmatched.append(question["id"])
+        per_query.append(result)
+
+    latencies = [q["latency_ms"] for q in per_query]
+    return {
+        "queries": len(per_query),
+        "unmatched": unmatched,
+        "recall_at": {
+            k: round(float(np.mean([q["recall"][k] for q in per_query])), 3)
+            for k in bench_config.ks
+        },
+        "mrr": round(float(np.mean([q["reciprocal_rank"] for q in per_query])), 3),
+        "latency_ms": {
+            **percentiles(latencies, digits=2),
+            "mean": round(float(np.mean(latencies)), 2),
+        },
+        "per_query": per_query,
+    }
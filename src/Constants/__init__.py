@@ -7,3 +7,10 @@ class mongo_db_dc:
     DATABASE_NAME = "RealWorldProjects"
     COLLECTION_NAME_YUTU = "JAPRAGYouTube"
     COLLECTION_NAME_BLOG = "JAPRAGBlog"
+    COLLECTION_NAME_JOBS = "JAPRAGJobs"
+
+
+@dataclass
+class profile_dc:
+    PROFILE_DIR = "src/Data/4_Reports/profiles"
+    STAGES = ["metadata_load", "duplicate_check", "discovery", "fetch", "save"]
@@ -18,11 +18,13 @@ from crawl4ai import (
     FilterChain,
 )
 
-from src.ETL.ETL_constants import RawData, BlogJSONSchema
+from src.ETL.ETL_constants import RawData, BlogJSONSchema, ETLState, DedupData
+from src.Utils.profile_utils import staged
 
 
 class MetadataConfig:
     def __init__(self, source: Literal["video", "blog"] = "video"):
+        @staged("metadata_load")
         def _get_dataframe(sheet_list: list[str]) -> pd.DataFrame:
             df_csj, df_rp = [
                 pd.read_excel(
@@ -70,12 +72,85 @@ class ProxyConfig:
             )
 
 
+class RetryConfig:
+    def __init__(
+        self,
+        max_retries: int = 4,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+        max_workers: int = 10,
+    ) -> None:
+        # attempts per item before it is moved to the dead letter list
+        self.max_retries = max_retries
+        # full-jitter exponential backoff: uniform(0, min(max, base * 2**attempt))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_workers = max_workers
+        self.dead_letter_path = ETLState.DEAD_LETTER_PATH
+
+
+class DedupConfig:
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 3,
+        threshold: float = 0.5,
+        seed: int = 42,
+        max_bucket: int = 64,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError(
+                f"num_perm ({num_perm}) must be divisible by bands ({bands})"
+            )
+        self.num_perm = num_perm
+        # `bands` x `rows` LSH banding, candidates start to collide around (1/bands)**(1/rows)
+        self.bands = bands
+        self.rows = num_perm // bands
+        # word n-grams, auto captions and edited blog text rarely share long ones
+        self.shingle_size = shingle_size
+        # estimated jaccard needed for a candidate pair to count as duplicate
+        self.threshold = threshold
+        self.seed = seed
+        # larger LSH buckets are linked through their first doc, not pairwise
+        self.max_bucket = max_bucket
+        self.source_dirs = DedupData.SOURCE_DIRS
+        self.index_path = DedupData.INDEX_PATH
+        self.report_path = DedupData.REPORT_PATH
+
+
+class OrchestratorConfig:
+    def __init__(
+        self,
+        domain_limits: Dict[str, int] | None = None,
+        min_interval: Dict[str, float] | None = None,
+        global_budget: int = 16,
+    ) -> None:
+        # max in-flight requests per domain, `default` covers anything unlisted
+        self.domain_limits = domain_limits or {
+            "youtube.com": 10,
+            "csjoseph.life": 5,
+            "skool.com": 2,
+            "default": 2,
+        }
+        # politeness: min seconds between two request starts on the same domain
+        self.min_interval = min_interval or {
+            "youtube.com": 0.2,
+            "csjoseph.life": 1.0,
+            "skool.com": 2.0,
+            "default": 1.0,
+        }
+        # max in-flight requests across every source, domain limits are scaled down to fit
+        self.global_budget = global_budget
+
+
 class CSJWebScrapeConfig:
     def __init__(self, max_parallel: int = 2, len_list: int = 0) -> None:
         self.browser_config = BrowserConfig(
             browser_type="chromium",
             headless=True,  # False,  #
             verbose=False,
+            light_mode=True,  # no background features, extensions, sync ...
         )
         # strat to get initial links
         json_extract_strat_init = JsonCssExtractionStrategy(
@@ -101,6 +176,13 @@ class CSJWebScrapeConfig:
             js_code=[BlogJSONSchema.JS_WAIT_TIME],
             exclude_external_links=True,
         )
+        # run config for a single pagination page, one reused tab walks the pages
+        self.run_config_init_page = CrawlerRunConfig(
+            cache_mode=CacheMode.BYPASS,
+            extraction_strategy=json_extract_strat_init,
+            js_code=[BlogJSONSchema.JS_WAIT_TIME],
+            session_id="csj_discovery",
+        )
         # run config for transcript
         self.run_config_tran = CrawlerRunConfig(
             cache_mode=CacheMode.BYPASS,
@@ -128,6 +210,39 @@ class CSJWebScrapeConfig:
         )
 
 
+class DiscoveryConfig:
+    def __init__(self, full_crawl_days: int = 30, max_pages: int = 50) -> None:
+        # a season is deep crawled again once its last full crawl is this old
+        self.full_crawl_days = full_crawl_days
+        # safety stop for incremental pagination
+        self.max_pages = max_pages
+        self.watermark_path = ETLState.WATERMARK_PATH
+
+
+class JobQueueConfig:
+    def __init__(
+        self,
+        lease_s: float = 120.0,
+        heartbeat_s: float = 30.0,
+        max_attempts: int = 4,
+        poll_s: float = 5.0,
+        batch_size: int = 8,
+    ) -> None:
+        if heartbeat_s >= lease_s:
+            raise ValueError(
+                f"heartbeat_s ({heartbeat_s}) must be shorter than lease_s ({lease_s})"
+            )
+        # a claimed job goes back to the queue when its lease is not renewed in time
+        self.lease_s = lease_s
+        self.heartbeat_s = heartbeat_s
+        # claims per job (crashed leases included) before it is marked failed
+        self.max_attempts = max_attempts
+        # idle wait while other workers still hold leases
+        self.poll_s = poll_s
+        # blog jobs are claimed this many at a time, one browser batch each
+        self.batch_size = batch_size
+
+
 class RPWebScrapeConfig:  # This is placeholder. Needs to be updated later
     def __init__(self, max_parallel: int = 2, len_list: int = 0) -> None:
         self.browser_config = BrowserConfig(
@@ -16,6 +16,45 @@ class RawData:
     RAW_RP_BLOG = "src/Data/1_Raw/RP/Blog"
 
 
+@dataclass
+class ETLState:
+    DEAD_LETTER_PATH = "src/Data/0_State/dead_letter.json"
+    WATERMARK_PATH = "src/Data/0_State/blog_watermarks.json"
+
+
+@dataclass
+class ArchiveData:
+    # gzip'd raw html stored by sha256, `<dir>/<sha[:2]>/<sha>.html.gz`
+    HTML_DIR = "src/Data/0_Archive/html"
+    # json lines, one `{url, sha, fetched_at, file_name, save_dir}` per changed fetch
+    INDEX_PATH = "src/Data/0_Archive/html_index.jsonl"
+
+
+@dataclass
+class DedupData:
+    INDEX_PATH = "src/Data/2_Dedup/minhash_index.npz"
+    REPORT_PATH = "src/Data/2_Dedup/dedup_report.json"
+    # listed in order of preference when picking a cluster's canonical document
+    SOURCE_DIRS = [RawData.RAW_CSJ_FREE, RawData.RAW_CSJ_BLOG]
+
+
+@dataclass
+class BrowserBlocking:
+    # never read by the css extraction, always blocked
+    RESOURCE_TYPES = [
+        "image",
+        "media",
+        "font",
+        "stylesheet",
+        "texttrack",
+        "manifest",
+        "eventsource",
+        "websocket",
+    ]
+    # only blocked when they come from another site (ads, analytics, embeds)
+    THIRD_PARTY_TYPES = ["script", "xhr", "fetch", "ping", "document", "other"]
+
+
 @dataclass
 class BlogJSONSchema:
     JS_WAIT_TIME = """await new Promise(r=>setTimeout(r,5000));"""
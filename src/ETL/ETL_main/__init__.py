@@ -1,26 +1,46 @@
 import os
 import json
+import time
 import asyncio
+import threading
 import textwrap
 import pandas as pd
-from typing import Literal
-from crawl4ai import AsyncWebCrawler
-from crawl4ai.models import CrawlResultContainer
-from pytube import Playlist, YouTube
+from typing import Dict, List, Literal
+from pytube import YouTube
+from crawl4ai.models import CrawlResult
 from youtube_transcript_api import YouTubeTranscriptApi
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from src.ETL.ETL_utils import (
     check_duplicate_videos_manually,
     check_duplicate_blogs_manually,
     check_duplicate_videos_database,
     check_duplicate_blogs_database,
+    DeadLetterQueue,
+    FetchError,
+    backoff_delay,
+    classify_error,
+    run_with_retry,
+    find_duplicate_transcripts,
+    DomainLimiter,
+    BrowserPool,
+    HtmlArchive,
+    reextract_archive,
+    to_records,
+    JobQueue,
+    LeaseKeeper,
+    worker_name,
 )
-from src.ETL.ETL_constants import RawData
+from src.ETL.ETL_constants import BlogJSONSchema
+from src.Utils.profile_utils import stage, staged
+from src.Entity.transcript_entity import CompactTranscript
 from src.ETL.ETL_config import (
     MetadataConfig,
     ProxyConfig,
     CSJWebScrapeConfig,
+    RetryConfig,
+    DedupConfig,
+    OrchestratorConfig,
+    JobQueueConfig,
 )
 
 from src.Logging.logger import log_etl
@@ -32,35 +52,43 @@ class YouTubeTranscriptWriter:
 
     def __init__(
         self,
-        metadata: MetadataConfig = MetadataConfig(source="video"),
+        metadata: MetadataConfig | None = None,
         proxy_rotation_config: ProxyConfig = ProxyConfig(),
-        duplicate_search: Literal["database", "manual"] = "database",
+        duplicate_search: Literal["database", "manual", "none"] = "database",
+        retry_config: RetryConfig = RetryConfig(),
+        limiter: DomainLimiter | None = None,
     ) -> None:
         self.proxy_config = proxy_rotation_config.proxy_config
-        self.df_full = metadata.df_full
-        self.part_files = (
-            check_duplicate_videos_manually(data=self.df_full)
-            if duplicate_search == "manual"
-            else check_duplicate_videos_database()
-        )
-
-    def _process_video(self, i, j, video_url, save_folder):
+        self.retry_config = retry_config
+        # the orchestrator passes its shared one, standalone runs get their own
+        self.limiter = limiter or DomainLimiter()
+        self.dead_letter = DeadLetterQueue(path=retry_config.dead_letter_path)
+        # read here, not as a default argument, so importing stays cheap
+        self.df_full = (metadata or MetadataConfig(source="video")).df_full
+        # one row per video still to download, see `build_work_items`
+        # ("none": the items come from elsewhere, e.g. the job queue)
+        self.work_items: pd.DataFrame = pd.DataFrame()
+        if duplicate_search == "manual":
+            self.work_items = check_duplicate_videos_manually(data=self.df_full)
+        elif duplicate_search == "database":
+            self.work_items = check_duplicate_videos_database(data=self.df_full)
+
+    def _process_video(self, video_url, file_name, save_folder):
         try:
             # get video details
             yt = YouTube(video_url)
-            file_name = self.part_files["vid_name"][i][j]
-            if file_name:
-                log_etl.info(f"Extract: Processing {file_name}")
+            log_etl.info(f"Extract: Processing {file_name}")
 
-                # get video transcript
+            # get video transcript
+            with stage("fetch"), self.limiter.acquire(video_url):
                 yt_ts_api = YouTubeTranscriptApi(proxy_config=self.proxy_config)
                 transcript_list = yt_ts_api.list(yt.video_id)
                 transcript = transcript_list.find_transcript(["en"])
-                video_transcript = transcript.fetch()
-                transcript_text = " ".join(
-                    [snippet.text for snippet in video_transcript]
-                )
-                transcript_text = "\n".join(textwrap.wrap(transcript_text, width=160))
+                fetched = transcript.fetch()
+
+            with stage("save"):
+                # one line per snippet, start/duration kept in the `.npz` sidecar
+                video_transcript = CompactTranscript.from_snippets(fetched)
 
                 # make save folder
                 if not os.path.exists(save_folder):
@@ -72,9 +100,10 @@ class YouTubeTranscriptWriter:
                 with open(file_path, "w", encoding="utf-8") as f:
                     f.write(f"{file_name[:-4]}\n\n")
                     f.write(f"{video_url}\n\n")
-                    f.write(transcript_text)
+                    f.write(video_transcript.text)
+                video_transcript.save_arrays(file_path)
 
-                log_etl.info(f"Extract: Saving {file_name}")
+            log_etl.info(f"Extract: Saving {file_name}")
 
         except Exception as e:
             LogException(e, "Extract", log_etl)
@@ -82,46 +111,29 @@ class YouTubeTranscriptWriter:
 
     def run(self):
         try:
-            num_sesn = len([item for item in self.part_files["pl_url"] if item])
-            num_vids = len(
-                [
-                    item
-                    for url_list in self.part_files["vd_url"]
-                    for item in url_list
-                    if item
-                ]
-            )
+            num_sesn = self.work_items["season_url"].nunique()
+            num_vids = len(self.work_items)
             log_etl.info("Extract: Blog video transcript scraping started")
-            log_etl.info(f"Filt Data:\n{self.part_files}")
-            if not all(item == "" for item in self.part_files["pl_url"]):
+            log_etl.info(f"Filt Data:\n{self.work_items}")
+            if num_vids > 0:
                 log_etl.info(
                     f"Extract: Scraping: {num_vids:03d} transcripts from {num_sesn:02d} seasons"
                 )
 
-                for i in range(len(self.part_files["pl_url"])):
-                    pl = Playlist(self.part_files["pl_url"][i])
-                    vl = pl.video_urls
-
-                    log_etl.info(
-                        f"Extract: Parallel processing '{self.part_files['sv_path'][i]}'"
-                    )
-                    save_dir = (
-                        f"{RawData.RAW_CSJ_FREE}/{self.part_files['sv_path'][i]}/"
-                    )
-
-                    # Process videos in parallel with max 10 threads
-                    with ThreadPoolExecutor(max_workers=10) as executor:
-                        futures = []
-                        for j, video_url in enumerate(vl):
-                            futures.append(
-                                executor.submit(
-                                    self._process_video, i, j, video_url, save_dir
-                                )
-                            )
-
-                        # Wait for all futures to complete
-                        for future in as_completed(futures):
-                            pass
+                # one pool across all seasons so a slow season never idles workers
+                items = to_records(
+                    self.work_items.rename(columns={"save_dir": "save_folder"}),
+                    columns=["video_url", "file_name", "save_folder"],
+                )
+                log_etl.info(f"Extract: Parallel processing {len(items):03d} videos")
+                run_with_retry(
+                    func=self._process_video,
+                    items=items,
+                    source="youtube",
+                    key="video_url",
+                    dead_letter=self.dead_letter,
+                    retry_config=self.retry_config,
+                )
 
             else:
                 log_etl.info("Extract: No new data to scrape. Stopping")
@@ -130,6 +142,24 @@ class YouTubeTranscriptWriter:
             LogException(e, "Extract", log_etl)
             raise CustomException(e)
 
+    def replay_dead_letters(self):
+        """Retry every video that previously ended in the dead letter list."""
+        try:
+            items = [entry["payload"] for entry in self.dead_letter.items("youtube")]
+            log_etl.info(f"Extract: Replaying {len(items):03d} dead lettered videos")
+            run_with_retry(
+                func=self._process_video,
+                items=items,
+                source="youtube",
+                key="video_url",
+                dead_letter=self.dead_letter,
+                retry_config=self.retry_config,
+            )
+
+        except Exception as e:
+            LogException(e, "Extract", log_etl)
+            raise CustomException(e)
+
 
 class BlogTranscriptWriter:
     """Extract `free blog content` transcript from Blog."""
@@ -138,117 +168,190 @@ class BlogTranscriptWriter:
         self,
         method: Literal["series", "parallel"] = "series",
         duplicate_search: Literal["database", "manual"] = "database",
+        retry_config: RetryConfig = RetryConfig(),
+        max_parallel: int = 5,
+        browser_pool: BrowserPool | None = None,
+        archive: HtmlArchive | None = None,
+        limiter: DomainLimiter | None = None,
     ) -> None:
         self.method = method
-        self.data: pd.DataFrame = MetadataConfig(source="blog").df_full
-        self.data_csj = (
-            asyncio.run(check_duplicate_blogs_manually(data=self.data))
-            if duplicate_search == "manual"
-            else check_duplicate_blogs_database(data=self.data)
+        self.duplicate_search = duplicate_search
+        self.max_parallel = max_parallel
+        # the orchestrator passes its shared one, standalone runs get their own
+        self.limiter = limiter or DomainLimiter()
+        self.retry_config = retry_config
+        self.dead_letter = DeadLetterQueue(path=retry_config.dead_letter_path)
+        # one browser for discovery and scraping, closed here only if we launched it
+        self._own_pool = browser_pool is None
+        self.browser_pool = browser_pool or BrowserPool(
+            CSJWebScrapeConfig().browser_config
         )
+        # raw html of every fetched page, lets schema fixes run offline
+        self.archive = archive or HtmlArchive()
+        self.data: pd.DataFrame = MetadataConfig(source="blog").df_full
+        # one row per blog video still to scrape, see `build_work_items`
+        self.work_items: pd.DataFrame = pd.DataFrame()
+
+    async def _check_duplicates(self) -> pd.DataFrame:
+        # runs on the caller's loop so the manual check can share the browser
+        if self.duplicate_search == "manual":
+            return await check_duplicate_blogs_manually(
+                data=self.data, browser_pool=self.browser_pool
+            )
+        return await asyncio.to_thread(check_duplicate_blogs_database, data=self.data)
+
+    @staticmethod
+    def _parse_transcript(result) -> str:
+        if isinstance(result, BaseException):
+            # the tab itself failed (navigation timeout, crashed page)
+            raise FetchError(str(result) or type(result).__name__)
+        if not isinstance(result, CrawlResult) or not result.success:
+            raise FetchError(
+                getattr(result, "error_message", None) or "No crawl result",
+                getattr(result, "status_code", None),
+            )
+        trsp = json.loads(result.extracted_content)
+        if not (isinstance(trsp, list) and len(trsp) > 0 and trsp[0]["transcript"]):
+            raise FetchError("Transcript not found", result.status_code)
+        return trsp[0]["transcript"]
 
+    @staged("fetch")
     async def _scrape_transcripts(
         self,
-        data: dict,
+        items: pd.DataFrame,
         run_config: CSJWebScrapeConfig,
-    ):
-        data["video_transcript"] = [
-            [""] * len(sublist) for sublist in data["video_name"]
-        ]
-        """data = {
-              'base_url': ['url-1','','url-3','','url-5'],
-            'video_name': [['','url-1_vids-2', ''],[],['url-3_vids-1','',''],[],['','','url-5_vids-3']],
-            'video_link': [['','url-1_link-2', ''],[],['url-3_link-1','',''],[],['','','url-5_link-3']],
-      'video_transcript': [['','', ''],[],['','',''],[],['','','']],
-        }            
+        failures: Dict[str, BaseException] | None = None,
+    ) -> pd.DataFrame:
+        """items: work item rows with at least `video_url`, `file_name`, `save_dir`.
+
+        Returns the rows that were scraped with a `trscps` column added.
+        Transient failures are retried in a later round after a jittered
+        backoff, everything else ends in the dead letter list. Given a
+        `failures` dict, failed urls are put there with their error instead,
+        neither retried nor dead lettered: the caller (the job queue) owns
+        their retries.
         """
-        async with AsyncWebCrawler(config=run_config.browser_config) as crawler:
-            try:
-                for i, url_list in enumerate(data["video_link"]):
-                    if len(url_list) > 0:  # skip empty list
-                        urls = [s for s in url_list if s]
-                        # get data
-                        results = await crawler.arun_many(
-                            urls=urls,
-                            config=run_config.run_config_tran,
-                            dispatcher=run_config.mem_ada_dispatcher,
+        try:
+            payload_cols = ["video_url", "file_name", "save_dir"]
+            pending = items[payload_cols].astype(str).assign(attempt=1)
+            scraped = [pd.DataFrame(columns=payload_cols + ["trscps"])]
+            while len(pending) > 0:
+                # get data, `max_parallel` tabs reused across the pages
+                merged = pending.reset_index(drop=True)
+                merged["result"] = await self.browser_pool.crawl_in_tabs(
+                    urls=merged["video_url"].tolist(),
+                    run_config=run_config.run_config_tran,
+                    tabs=self.max_parallel,
+                    limiter=self.limiter,
+                    dispatcher=run_config.mem_ada_dispatcher,
+                )
+
+                errors, transcripts = [], []
+                for result in merged["result"]:
+                    try:
+                        transcripts.append(self._parse_transcript(result))
+                        errors.append(None)
+                    except FetchError as e:
+                        transcripts.append("")
+                        errors.append(e)
+                merged["trscps"], merged["error"] = transcripts, errors
+                await self._archive_pages(merged)
+
+                is_ok = merged["error"].isna()
+                scraped.append(merged.loc[is_ok, payload_cols + ["trscps"]])
+
+                if failures is not None:
+                    failures.update(
+                        zip(
+                            merged.loc[~is_ok, "video_url"], merged.loc[~is_ok, "error"]
                         )
+                    )
+                    break
+                failed = merged[~is_ok].assign(
+                    kind=lambda df: df["error"].map(classify_error)
+                )
+                is_retry = (failed["kind"] == "transient") & (
+                    failed["attempt"] < self.retry_config.max_retries
+                )
+                for row in failed[~is_retry].itertuples(index=False):
+                    self.dead_letter.push(
+                        "blog",
+                        row.video_url,
+                        {col: getattr(row, col) for col in payload_cols},
+                        row.error,
+                        row.kind,
+                        row.attempt,
+                    )
 
-                        # flatten `results`
-                        temp_data = [item1._results[0] for item1 in results]
-                        results = CrawlResultContainer(temp_data)
-
-                        # reorder data
-                        results_ordr = [
-                            next(r for r in results if r.url == url) for url in urls
-                        ]
-
-                        # append data
-                        for j, url in enumerate(url_list):
-                            for result in results_ordr:
-                                if url == result.url:
-                                    trsp = json.loads(result.extracted_content)
-                                    trsp = (
-                                        trsp[0]
-                                        if isinstance(trsp, list) and len(trsp) > 0
-                                        else {"transcript": "Transcript not found"}
-                                    )
-                                    data["video_transcript"][i][j] = trsp["transcript"]
-
-                return data
-
-            except Exception as e:
-                LogException(e, "Extract", log_etl)
-                raise CustomException(e)
-
-    def _save(self, i, j, data, video_url, trscps, save_dir):
-        try:  # skip saved season               # skip saved video
-            if len(data["video_name"]) > 0 and data["video_name"][i][j]:
-                file_name = f"{self.data['KEY'][i]}E{j + 1:02d}-{data['video_name'][i][j]} | CS Joseph.txt"
-                file_name = file_name.replace("/", "&")
-                log_etl.info(f"Extract: Saving '{file_name}'")
+                pending = failed.loc[is_retry, payload_cols + ["attempt"]]
+                if len(pending) > 0:
+                    delay = backoff_delay(
+                        int(pending["attempt"].max()),
+                        self.retry_config.base_delay,
+                        self.retry_config.max_delay,
+                    )
+                    log_etl.info(
+                        f"Extract: Retrying {len(pending):03d} blog pages in {delay:.1f}s"
+                    )
+                    pending = pending.assign(attempt=pending["attempt"] + 1)
+                    await asyncio.sleep(delay)
 
-                # make save folder
-                if not os.path.exists(save_dir):
-                    os.makedirs(save_dir, exist_ok=True)
+            return pd.concat(scraped, ignore_index=True)
 
-                # write data
-                file_path = os.path.join(save_dir, file_name)
+        except Exception as e:
+            LogException(e, "Extract", log_etl)
+            raise CustomException(e)
 
-                # prep transcript
-                trscps = "\n".join(textwrap.wrap(trscps, width=160))
+    async def _archive_pages(self, merged: pd.DataFrame) -> None:
+        # keep failed extractions too, they are the pages a schema fix is for
+        rows = [
+            {
+                "url": row.video_url,
+                "html": getattr(row.result, "html", None) or "",
+                "file_name": row.file_name,
+                "save_dir": row.save_dir,
+            }
+            for row in merged.itertuples(index=False)
+        ]
+        await asyncio.to_thread(self.archive.put_many, rows)
 
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(f"{file_name[:-4]}\n\n")
-                    f.write(f"{video_url}\n\n")
-                    f.write(trscps)
+    @staged("save")
+    def _save(self, video_url, file_name, trscps, save_dir):
+        try:
+            log_etl.info(f"Extract: Saving '{file_name}'")
+
+            # make save folder
+            if not os.path.exists(save_dir):
+                os.makedirs(save_dir, exist_ok=True)
+
+            # write data
+            file_path = os.path.join(save_dir, file_name)
+
+            # prep transcript
+            trscps = "\n".join(textwrap.wrap(trscps, width=160))
+
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(f"{file_name[:-4]}\n\n")
+                f.write(f"{video_url}\n\n")
+                f.write(trscps)
 
         except Exception as e:
             LogException(e, "Extract", log_etl)
             raise CustomException(e)
 
-    def _save_transcripts(self, data: dict):
+    def _save_transcripts(self, items: pd.DataFrame):
         try:
-            for i in range(len(data["base_url"])):
-                save_dir = f"{RawData.RAW_CSJ_BLOG}/{self.data['NAME'][i]}/"
-                video_list = data["video_link"][i]
-                trscp_list = data["video_transcript"][i]
-
-                # Process videos in parallel with max 10 threads
-                with ThreadPoolExecutor(max_workers=10) as executor:
-                    futures = []
-                    for j, (video_url, trscps) in enumerate(
-                        zip(video_list, trscp_list)
-                    ):
-                        futures.append(
-                            executor.submit(
-                                self._save, i, j, data, video_url, trscps, save_dir
-                            )
-                        )
-
-                    # Wait for all futures to complete
-                    for future in as_completed(futures):
-                        pass
+            # save in parallel, failed writes are retried or dead lettered
+            run_with_retry(
+                func=self._save,
+                items=to_records(
+                    items, columns=["video_url", "file_name", "trscps", "save_dir"]
+                ),
+                source="blog",
+                key="video_url",
+                dead_letter=self.dead_letter,
+                retry_config=self.retry_config,
+            )
 
         except Exception as e:
             LogException(e, "Extract", log_etl)
@@ -256,37 +359,25 @@ class BlogTranscriptWriter:
 
     async def run(self):
         try:
-            """data_csj = {
-                'base_url'  : ['url-1','','url-3','','url-5'],
-                'video_name': [['','url-1_vids-2', ''],[],['url-3_vids-1','',''],[],['','','url-5_vids-3']],
-                'video_link': [['','url-1_link-2', ''],[],['url-3_link-1','',''],[],['','','url-5_link-3']],
-            }
-            """
-            num_sesn = len([item for item in self.data_csj["base_url"] if item])
-            num_vids = len(
-                [
-                    item
-                    for url_list in self.data_csj["video_link"]
-                    for item in url_list
-                    if item
-                ]
-            )
+            self.work_items = await self._check_duplicates()
+            num_sesn = self.work_items["season_url"].nunique()
+            num_vids = len(self.work_items)
             log_etl.info("Extract: Blog video transcript scraping started")
-            log_etl.info(f"Filt Data:\n{self.data_csj}")
-            if not all(item == "" for item in self.data_csj["base_url"]):
+            log_etl.info(f"Filt Data:\n{self.work_items}")
+            if num_vids > 0:
                 log_etl.info(
                     f"Extract: Scraping: {num_vids:03d} transcripts from {num_sesn:02d} seasons"
                 )
                 crw_csj_config = CSJWebScrapeConfig(
-                    max_parallel=5, len_list=len(self.data_csj["base_url"])
+                    max_parallel=self.max_parallel, len_list=num_vids
                 )
                 trnc_csj = await self._scrape_transcripts(
-                    data=self.data_csj,
+                    items=self.work_items,
                     run_config=crw_csj_config,
                 )
 
                 log_etl.info("Extract: Saving transcripts to file")
-                self._save_transcripts(data=trnc_csj)
+                self._save_transcripts(items=trnc_csj)
 
                 log_etl.info("Extract: Blog video transcript data was saved")
 
@@ -296,6 +387,74 @@ class BlogTranscriptWriter:
         except Exception as e:
             LogException(e, "Extract", log_etl)
             raise CustomException(e)
+        finally:
+            if self._own_pool:
+                await self.browser_pool.close()
+
+    async def replay_dead_letters(self):
+        """Retry every blog page that previously ended in the dead letter list."""
+        try:
+            entries = pd.DataFrame(
+                [entry["payload"] for entry in self.dead_letter.items("blog")],
+                columns=["video_url", "file_name", "save_dir", "trscps"],
+            )
+            log_etl.info(f"Extract: Replaying {len(entries):03d} dead lettered blogs")
+            # pages that failed while saving already carry their transcript
+            has_trscps = entries["trscps"].fillna("") != ""
+            trnc_csj = entries[has_trscps]
+            if (~has_trscps).any():
+                crw_csj_config = CSJWebScrapeConfig(
+                    max_parallel=self.max_parallel, len_list=int((~has_trscps).sum())
+                )
+                scraped = await self._scrape_transcripts(
+                    items=entries[~has_trscps],
+                    run_config=crw_csj_config,
+                )
+                trnc_csj = pd.concat([trnc_csj, scraped], ignore_index=True)
+            self._save_transcripts(items=trnc_csj)
+
+        except Exception as e:
+            LogException(e, "Extract", log_etl)
+            raise CustomException(e)
+        finally:
+            if self._own_pool:
+                await self.browser_pool.close()
+
+    def reextract(self, max_workers: int | None = None):
+        """Re-apply the current page schema to the html archive and rewrite the
+        transcripts, without launching a browser or touching the network."""
+        try:
+            log_etl.info("Extract: Offline blog re-extraction started")
+            items = reextract_archive(
+                schema=BlogJSONSchema.SCHEMA_CSJ_BLOG_PAGE,
+                archive=self.archive,
+                max_workers=max_workers,
+            )
+            has_trscps = items["trscps"] != ""
+            log_etl.info(
+                f"Extract: Re-extracted {int(has_trscps.sum()):04d} / {len(items):04d} archived pages"
+            )
+            self._save_transcripts(items=items[has_trscps])
+
+        except Exception as e:
+            LogException(e, "Extract", log_etl)
+            raise CustomException(e)
+
+
+class TranscriptDeduplicator:
+    """Find `blog` transcripts that repeat a `youtube` transcript (and vice versa)."""
+
+    def __init__(self, dedup_config: DedupConfig = DedupConfig()) -> None:
+        self.dedup_config = dedup_config
+
+    def run(self) -> dict:
+        try:
+            log_etl.info("Dedup: Near duplicate detection started")
+            return find_duplicate_transcripts(dedup_config=self.dedup_config)
+
+        except Exception as e:
+            LogException(e, "Dedup", log_etl)
+            raise CustomException(e)
 
 
 class SkoolTranscriptWriter:
@@ -312,3 +471,337 @@ class SkoolTranscriptWriter:
         except Exception as e:
             LogException(e, "Extract", log_etl)
             raise CustomException(e)
+
+
+class RPBlogTranscriptWriter:
+    """Extract `free blog content` transcript from the RP blog."""
+
+    def __init__(self, max_parallel: int = 2) -> None:
+        self.max_parallel = max_parallel
+
+    async def run(self):
+        try:
+            ...
+            pass
+
+        except Exception as e:
+            LogException(e, "Extract", log_etl)
+            raise CustomException(e)
+
+
+class ETLOrchestrator:
+    """Run every source writer concurrently, then the dedup stage. Publishing
+    the index is left to the caller, the ETL only produces transcripts.
+
+    The youtube and skool writers are blocking, so they run in worker threads
+    while the blog writers stay on the event loop; total wall time is roughly
+    that of the slowest source. Every source shares one `DomainLimiter`, whose
+    per-domain permits are scaled to fit the global budget.
+    """
+
+    SOURCE_DOMAINS = {
+        "youtube": "youtube.com",
+        "csj_blog": "csjoseph.life",
+        "rp_blog": "default",
+        "skool": "skool.com",
+    }
+
+    def __init__(
+        self,
+        orchestrator_config: OrchestratorConfig = OrchestratorConfig(),
+        duplicate_search: Literal["database", "manual"] = "database",
+        sources: List[str] | None = None,
+    ) -> None:
+        self.duplicate_search = duplicate_search
+        self.sources = sources or list(self.SOURCE_DOMAINS)
+        self.limiter = DomainLimiter(
+            orchestrator_config=orchestrator_config,
+            domains=[self.SOURCE_DOMAINS[source] for source in self.sources],
+        )
+        # shared by every browser based source, lives for the whole run
+        self.browser_pool = BrowserPool(CSJWebScrapeConfig().browser_config)
+
+    def _permit(self, source: str) -> int:
+        return self.limiter.permit(self.SOURCE_DOMAINS[source])
+
+    async def _run_youtube(self):
+        def _run():
+            YouTubeTranscriptWriter(
+                duplicate_search=self.duplicate_search,
+                retry_config=RetryConfig(max_workers=self._permit("youtube")),
+                limiter=self.limiter,
+            ).run()
+
+        await asyncio.to_thread(_run)
+
+    async def _run_csj_blog(self):
+        # reading the metadata sheet is blocking
+        writer = await asyncio.to_thread(
+            BlogTranscriptWriter,
+            duplicate_search=self.duplicate_search,
+            max_parallel=self._permit("csj_blog"),
+            browser_pool=self.browser_pool,
+            limiter=self.limiter,
+        )
+        await writer.run()
+
+    async def _run_rp_blog(self):
+        await RPBlogTranscriptWriter(max_parallel=self._permit("rp_blog")).run()
+
+    async def _run_skool(self):
+        await asyncio.to_thread(SkoolTranscriptWriter().run)
+
+    async def _timed(self, source: str):
+        start = time.perf_counter()
+        try:
+            await getattr(self, f"_run_{source}")()
+            log_etl.info(
+                f"Orchestrate: '{source}' finished in {time.perf_counter() - start:.1f}s"
+            )
+        except Exception as e:
+            log_etl.info(
+                f"Orchestrate: '{source}' failed after {time.perf_counter() - start:.1f}s"
+            )
+            raise e
+
+    async def run(self):
+        try:
+            start = time.perf_counter()
+            log_etl.info(
+                f"Orchestrate: Running {self.sources} with permits {self.limiter.permits}"
+            )
+            results = await asyncio.gather(
+                *(self._timed(source) for source in self.sources),
+                return_exceptions=True,
+            )
+            # one failing source must not hide the others' results
+            failed = {
+                source: result
+                for source, result in zip(self.sources, results)
+                if isinstance(result, BaseException)
+            }
+            for source, error in failed.items():
+                log_etl.info(f"Orchestrate: '{source}' error: {error}")
+
+            await self.browser_pool.close()
+            await asyncio.to_thread(TranscriptDeduplicator().run)
+            log_etl.info(
+                f"Orchestrate: ETL finished in {time.perf_counter() - start:.1f}s"
+            )
+            if failed:
+                raise RuntimeError(f"Sources failed: {list(failed)}")
+
+        except Exception as e:
+            LogException(e, "Orchestrate", log_etl)
+            raise CustomException(e)
+
+
+class JobProducer:
+    """Run the duplicate checks once and queue the missing transcripts as jobs."""
+
+    PAYLOAD_COLS = ["video_url", "file_name", "save_dir"]
+
+    def __init__(
+        self,
+        duplicate_search: Literal["database", "manual"] = "database",
+        queue: JobQueue | None = None,
+    ) -> None:
+        self.duplicate_search = duplicate_search
+        self.queue = queue or JobQueue()
+
+    async def _blog_items(self) -> pd.DataFrame:
+        writer = await asyncio.to_thread(
+            BlogTranscriptWriter, duplicate_search=self.duplicate_search
+        )
+        try:
+            return await writer._check_duplicates()
+        finally:
+            await writer.browser_pool.close()
+
+    async def run(
+        self, sources: List[str] = ["youtube", "blog"], requeue_failed: bool = False
+    ) -> dict:
+        try:
+            if requeue_failed:
+                count = self.queue.requeue_failed(sources)
+                log_etl.info(f"Queue: Requeued {count:03d} failed jobs")
+            for source in sources:
+                if source == "youtube":
+                    items = await asyncio.to_thread(
+                        lambda: YouTubeTranscriptWriter(
+                            duplicate_search=self.duplicate_search
+                        ).work_items
+                    )
+                else:
+                    items = await self._blog_items()
+                self.queue.enqueue(source, to_records(items, columns=self.PAYLOAD_COLS))
+            counts = self.queue.counts(sources)
+            log_etl.info(f"Queue: Job counts {counts}")
+            return counts
+
+        except Exception as e:
+            LogException(e, "Queue", log_etl)
+            raise CustomException(e)
+
+
+class QueueWorker:
+    """Drain the mongodb job queue, start one per machine / proxy ip to scale out.
+
+    Youtube jobs are claimed one at a time by `threads` claim loops, blog
+    jobs `batch_size` at a time so one browser batch scrapes them together.
+    Leases are renewed while a job runs; if this process dies its jobs go
+    back to the queue once the lease expires. The worker stops when no job
+    is queued or leased anywhere, or keeps polling with `forever`.
+    Transcripts are written to this node's raw data dirs, dedup and the
+    index build run wherever those are collected.
+    """
+
+    def __init__(
+        self,
+        sources: List[str] = ["youtube", "blog"],
+        threads: int = 4,
+        forever: bool = False,
+        queue_config: JobQueueConfig = JobQueueConfig(),
+        retry_config: RetryConfig = RetryConfig(),
+        queue: JobQueue | None = None,
+    ) -> None:
+        self.sources = sources
+        self.threads = threads
+        self.forever = forever
+        self.config = queue_config
+        self.retry_config = retry_config
+        self.queue = queue or JobQueue(queue_config=queue_config)
+        self.worker_id = worker_name()
+        self.stats = {"done": 0, "retried": 0, "failed": 0, "lost": 0}
+        # `_finish` runs on several youtube threads at once
+        self._stats_lock = threading.Lock()
+
+    def _finish(self, job: dict, error: BaseException | None, lost: List[str]) -> None:
+        outcome = self._record(job, error, lost)
+        with self._stats_lock:
+            self.stats[outcome] += 1
+
+    def _record(self, job: dict, error: BaseException | None, lost: List[str]) -> str:
+        if job["_id"] in lost:
+            # someone else owns the job now, its result is theirs to record
+            return "lost"
+        if error is None:
+            return "done" if self.queue.complete(job["_id"], self.worker_id) else "lost"
+        retry = classify_error(error) == "transient"
+        delay = backoff_delay(
+            job["attempts"],
+            self.retry_config.base_delay,
+            self.retry_config.max_delay,
+        )
+        if not self.queue.fail(job, self.worker_id, error, retry=retry, delay_s=delay):
+            # the lease ran out and the job was claimed again meanwhile
+            return "lost"
+        retried = retry and job["attempts"] < self.config.max_attempts
+        return "retried" if retried else "failed"
+
+    def _should_stop(self, sources: List[str]) -> bool:
+        if self.forever:
+            return False
+        self.queue.reap()
+        counts = self.queue.counts(sources)
+        return counts["queued"] == 0 and counts["leased"] == 0
+
+    def _youtube_loop(self, writer: YouTubeTranscriptWriter) -> None:
+        while True:
+            job = self.queue.claim(self.worker_id, ["youtube"])
+            if job is None:
+                if self._should_stop(["youtube"]):
+                    return
+                time.sleep(self.config.poll_s)
+                continue
+            payload = job["payload"]
+            error = None
+            with LeaseKeeper(self.queue, self.worker_id, [job["_id"]]) as keeper:
+                try:
+                    writer._process_video(
+                        video_url=payload["video_url"],
+                        file_name=payload["file_name"],
+                        save_folder=payload["save_dir"],
+                    )
+                except Exception as e:
+                    error = e
+            self._finish(job, error, keeper.lost)
+
+    async def _blog_loop(self) -> None:
+        writer = await asyncio.to_thread(BlogTranscriptWriter)
+        try:
+            while True:
+                jobs = await asyncio.to_thread(
+                    self.queue.claim_many,
+                    self.worker_id,
+                    ["blog"],
+                    self.config.batch_size,
+                )
+                if not jobs:
+                    if await asyncio.to_thread(self._should_stop, ["blog"]):
+                        return
+                    await asyncio.sleep(self.config.poll_s)
+                    continue
+                items = pd.DataFrame([job["payload"] for job in jobs])
+                with LeaseKeeper(
+                    self.queue, self.worker_id, [job["_id"] for job in jobs]
+                ) as keeper:
+                    # failed pages go back to the queue with a backoff, not to
+                    # the local dead letter list
+                    errors: Dict[str, BaseException] = {}
+                    scraped = await writer._scrape_transcripts(
+                        items=items,
+                        run_config=CSJWebScrapeConfig(
+                            max_parallel=writer.max_parallel, len_list=len(jobs)
+                        ),
+                        failures=errors,
+                    )
+                    rows = {
+                        row["video_url"]: row
+                        for row in to_records(
+                            scraped,
+                            columns=["video_url", "file_name", "trscps", "save_dir"],
+                        )
+                    }
+                    for job in jobs:
+                        row = rows.get(job["_id"])
+                        if row is None:
+                            errors.setdefault(
+                                job["_id"], FetchError("Transcript not scraped")
+                            )
+                            continue
+                        try:
+                            await asyncio.to_thread(writer._save, **row)
+                        except Exception as e:
+                            errors[job["_id"]] = e
+                for job in jobs:
+                    await asyncio.to_thread(
+                        self._finish, job, errors.get(job["_id"]), keeper.lost
+                    )
+        finally:
+            await writer.browser_pool.close()
+
+    async def run(self) -> dict:
+        try:
+            log_etl.info(
+                f"Queue: Worker '{self.worker_id}' draining {self.sources} "
+                f"(lease {self.config.lease_s:.0f}s)"
+            )
+            tasks = []
+            if "youtube" in self.sources:
+                writer = await asyncio.to_thread(
+                    YouTubeTranscriptWriter, duplicate_search="none"
+                )
+                tasks += [
+                    asyncio.to_thread(self._youtube_loop, writer)
+                    for _ in range(self.threads)
+                ]
+            if "blog" in self.sources:
+                tasks.append(self._blog_loop())
+            await asyncio.gather(*tasks)
+            log_etl.info(f"Queue: Worker '{self.worker_id}' finished {self.stats}")
+            return self.stats
+
+        except Exception as e:
+            LogException(e, "Queue", log_etl)
+            raise CustomException(e)
@@ -5,20 +5,39 @@ from logging import Logger
 from pytube.helpers import DeferredGeneratorList
 from typing import List, Literal
 from pytube import Playlist, YouTube
-from crawl4ai import AsyncWebCrawler
 from pymongo import MongoClient, UpdateOne
 from crawl4ai.models import CrawlResultContainer
 
 
 from src.ETL.ETL_constants import RawData
-from src.ETL.ETL_config import CSJWebScrapeConfig
+from src.Utils.profile_utils import stage, staged
+from src.ETL.ETL_config import CSJWebScrapeConfig, DiscoveryConfig
 from src.Entity.config_entity import MongoDBConfig
+from src.ETL.ETL_utils.retry_utils import (
+    DeadLetterQueue,
+    FetchError,
+    backoff_delay,
+    classify_error,
+    run_with_retry,
+)
+from src.ETL.ETL_utils.dedup_utils import MinHashIndex, find_duplicate_transcripts
+from src.ETL.ETL_utils.limiter_utils import DomainLimiter
+from src.ETL.ETL_utils.browser_utils import BrowserPool
+from src.ETL.ETL_utils.watermark_utils import BlogWatermarks
+from src.ETL.ETL_utils.archive_utils import HtmlArchive, reextract_archive
+from src.ETL.ETL_utils.job_queue_utils import JobQueue, LeaseKeeper, worker_name
+from src.ETL.ETL_utils.work_item_utils import (
+    build_work_items,
+    drop_local_duplicates,
+    to_records,
+)
 
 from src.Logging.logger import log_etl
 from src.Exception.exception import LogException, CustomException
 
 
-def check_duplicate_videos_manually(data: pd.DataFrame) -> dict:
+@staged("duplicate_check")
+def check_duplicate_videos_manually(data: pd.DataFrame) -> pd.DataFrame:
     try:
         log_etl.info("Extract: Checking files to skip downloading")
         # text files that are present locally
@@ -29,22 +48,23 @@ def check_duplicate_videos_manually(data: pd.DataFrame) -> dict:
         # all transcripts that are available
         full_dict = data.to_dict(orient="index")
         files_full = {"pl_url": [], "sv_path": [], "vd_url": [], "vid_name": []}
-        for idx, value in full_dict.items():
-            log_etl.info(
-                f"Extract: Analysing playlist {idx + 1:02d} ('{value['KEY']}') of {data.shape[0]} -> '{value['NAME']}'"
-            )
-            pl = Playlist(value["URL"])
-            video_list = pl.video_urls
-            files_full["pl_url"].append(value["URL"])
-            files_full["sv_path"].append(value["NAME"])
-            files_full["vd_url"].append(video_list)
-            name_list = []
-            for j, vid in enumerate(video_list):
-                yt = YouTube(vid)
-                video_name = yt.title.replace("/", " & ")
-                file_name = f"{value['KEY']}E{j + 1:02d}-{video_name}.txt"
-                name_list.append(file_name)
-            files_full["vid_name"].append(name_list)
+        with stage("discovery"):
+            for idx, value in full_dict.items():
+                log_etl.info(
+                    f"Extract: Analysing playlist {idx + 1:02d} ('{value['KEY']}') of {data.shape[0]} -> '{value['NAME']}'"
+                )
+                pl = Playlist(value["URL"])
+                video_list = pl.video_urls
+                files_full["pl_url"].append(value["URL"])
+                files_full["sv_path"].append(value["NAME"])
+                files_full["vd_url"].append(video_list)
+                name_list = []
+                for j, vid in enumerate(video_list):
+                    yt = YouTube(vid)
+                    video_name = yt.title.replace("/", " & ")
+                    file_name = f"{value['KEY']}E{j + 1:02d}-{video_name}.txt"
+                    name_list.append(file_name)
+                files_full["vid_name"].append(name_list)
 
         log_etl.info("Extract: Updating mongodb for future use")
         # pytube returns DeferredGeneratorList(urls) not list[urls]
@@ -55,67 +75,30 @@ def check_duplicate_videos_manually(data: pd.DataFrame) -> dict:
         put_dict_to_MongoDB(data=files_full, collection="JAPRAGYouTube")
 
         # filter out missing files
-        for playlist_idx, (videos, titles) in enumerate(
-            zip(files_full["vd_url"], files_full["vid_name"])
-        ):
-            playlist_list = list(files_full["pl_url"])
-            name_list = list(files_full["sv_path"])
-            video_list = list(videos)  # Convert to regular list
-            title_list = list(titles)
-
-            # Filter both lists simultaneously
-            keep_indices = []
-            keep_playlist = set()
-            for i, title in enumerate(title_list):
-                titl_chk = title[:9]
-                is_present = False
-                for item in files_local:
-                    item_chk = item.split("/")[-1][:9]
-                    if item_chk == titl_chk:
-                        is_present = True
-                        break
-                if not is_present:
-                    keep_playlist.add(playlist_idx)
-                    keep_indices.append(i)
-
-            # Keep only non-matching items
-            files_full["pl_url"][playlist_idx] = [
-                playlist_list[i] for i in keep_playlist
-            ]
-            files_full["sv_path"][playlist_idx] = [name_list[i] for i in keep_playlist]
-            files_full["vd_url"][playlist_idx] = [video_list[i] for i in keep_indices]
-            files_full["vid_name"][playlist_idx] = [title_list[i] for i in keep_indices]
-
-        # log_etl.info(f"\n{files_full}")
-
-        # clean up the data
-        for i in range(len(files_full["vd_url"]) - 1, -1, -1):
-            if len(files_full["vd_url"][i]) == 0:
-                # log_etl.info(f"index {i}, removing: {files_full["vd_url"][i] = }")
-                files_full["sv_path"].remove(files_full["sv_path"][i])
-                files_full["pl_url"].remove(files_full["pl_url"][i])
-                files_full["vd_url"].remove(files_full["vd_url"][i])
-                files_full["vid_name"].remove(files_full["vid_name"][i])
-
-        pl = []
-        nm = []
-        for playlists, names in zip(files_full["pl_url"], files_full["sv_path"]):
-            for playlist, name in zip(playlists, names):
-                pl.append(playlist)
-                nm.append(name)
-        files_full["pl_url"] = pl
-        files_full["sv_path"] = nm
+        items = build_work_items(
+            data=files_full,
+            source="youtube",
+            season_col="pl_url",
+            name_col="vid_name",
+            link_col="vd_url",
+            metadata=data,
+            folder_col="sv_path",
+        )
+        items = drop_local_duplicates(items, files_local, match="prefix")
 
         log_etl.info("Extract: Finalised sources to download")
 
-        return files_full
+        return items
 
     except Exception as e:
         LogException(e, "Error", log_etl)
         raise CustomException(e)
 
 
-async def check_duplicate_blogs_manually(data: pd.DataFrame) -> dict:
+@staged("duplicate_check")
+async def check_duplicate_blogs_manually(
+    data: pd.DataFrame, browser_pool: BrowserPool | None = None
+) -> pd.DataFrame:
     try:
         log_etl.info("Extract: Checking files to skip downloading")
         files_csj = glob(f"{RawData.RAW_CSJ_BLOG}/**/*.txt")
@@ -125,91 +108,149 @@ async def check_duplicate_blogs_manually(data: pd.DataFrame) -> dict:
         urls = data["URL"].to_list()
         urls_csj = [url for url in urls if "csjoseph.life" in url]
 
-        data_to_scrape = await process_blog_videos(urls_csj)
+        data_to_scrape = await process_blog_videos(urls_csj, browser_pool=browser_pool)
         log_etl.info("Extract: Updating mongodb for future use")
         put_dict_to_MongoDB(data=data_to_scrape, collection="JAPRAGBlog")
 
-        to_remove_outer = []
-        for i in range(len(data_to_scrape["base_url"])):
-            to_remove_inner = []
-            for j, video_name in enumerate(data_to_scrape["video_name"][i]):
-                file_name = f"{data['KEY'][i]}E{j + 1:02d}-{video_name} | CS Joseph.txt"
-                for files in files_local:
-                    if file_name in files:
-                        # log_etl.info(f"Extract: Duplicate found: '{file_name}'")
-                        to_remove_inner.append(j)
-
-            for j in sorted(to_remove_inner, reverse=True):
-                data_to_scrape["video_name"][i][j] = ""
-                data_to_scrape["video_link"][i][j] = ""
-
-            if all(item == "" for item in data_to_scrape["video_name"][i]):
-                to_remove_outer.append(i)
-
-        # Clean up outer lists
-        for i in sorted(to_remove_outer, reverse=True):
-            data_to_scrape["base_url"][i] = ""
-            data_to_scrape["video_name"][i] = []
-            data_to_scrape["video_link"][i] = []
+        items = build_work_items(
+            data=data_to_scrape,
+            source="blog",
+            season_col="base_url",
+            name_col="video_name",
+            link_col="video_link",
+            metadata=data,
+        )
+        items = drop_local_duplicates(items, files_local)
 
         log_etl.info("Extract: Finalised sources to download")
 
-        return data_to_scrape
+        return items
 
     except Exception as e:
         LogException(e, "Error", log_etl)
         raise CustomException(e)
 
 
+def _parse_articles(result) -> List[List[str]]:
+    """`[[video_name, video_link], ...]` from one season (pagination) page."""
+    if not result.success or not result.extracted_content:
+        return []
+    extracted = json.loads(result.extracted_content)
+    if not extracted:
+        return []
+    return [
+        [video["video_name"], video["video_link"]]
+        for video in extracted[0].get("articles", [])
+    ]
+
+
+async def _deep_crawl_articles(
+    crawler, url: str, run_config: CSJWebScrapeConfig
+) -> List[List[str]]:
+    # scrape every `*/page/*` of the season
+    results = await crawler.arun(url=url, config=run_config.run_config_init_bsf)
+    # flatten `results`
+    flat_rslt = CrawlResultContainer([item._results[0] for item in results])
+    # extract `results`
+    return [
+        article
+        for result in flat_rslt
+        if url in result.url
+        for article in _parse_articles(result)
+    ]
+
+
+async def _incremental_articles(
+    crawler,
+    url: str,
+    run_config: CSJWebScrapeConfig,
+    watermarks: BlogWatermarks,
+    discovery_config: DiscoveryConfig,
+) -> List[List[str]]:
+    # walk pages newest first until the watermark (or only known links) shows up
+    known_links = {link for _, link in watermarks.articles(url)}
+    watermark = watermarks.watermark(url)
+    new_articles = []
+    page = 0
+    try:
+        for page in range(1, discovery_config.max_pages + 1):
+            page_url = url if page == 1 else f"{url.rstrip('/')}/page/{page}/"
+            result = await crawler.arun(
+                url=page_url, config=run_config.run_config_init_page
+            )
+            articles = _parse_articles(result._results[0])
+            fresh = [article for article in articles if article[1] not in known_links]
+            new_articles.extend(fresh)
+            page_links = {link for _, link in articles}
+            if not fresh or watermark in page_links:
+                break
+    finally:
+        # close the tab only, `kill_session` would also close the browser
+        # context the transcript scrape shares
+        await BrowserPool.release_session(
+            crawler, run_config.run_config_init_page.session_id
+        )
+
+    log_etl.info(
+        f"Extract: '{url}' crawled {page:02d} page(s), {len(new_articles):03d} new articles"
+    )
+    return new_articles + watermarks.articles(url)
+
+
+@staged("discovery")
 async def process_blog_videos(
     urls: List[str],
     method: Literal["series", "parallel"] = "series",
     run_config: CSJWebScrapeConfig = CSJWebScrapeConfig(),
+    browser_pool: BrowserPool | None = None,
+    discovery_config: DiscoveryConfig = DiscoveryConfig(),
 ):
     data = {
         "base_url": urls,
         "video_name": [[] for _ in urls],
         "video_link": [[] for _ in urls],
     }
-    async with AsyncWebCrawler(config=run_config.browser_config) as crawler:
-        try:
-            if method == "series":
-                # scrape
-                results = [
-                    await crawler.arun(
-                        url=url,
-                        config=run_config.run_config_init_bsf,
+    # borrow the run's shared browser, or launch one just for this call
+    own_pool = browser_pool is None
+    browser_pool = browser_pool or BrowserPool(run_config.browser_config)
+    crawler = await browser_pool.get()
+    try:
+        if method == "series":
+            watermarks = BlogWatermarks(discovery_config=discovery_config)
+            for idx, url in enumerate(urls):
+                # full deep crawl on the first run and every `full_crawl_days`
+                # to pick up edits, otherwise only the newest pages
+                full = watermarks.needs_full_crawl(url)
+                if full:
+                    log_etl.info(f"Extract: Full pagination crawl of '{url}'")
+                    articles = await _deep_crawl_articles(crawler, url, run_config)
+                else:
+                    articles = await _incremental_articles(
+                        crawler, url, run_config, watermarks, discovery_config
                     )
-                    for url in urls
-                ]
-                # flatten `results`
-                temp_data = [item2._results[0] for item1 in results for item2 in item1]
-                flat_rslt = CrawlResultContainer(temp_data)
-                # extract `results`
-                for idx, url in enumerate(urls):
-                    for result in flat_rslt:
-                        if url in result.url:
-                            for video in json.loads(result.extracted_content)[0][
-                                "articles"
-                            ]:
-                                data["video_name"][idx].append(video["video_name"])
-                                data["video_link"][idx].append(video["video_link"])
-
-                return data
-
-            elif method == "parallel":  # Method not working. Don't call this
-                # scrape                # bug in crawl4ai.
-                results = await crawler.arun_many(  # check ["https://github.com/unclecode/crawl4ai/issues/1277"]
-                    urls=urls,
-                    config=run_config.run_config_init_bsf,
-                    dispatcher=run_config.mem_ada_dispatcher,  # <- issues
-                )
-                return {}
+                watermarks.update(url, articles, full=full)
+                data["video_name"][idx] = [name for name, _ in articles]
+                data["video_link"][idx] = [link for _, link in articles]
+
+            watermarks.save()
+            return data
+
+        elif method == "parallel":  # Method not working. Don't call this
+            # scrape                # bug in crawl4ai.
+            results = await crawler.arun_many(  # check ["https://github.com/unclecode/crawl4ai/issues/1277"]
+                urls=urls,
+                config=run_config.run_config_init_bsf,
+                dispatcher=run_config.mem_ada_dispatcher,  # <- issues
+            )
+            return {}
 
-        except Exception as e:
-            LogException(e, "Extract", log_etl)
-            # return {}
-            raise CustomException(e)
+    except Exception as e:
+        LogException(e, "Extract", log_etl)
+        # return {}
+        raise CustomException(e)
+    finally:
+        if own_pool:
+            await browser_pool.close()
 
 
 def get_dict_from_MongoDB(
@@ -286,7 +327,8 @@ def put_dict_to_MongoDB(
         raise CustomException(e)
 
 
-def check_duplicate_videos_database():
+@staged("duplicate_check")
+def check_duplicate_videos_database(data: pd.DataFrame) -> pd.DataFrame:
     try:
         log_etl.info("Extract: Checking files to skip downloading")
         # text files that are present locally
@@ -299,36 +341,24 @@ def check_duplicate_videos_database():
         log_etl.info(f"Full Data:\n{db_data}")
 
         # {"pl_url": [], "sv_path": [], "vd_url": [], "vid_name": []}
-        to_remove_outer = []
-        for i in range(len(db_data["pl_url"])):
-            to_remove_inner = []
-            for j, video_name in enumerate(db_data["vid_name"][i]):
-                for files in files_local:
-                    if video_name in files:
-                        to_remove_inner.append(j)
-
-            for j in sorted(to_remove_inner, reverse=True):
-                db_data["vid_name"][i][j] = ""
-                db_data["vd_url"][i][j] = ""
-
-            if all(item == "" for item in db_data["vid_name"][i]):
-                to_remove_outer.append(i)
-
-        # Clean up outer lists
-        for i in sorted(to_remove_outer, reverse=True):
-            del db_data["pl_url"][i]
-            del db_data["sv_path"][i]
-            del db_data["vid_name"][i]
-            del db_data["vd_url"][i]
-
-        return db_data
+        items = build_work_items(
+            data=db_data,
+            source="youtube",
+            season_col="pl_url",
+            name_col="vid_name",
+            link_col="vd_url",
+            metadata=data,
+            folder_col="sv_path",
+        )
+        return drop_local_duplicates(items, files_local)
 
     except Exception as e:
         LogException(e, "Extract", log_etl)
         raise CustomException(e)
 
 
-def check_duplicate_blogs_database(data: pd.DataFrame):
+@staged("duplicate_check")
+def check_duplicate_blogs_database(data: pd.DataFrame) -> pd.DataFrame:
     try:
         log_etl.info("Extract: Checking files to skip downloading")
         # text files that are present locally
@@ -341,31 +371,15 @@ def check_duplicate_blogs_database(data: pd.DataFrame):
 
         log_etl.info(f"Full Data:\n{db_data}")
 
-        to_remove_outer = []
-        for i in range(len(db_data["base_url"])):
-            to_remove_inner = []
-            for j, video_name in enumerate(db_data["video_name"][i]):
-                file_name = f"{data['KEY'][i]}E{j + 1:02d}-{video_name} | CS Joseph.txt"
-                for files in files_local:
-                    # log_etl.info(f"Local: {files} DB: {file_name}")
-                    if file_name in files:
-                        # log_etl.info(f"Extract: Duplicate found: '{file_name}'")
-                        to_remove_inner.append(j)
-
-            for j in sorted(to_remove_inner, reverse=True):
-                db_data["video_name"][i][j] = ""
-                db_data["video_link"][i][j] = ""
-
-            if all(item == "" for item in db_data["video_name"][i]):
-                to_remove_outer.append(i)
-
-        # Clean up outer lists
-        for i in sorted(to_remove_outer, reverse=True):
-            del db_data["base_url"][i]
-            del db_data["video_name"][i]
-            del db_data["video_link"][i]
-
-        return db_data
+        items = build_work_items(
+            data=db_data,
+            source="blog",
+            season_col="base_url",
+            name_col="video_name",
+            link_col="video_link",
+            metadata=data,
+        )
+        return drop_local_duplicates(items, files_local)
 
     except Exception as e:
         LogException(e, "Extract", log_etl)
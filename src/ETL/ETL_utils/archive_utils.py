@@ -0,0 +1,142 @@
+import os
+import gzip
+import json
+import hashlib
+import threading
+import pandas as pd
+from datetime import datetime
+from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from crawl4ai import JsonCssExtractionStrategy
+
+from src.ETL.ETL_constants import ArchiveData
+
+from src.Logging.logger import log_etl
+from src.Exception.exception import CustomException, LogException
+
+
+class HtmlArchive:
+    """Content addressed, gzip compressed store of every fetched transcript page.
+
+    Identical html is stored once. The json lines index maps each url to
+    the sha of its latest fetch plus the file it was saved as, which is all
+    an offline re-extraction needs. A refetch with unchanged html adds no
+    index line, and superseded lines are compacted away on load.
+    """
+
+    COLUMNS = ["url", "sha", "fetched_at", "file_name", "save_dir"]
+
+    def __init__(
+        self,
+        html_dir: str = ArchiveData.HTML_DIR,
+        index_path: str = ArchiveData.INDEX_PATH,
+    ) -> None:
+        self.html_dir = html_dir
+        self.index_path = index_path
+        self._lock = threading.RLock()
+        # url -> (sha, file_name, save_dir) of its latest index line
+        self._latest: dict | None = None
+
+    def _load_latest(self) -> dict:
+        if self._latest is None:
+            entries = self.entries()
+            self._latest = {
+                url: (sha, file_name, save_dir)
+                for url, sha, file_name, save_dir in zip(
+                    entries["url"],
+                    entries["sha"],
+                    entries["file_name"],
+                    entries["save_dir"],
+                )
+            }
+        return self._latest
+
+    def path_of(self, sha: str) -> str:
+        return os.path.join(self.html_dir, sha[:2], f"{sha}.html.gz")
+
+    def put(self, url: str, html: str, file_name: str, save_dir: str) -> str:
+        data = html.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        path = self.path_of(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        record = {
+            "url": url,
+            "sha": sha,
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+            "file_name": file_name,
+            "save_dir": save_dir,
+        }
+        with self._lock:
+            latest = self._load_latest()
+            if latest.get(url) == (sha, file_name, save_dir):
+                return sha
+            latest[url] = (sha, file_name, save_dir)
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        return sha
+
+    def put_many(self, rows: List[dict]) -> None:
+        """rows: `{url, html, file_name, save_dir}`, pages without html are skipped."""
+        for row in rows:
+            if row["html"]:
+                self.put(row["url"], row["html"], row["file_name"], row["save_dir"])
+
+    def entries(self) -> pd.DataFrame:
+        """Latest archived fetch of every url, rewrites the index without the
+        superseded lines when it has any."""
+        if not os.path.exists(self.index_path):
+            return pd.DataFrame(columns=self.COLUMNS)
+        with self._lock:
+            index = pd.read_json(
+                self.index_path, lines=True, dtype=False, convert_dates=False
+            )
+            entries = index[self.COLUMNS].drop_duplicates("url", keep="last")
+            if len(entries) < len(index):
+                tmp_path = f"{self.index_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for record in entries.to_dict("records"):
+                        f.write(json.dumps(record) + "\n")
+                os.replace(tmp_path, self.index_path)
+        return entries.reset_index(drop=True)
+
+
+def _extract_one(args: Tuple[str, str, dict]) -> str:
+    """Process pool worker: apply the css schema to one archived page."""
+    url, path, schema = args
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        html = f.read()
+    extracted = JsonCssExtractionStrategy(schema=schema, verbose=False).run(url, [html])
+    return extracted[0].get("transcript", "") if extracted else ""
+
+
+def reextract_archive(
+    schema: dict,
+    archive: HtmlArchive = HtmlArchive(),
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    """Re-run `schema` over the whole archive on a process pool, no browser or
+    network involved. Returns `video_url, file_name, save_dir, trscps` rows."""
+    try:
+        entries = archive.entries()
+        log_etl.info(f"Reextract: Extracting {len(entries):04d} archived pages")
+        tasks = [
+            (url, archive.path_of(sha), schema)
+            for url, sha in zip(entries["url"], entries["sha"])
+        ]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            transcripts = list(executor.map(_extract_one, tasks, chunksize=8))
+
+        items = entries.rename(columns={"url": "video_url"})
+        items["trscps"] = transcripts
+        return items[["video_url", "file_name", "save_dir", "trscps"]]
+
+    except Exception as e:
+        LogException(e, "Reextract", log_etl)
+        raise CustomException(e)
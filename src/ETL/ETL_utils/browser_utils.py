@@ -0,0 +1,162 @@
+import time
+import uuid
+import psutil
+import weakref
+import asyncio
+from contextlib import nullcontext
+from typing import List
+from urllib.parse import urlparse
+from crawl4ai import (
+    AsyncWebCrawler,
+    BrowserConfig,
+    CrawlerRunConfig,
+    MemoryAdaptiveDispatcher,
+)
+
+from src.ETL.ETL_constants import BrowserBlocking
+from src.ETL.ETL_utils.limiter_utils import DomainLimiter
+
+from src.Logging.logger import log_etl
+
+# tabs that already carry the blocking route (the hook runs on every crawl)
+_routed_pages = weakref.WeakSet()
+
+
+def _site(url: str) -> str:
+    """Registrable part of the host, good enough to tell first from third party."""
+    host = urlparse(url).hostname or ""
+    return ".".join(host.split(".")[-2:])
+
+
+async def block_unneeded_resources(page, context=None, **kwargs):
+    """`on_page_context_created` hook: abort requests the css extraction never reads."""
+    if page in _routed_pages:
+        return page
+    _routed_pages.add(page)
+    page_site = {"site": None}
+
+    async def _route(route):
+        request = route.request
+        resource_type = request.resource_type
+        if request.is_navigation_request() and request.frame == page.main_frame:
+            page_site["site"] = _site(request.url)
+            return await route.continue_()
+        if resource_type in BrowserBlocking.RESOURCE_TYPES:
+            return await route.abort()
+        if (
+            resource_type in BrowserBlocking.THIRD_PARTY_TYPES
+            and page_site["site"]
+            and _site(request.url) != page_site["site"]
+        ):
+            return await route.abort()
+        return await route.continue_()
+
+    await page.route("**/*", _route)
+    return page
+
+
+class BrowserPool:
+    """One long lived crawler (chromium + its cached contexts) for the whole run.
+
+    Link discovery and transcript scraping both borrow the same crawler, so
+    chromium is launched once instead of once per stage. `crawl_in_tabs`
+    recycles a fixed set of tabs (crawl4ai sessions) instead of opening and
+    closing one per url. Every new tab gets the resource blocking hook.
+    The pool must be used (and closed) on the event loop that started it.
+    """
+
+    def __init__(self, browser_config: BrowserConfig, block_resources: bool = True):
+        self.browser_config = browser_config
+        self.block_resources = block_resources
+        self._crawler: AsyncWebCrawler | None = None
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> AsyncWebCrawler:
+        async with self._lock:
+            if self._crawler is None:
+                log_etl.info("Extract: Launching shared browser")
+                crawler = AsyncWebCrawler(config=self.browser_config)
+                if self.block_resources:
+                    crawler.crawler_strategy.set_hook(
+                        "on_page_context_created", block_unneeded_resources
+                    )
+                self._crawler = await crawler.start()
+            return self._crawler
+
+    @staticmethod
+    async def release_session(crawler: AsyncWebCrawler, session_id: str) -> None:
+        """Close the tab of `session_id`. Unlike `kill_session` this leaves its
+        browser context open, other sessions of the same config share it."""
+        sessions = crawler.crawler_strategy.browser_manager.sessions
+        if session_id in sessions:
+            _, page, _ = sessions.pop(session_id)
+            await page.close()
+
+    @staticmethod
+    async def _wait_for_memory(dispatcher: MemoryAdaptiveDispatcher | None) -> None:
+        if dispatcher is None:
+            return
+        timeout = dispatcher.memory_wait_timeout or float("inf")
+        deadline = time.monotonic() + timeout
+        threshold = dispatcher.memory_threshold_percent
+        if psutil.virtual_memory().percent >= threshold:
+            log_etl.info(f"Extract: Memory above {threshold}%, pausing new pages")
+        while psutil.virtual_memory().percent >= threshold:
+            if time.monotonic() >= deadline:
+                raise MemoryError(f"Memory above {threshold}% for {timeout}s")
+            await asyncio.sleep(dispatcher.check_interval)
+
+    async def crawl_in_tabs(
+        self,
+        urls: List[str],
+        run_config: CrawlerRunConfig,
+        tabs: int,
+        limiter: DomainLimiter | None = None,
+        dispatcher: MemoryAdaptiveDispatcher | None = None,
+    ) -> list:
+        """Crawl `urls` over at most `tabs` reused tabs, one url per tab at a
+        time, each fetch gated by `limiter`. No url is handed to a tab while
+        system memory is over the `dispatcher`'s threshold (its back-pressure,
+        without its one-tab-per-url sessions). Returns one `CrawlResult` (or
+        the exception raised) per url, in order."""
+        crawler = await self.get()
+        pending: asyncio.Queue = asyncio.Queue()
+        for i, url in enumerate(urls):
+            pending.put_nowait((i, url))
+        results: list = [None] * len(urls)
+
+        async def _tab(session_id: str) -> None:
+            tab_config = run_config.clone(session_id=session_id)
+            try:
+                while not pending.empty():
+                    i, url = pending.get_nowait()
+                    try:
+                        await self._wait_for_memory(dispatcher)
+                        async with (
+                            limiter.acquire_async(url) if limiter else nullcontext()
+                        ):
+                            container = await crawler.arun(url=url, config=tab_config)
+                        results[i] = container._results[0]
+                    except Exception as e:
+                        results[i] = e
+            finally:
+                await self.release_session(crawler, session_id)
+
+        run_id = uuid.uuid4().hex[:8]
+        await asyncio.gather(
+            *(_tab(f"tab-{run_id}-{n}") for n in range(min(tabs, len(urls))))
+        )
+        return results
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._crawler is not None:
+                log_etl.info("Extract: Closing shared browser")
+                await self._crawler.close()
+                self._crawler = None
+
+    async def __aenter__(self) -> "BrowserPool":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
@@ -0,0 +1,258 @@
+import os
+import re
+import zlib
+import json
+import numpy as np
+from glob import glob
+from typing import List, Tuple
+
+from src.ETL.ETL_config import DedupConfig
+from src.Utils.main_utils import read_transcript_body
+
+from src.Logging.logger import log_etl
+from src.Exception.exception import CustomException, LogException
+
+# (a * x + b) mod p with a, b, x < 2**32 never overflows uint64
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_WORD_RE = re.compile(r"[a-z0-9']+")
+# rows of the (perm x shingle) product computed at once, caps memory on long transcripts
+_SHINGLE_BLOCK = 8192
+
+
+def shingle_hashes(text: str, shingle_size: int = 3) -> np.ndarray:
+    """Unique 32 bit hashes of the lower cased word `shingle_size`-grams in `text`."""
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    word_hashes = np.fromiter(
+        (zlib.crc32(w.encode()) for w in words), dtype=np.uint64, count=len(words)
+    )
+    n = max(len(words) - shingle_size + 1, 1)
+    shingles = word_hashes[:n].copy()
+    for k in range(1, min(shingle_size, len(words))):
+        shingles = shingles * np.uint64(1_000_003) ^ word_hashes[k : k + n]
+    return np.unique(shingles & _MAX_HASH)
+
+
+def make_permutations(num_perm: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signature(
+    shingles: np.ndarray, perm_a: np.ndarray, perm_b: np.ndarray
+) -> np.ndarray:
+    """MinHash signature (one uint32 per permutation) of a shingle set."""
+    signature = np.full(len(perm_a), _MAX_HASH, dtype=np.uint64)
+    for start in range(0, len(shingles), _SHINGLE_BLOCK):
+        block = shingles[start : start + _SHINGLE_BLOCK]
+        hashed = (perm_a[:, None] * block[None, :] + perm_b[:, None]) % _MERSENNE_PRIME
+        np.minimum(signature, (hashed & _MAX_HASH).min(axis=1), out=signature)
+    return signature.astype(np.uint32)
+
+
+def lsh_candidate_pairs(
+    signatures: np.ndarray, bands: int, max_bucket: int = 64
+) -> np.ndarray:
+    """Pairs `(i, j)`, `i < j`, that share at least one LSH band bucket.
+
+    Buckets of one size are expanded together with `np.triu_indices`.
+    Buckets over `max_bucket` docs (boilerplate shared by many transcripts)
+    only pair their first doc with the others, linear instead of quadratic.
+    """
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    found = [np.zeros((0, 2), dtype=np.int64)]
+    for band in range(bands):
+        band_view = np.ascontiguousarray(signatures[:, band * rows : (band + 1) * rows])
+        _, bucket_ids = np.unique(band_view, axis=0, return_inverse=True)
+        bucket_ids = bucket_ids.ravel()
+        # docs grouped by bucket, ascending doc id within a bucket
+        order = np.argsort(bucket_ids, kind="stable")
+        starts = np.flatnonzero(np.r_[True, np.diff(bucket_ids[order]) != 0])
+        sizes = np.diff(np.r_[starts, n])
+        for size in np.unique(sizes[sizes > 1]):
+            # (buckets of this size, size) matrix of their docs
+            members = order[starts[sizes == size][:, None] + np.arange(size)]
+            if size <= max_bucket:
+                i, j = np.triu_indices(size, k=1)
+            else:
+                i, j = np.zeros(size - 1, dtype=np.int64), np.arange(1, size)
+            found.append(np.stack([members[:, i].ravel(), members[:, j].ravel()], 1))
+    return np.unique(np.concatenate(found), axis=0).astype(np.int64)
+
+
+def cluster_pairs(n: int, pairs: np.ndarray) -> List[List[int]]:
+    """Connected components (union find) over `n` docs, only clusters of 2+."""
+    parent = list(range(n))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in pairs:
+        root_i, root_j = find(int(i)), find(int(j))
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    clusters = {}
+    for x in range(n):
+        clusters.setdefault(find(x), []).append(x)
+    return [members for members in clusters.values() if len(members) > 1]
+
+
+class MinHashIndex:
+    """MinHash signatures of every transcript on disk, persisted between runs.
+
+    A file is only re-hashed when its size or mtime changed, so a run after a
+    scrape only pays for the new transcripts.
+    """
+
+    def __init__(self, dedup_config: DedupConfig = DedupConfig()) -> None:
+        self.config = dedup_config
+        self.perm_a, self.perm_b = make_permutations(
+            dedup_config.num_perm, dedup_config.seed
+        )
+        self.paths = np.zeros(0, dtype=str)
+        self.stamps = np.zeros((0, 2), dtype=np.int64)  # (size, mtime_ns)
+        self.lengths = np.zeros(0, dtype=np.int64)
+        self.signatures = np.zeros((0, dedup_config.num_perm), dtype=np.uint32)
+        if os.path.exists(dedup_config.index_path):
+            with np.load(dedup_config.index_path) as index:
+                if index["signatures"].shape[1] == dedup_config.num_perm and int(
+                    index["seed"]
+                ) == int(dedup_config.seed):
+                    self.paths = index["paths"]
+                    self.stamps = index["stamps"]
+                    self.lengths = index["lengths"]
+                    self.signatures = index["signatures"]
+
+    def update(self, file_paths: List[str]) -> int:
+        """Sync the index with `file_paths`, returns the number of (re)hashed files."""
+        known = {path: i for i, path in enumerate(self.paths.tolist())}
+        stamps = np.array(
+            [
+                (st.st_size, st.st_mtime_ns)
+                for st in (os.stat(path) for path in file_paths)
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        lengths = np.zeros(len(file_paths), dtype=np.int64)
+        signatures = np.zeros((len(file_paths), self.config.num_perm), dtype=np.uint32)
+
+        num_hashed = 0
+        for n, path in enumerate(file_paths):
+            i = known.get(path)
+            if i is not None and (self.stamps[i] == stamps[n]).all():
+                lengths[n] = self.lengths[i]
+                signatures[n] = self.signatures[i]
+                continue
+            text = read_transcript_body(path)
+            shingles = shingle_hashes(text, self.config.shingle_size)
+            lengths[n] = len(text)
+            signatures[n] = minhash_signature(shingles, self.perm_a, self.perm_b)
+            num_hashed += 1
+
+        self.paths = np.array(file_paths, dtype=str)
+        self.stamps, self.lengths, self.signatures = stamps, lengths, signatures
+        return num_hashed
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.config.index_path), exist_ok=True)
+        tmp_path = f"{self.config.index_path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            paths=self.paths,
+            stamps=self.stamps,
+            lengths=self.lengths,
+            signatures=self.signatures,
+            seed=np.int64(self.config.seed),
+        )
+        os.replace(tmp_path, self.config.index_path)
+
+    def duplicate_clusters(self) -> List[dict]:
+        """Near-duplicate clusters, each with a canonical document.
+
+        The canonical document is the one from the most preferred source
+        directory (YouTube first, it keeps timestamps), then the longest.
+        """
+        pairs = lsh_candidate_pairs(
+            self.signatures, self.config.bands, self.config.max_bucket
+        )
+        if len(pairs) == 0:
+            return []
+        # estimated jaccard = share of equal minhash values
+        similarity = (
+            self.signatures[pairs[:, 0]] == self.signatures[pairs[:, 1]]
+        ).mean(axis=1)
+        # empty transcripts share the all-max signature, never call them duplicates
+        keep = (similarity >= self.config.threshold) & (
+            self.lengths[pairs].min(axis=1) > 0
+        )
+        pairs, similarity = pairs[keep], similarity[keep]
+
+        source_rank = np.full(len(self.paths), len(self.config.source_dirs))
+        for rank, source_dir in reversed(list(enumerate(self.config.source_dirs))):
+            source_rank[np.char.startswith(self.paths, source_dir)] = rank
+
+        clusters = []
+        for members in cluster_pairs(len(self.paths), pairs):
+            members = np.array(members)
+            canonical = members[
+                np.lexsort((-self.lengths[members], source_rank[members]))[0]
+            ]
+            in_cluster = np.isin(pairs[:, 0], members)
+            clusters.append(
+                {
+                    "canonical": str(self.paths[canonical]),
+                    "duplicates": [
+                        str(self.paths[m]) for m in members if m != canonical
+                    ],
+                    "min_similarity": round(float(similarity[in_cluster].min()), 3),
+                }
+            )
+        return clusters
+
+
+def find_duplicate_transcripts(dedup_config: DedupConfig = DedupConfig()) -> dict:
+    """Detect near duplicate transcripts across the raw source folders and write
+    a report listing one canonical document per cluster."""
+    try:
+        file_paths = sorted(
+            path
+            for source_dir in dedup_config.source_dirs
+            for path in glob(f"{source_dir}/**/*.txt", recursive=True)
+        )
+        log_etl.info(f"Dedup: Indexing {len(file_paths):04d} transcripts")
+        index = MinHashIndex(dedup_config=dedup_config)
+        num_hashed = index.update(file_paths)
+        index.save()
+        log_etl.info(f"Dedup: Hashed {num_hashed:04d} new or changed transcripts")
+
+        clusters = index.duplicate_clusters()
+        duplicates = sorted(path for c in clusters for path in c["duplicates"])
+        report = {
+            "documents": len(file_paths),
+            "clusters": len(clusters),
+            "duplicates": len(duplicates),
+            "overlap_ratio": round(len(duplicates) / max(len(file_paths), 1), 4),
+            "skip": duplicates,
+            "groups": clusters,
+        }
+        os.makedirs(os.path.dirname(dedup_config.report_path), exist_ok=True)
+        with open(dedup_config.report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+        log_etl.info(
+            f"Dedup: {report['duplicates']:04d} of {report['documents']:04d} transcripts are near duplicates in {report['clusters']:04d} clusters ({report['overlap_ratio']:.1%})"
+        )
+        return report
+
+    except Exception as e:
+        LogException(e, "Dedup", log_etl)
+        raise CustomException(e)
@@ -0,0 +1,255 @@
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from pymongo import ASCENDING, MongoClient, ReturnDocument, UpdateOne
+
+from src.ETL.ETL_config import JobQueueConfig
+from src.Entity.config_entity import MongoDBConfig
+
+from src.Logging.logger import log_etl
+from src.Exception.exception import CustomException, LogException
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class JobQueue:
+    """Work items stored in mongodb, drained by any number of worker processes.
+
+    A job is `queued`, `leased`, `done` or `failed`. `claim` leases the
+    oldest available job atomically (`find_one_and_update`), the lease runs
+    out after `lease_s` unless the worker sends a `heartbeat`. A job whose
+    lease ran out (the worker crashed or hung) is claimable again, until it
+    has been claimed `max_attempts` times. Ack / nack / heartbeat only apply
+    while the caller still holds the lease, so a worker that lost its lease
+    can never overwrite the result of the one that took the job over.
+
+    Job ids are the work item urls, enqueueing an item that is already
+    queued or done is a no-op, so producers on several nodes never queue the
+    same transcript twice.
+    """
+
+    def __init__(
+        self,
+        queue_config: JobQueueConfig = JobQueueConfig(),
+        db_config: MongoDBConfig = MongoDBConfig(),
+    ) -> None:
+        self.config = queue_config
+        self.collection = MongoClient(db_config.mongo_db_url)[db_config.database][
+            db_config.collection_jobs
+        ]
+        self.collection.create_index(
+            [("status", ASCENDING), ("source", ASCENDING), ("available_at", ASCENDING)]
+        )
+        self.collection.create_index(
+            [("status", ASCENDING), ("lease_expires", ASCENDING)]
+        )
+
+    def enqueue(self, source: str, items: List[dict], key: str = "video_url") -> int:
+        """Queue `items` (one payload dict each) under `source`, returns how many were new."""
+        try:
+            if not items:
+                return 0
+            now = _now()
+            operations = [
+                UpdateOne(
+                    {"_id": item[key]},
+                    {
+                        "$setOnInsert": {
+                            "source": source,
+                            "payload": item,
+                            "status": "queued",
+                            "attempts": 0,
+                            "enqueued_at": now,
+                            "available_at": now,
+                        }
+                    },
+                    upsert=True,
+                )
+                for item in items
+            ]
+            result = self.collection.bulk_write(operations, ordered=False)
+            log_etl.info(
+                f"Queue: Enqueued {result.upserted_count:03d} new '{source}' jobs "
+                f"({len(items) - result.upserted_count:03d} already known)"
+            )
+            return result.upserted_count
+
+        except Exception as e:
+            LogException(e, "Queue", log_etl)
+            raise CustomException(e)
+
+    def claim(self, worker_id: str, sources: List[str]) -> dict | None:
+        """Lease the oldest available job of `sources`, None when there is none."""
+        try:
+            now = _now()
+            return self.collection.find_one_and_update(
+                {
+                    "source": {"$in": sources},
+                    "attempts": {"$lt": self.config.max_attempts},
+                    "$or": [
+                        {"status": "queued", "available_at": {"$lte": now}},
+                        {"status": "leased", "lease_expires": {"$lt": now}},
+                    ],
+                },
+                {
+                    "$set": {
+                        "status": "leased",
+                        "worker": worker_id,
+                        "leased_at": now,
+                        "lease_expires": now + timedelta(seconds=self.config.lease_s),
+                    },
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("available_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
+            )
+
+        except Exception as e:
+            LogException(e, "Queue", log_etl)
+            raise CustomException(e)
+
+    def claim_many(self, worker_id: str, sources: List[str], limit: int) -> List[dict]:
+        jobs = []
+        while len(jobs) < limit:
+            job = self.claim(worker_id, sources)
+            if job is None:
+                break
+            jobs.append(job)
+        return jobs
+
+    def _update_leased(self, job_id: str, worker_id: str, update: dict) -> bool:
+        result = self.collection.update_one(
+            {"_id": job_id, "status": "leased", "worker": worker_id}, update
+        )
+        return result.modified_count == 1
+
+    def heartbeat(self, job_ids: List[str], worker_id: str) -> List[str]:
+        """Extend the leases of `job_ids`, returns the ids this worker no longer holds."""
+        expires = _now() + timedelta(seconds=self.config.lease_s)
+        return [
+            job_id
+            for job_id in job_ids
+            if not self._update_leased(
+                job_id, worker_id, {"$set": {"lease_expires": expires}}
+            )
+        ]
+
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        done = self._update_leased(
+            job_id,
+            worker_id,
+            {"$set": {"status": "done", "finished_at": _now(), "error": None}},
+        )
+        if not done:
+            log_etl.info(f"Queue: Lease on '{job_id}' was lost, result not recorded")
+        return done
+
+    def fail(
+        self,
+        job: dict,
+        worker_id: str,
+        error: BaseException,
+        retry: bool = False,
+        delay_s: float = 0.0,
+    ) -> bool:
+        """Requeue the job after `delay_s` when `retry` and attempts are left,
+        otherwise mark it failed."""
+        retry = retry and job["attempts"] < self.config.max_attempts
+        fields = {"error": str(error) or type(error).__name__}
+        if retry:
+            fields.update(
+                status="queued", available_at=_now() + timedelta(seconds=delay_s)
+            )
+        else:
+            fields.update(status="failed", finished_at=_now())
+        return self._update_leased(job["_id"], worker_id, {"$set": fields})
+
+    def reap(self) -> int:
+        """Mark jobs failed that crashed their worker on every attempt."""
+        result = self.collection.update_many(
+            {
+                "status": "leased",
+                "lease_expires": {"$lt": _now()},
+                "attempts": {"$gte": self.config.max_attempts},
+            },
+            {"$set": {"status": "failed", "error": "Lease expired on every attempt"}},
+        )
+        return result.modified_count
+
+    def requeue_failed(self, sources: List[str]) -> int:
+        """Give failed jobs a fresh set of attempts, e.g. after a scraper fix."""
+        result = self.collection.update_many(
+            {"status": "failed", "source": {"$in": sources}},
+            {"$set": {"status": "queued", "attempts": 0, "available_at": _now()}},
+        )
+        return result.modified_count
+
+    def counts(self, sources: List[str]) -> Dict[str, int]:
+        """Jobs per status, expired leases counted as `queued`."""
+        counts = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+        now = _now()
+        for row in self.collection.aggregate(
+            [
+                {"$match": {"source": {"$in": sources}}},
+                {
+                    "$project": {
+                        "status": {
+                            "$cond": [
+                                {
+                                    "$and": [
+                                        {"$eq": ["$status", "leased"]},
+                                        {"$lt": ["$lease_expires", now]},
+                                    ]
+                                },
+                                "queued",
+                                "$status",
+                            ]
+                        }
+                    }
+                },
+                {"$group": {"_id": "$status", "n": {"$sum": 1}}},
+            ]
+        ):
+            counts[row["_id"]] = row["n"]
+        return counts
+
+
+class LeaseKeeper:
+    """Background thread renewing the leases of the jobs being processed."""
+
+    def __init__(self, queue: JobQueue, worker_id: str, job_ids: List[str]) -> None:
+        self.queue = queue
+        self.worker_id = worker_id
+        self.job_ids = job_ids
+        self.lost: List[str] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.queue.config.heartbeat_s):
+            try:
+                lost = self.queue.heartbeat(self.job_ids, self.worker_id)
+            except Exception as e:
+                # a missed beat is fine, the lease outlives a few of them
+                LogException(e, "Queue", log_etl)
+                continue
+            for job_id in lost:
+                log_etl.info(f"Queue: Lost the lease on '{job_id}'")
+            self.lost.extend(lost)
+            self.job_ids = [job_id for job_id in self.job_ids if job_id not in lost]
+
+    def __enter__(self) -> "LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._stop.set()
+        self._thread.join()
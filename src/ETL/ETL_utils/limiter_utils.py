@@ -0,0 +1,92 @@
+import time
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, List
+from urllib.parse import urlparse
+
+from src.ETL.ETL_config import OrchestratorConfig
+
+
+class DomainLimiter:
+    """Per-domain concurrency and politeness gate shared by every source writer.
+
+    Thread safe, so the youtube thread pool (`acquire`) and the blog event
+    loop (`acquire_async`) draw from the same limits. The domain limits of
+    the sources in a run are scaled down together so their sum never goes
+    over `global_budget`.
+    """
+
+    def __init__(
+        self,
+        orchestrator_config: OrchestratorConfig = OrchestratorConfig(),
+        domains: List[str] | None = None,
+    ) -> None:
+        self.config = orchestrator_config
+        self.permits = self._scale_permits(domains or list(self.config.domain_limits))
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._gates: Dict[str, threading.Lock] = {}
+        self._last_start: Dict[str, float] = {}
+
+    def _scale_permits(self, domains: List[str]) -> Dict[str, int]:
+        limits = {d: self.config.domain_limits.get(d, self._default()) for d in domains}
+        total = sum(limits.values())
+        scale = min(1.0, self.config.global_budget / total) if total else 1.0
+        return {d: max(1, int(limit * scale)) for d, limit in limits.items()}
+
+    def _default(self) -> int:
+        return self.config.domain_limits.get("default", 1)
+
+    def domain_of(self, url: str) -> str:
+        """Configured domain a url belongs to (`www.youtube.com` -> `youtube.com`)."""
+        host = (urlparse(url).hostname or url).lower()
+        for domain in self.config.domain_limits:
+            if host == domain or host.endswith(f".{domain}"):
+                return domain
+        return host.removeprefix("www.")
+
+    def permit(self, domain: str) -> int:
+        return self.permits.get(domain, self._default())
+
+    def _slot(self, domain: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if domain not in self._slots:
+                self._slots[domain] = threading.BoundedSemaphore(self.permit(domain))
+                self._gates[domain] = threading.Lock()
+                self._last_start[domain] = 0.0
+            return self._slots[domain]
+
+    def _interval(self, domain: str) -> float:
+        return self.config.min_interval.get(
+            domain, self.config.min_interval.get("default", 0.0)
+        )
+
+    def _reserve_start(self, domain: str) -> float:
+        """Book the domain's next request start, returns the seconds to wait for it."""
+        with self._gates[domain]:
+            now = time.monotonic()
+            start = max(now, self._last_start[domain] + self._interval(domain))
+            self._last_start[domain] = start
+            return start - now
+
+    @contextmanager
+    def acquire(self, url: str) -> Iterator[None]:
+        """Hold one of the url's domain slots, spacing request starts by `min_interval`."""
+        domain = self.domain_of(url)
+        with self._slot(domain):
+            time.sleep(self._reserve_start(domain))
+            yield
+
+    @asynccontextmanager
+    async def acquire_async(self, url: str) -> AsyncIterator[None]:
+        """`acquire` for the event loop, waits without blocking it."""
+        domain = self.domain_of(url)
+        slot = self._slot(domain)
+        while not slot.acquire(blocking=False):
+            await asyncio.sleep(0.05)
+        try:
+            await asyncio.sleep(self._reserve_start(domain))
+            yield
+        finally:
+            slot.release()
@@ -0,0 +1,231 @@
+import os
+import json
+import time
+import heapq
+import random
+import itertools
+import threading
+from datetime import datetime
+from http.client import HTTPException
+from typing import Callable, List, Literal
+from urllib.error import HTTPError, URLError
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pytube import exceptions as pytube_errors
+from youtube_transcript_api import (
+    AgeRestricted,
+    InvalidVideoId,
+    NoTranscriptFound,
+    RequestBlocked,
+    TranscriptsDisabled,
+    VideoUnavailable,
+    VideoUnplayable,
+    YouTubeRequestFailed,
+)
+
+from src.ETL.ETL_config import RetryConfig
+from src.ETL.ETL_constants import ETLState
+from src.Utils.profile_utils import track_pool
+
+from src.Logging.logger import log_etl
+from src.Exception.exception import CustomException, LogException
+
+ErrorKind = Literal["transient", "permanent"]
+
+# the video or page itself is the problem, retrying will not help
+PERMANENT_ERRORS = (
+    NoTranscriptFound,
+    TranscriptsDisabled,
+    VideoUnavailable,
+    VideoUnplayable,
+    InvalidVideoId,
+    AgeRestricted,
+    pytube_errors.VideoUnavailable,
+)
+# throttling / network hiccups, worth another attempt after a pause
+TRANSIENT_ERRORS = (
+    RequestBlocked,
+    YouTubeRequestFailed,
+    ConnectionError,
+    TimeoutError,
+    URLError,
+    HTTPException,
+    pytube_errors.MaxRetriesExceeded,
+)
+TRANSIENT_STATUS_CODES = {408, 425, 429}
+
+
+class FetchError(Exception):
+    """Failed fetch that is not an exception on its own, e.g. an unsuccessful
+    crawl result. Carries the HTTP status code so it can be classified."""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def classify_status(status_code: int | None) -> ErrorKind:
+    if status_code is None:  # no response at all, network level failure
+        return "transient"
+    if status_code in TRANSIENT_STATUS_CODES or status_code >= 500:
+        return "transient"
+    return "permanent"
+
+
+def classify_error(error: BaseException) -> ErrorKind:
+    # look through `CustomException` to the error it wraps
+    while isinstance(error, CustomException) and error.error is not None:
+        error = error.error
+
+    if isinstance(error, HTTPError):
+        return classify_status(error.code)
+    if isinstance(error, FetchError):
+        return classify_status(error.status_code)
+    if isinstance(error, PERMANENT_ERRORS):
+        return "permanent"
+    if isinstance(error, TRANSIENT_ERRORS):
+        return "transient"
+    return "permanent"
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Full-jitter exponential backoff for the given (1-based) attempt."""
+    return random.uniform(0, min(max_delay, base_delay * 2**attempt))
+
+
+class DeadLetterQueue:
+    """Persistent list of work items that exhausted their retries.
+
+    Entries are keyed by `(source, key)` so a failing item is recorded once and
+    its attempt count / last error are refreshed. The file is rewritten
+    atomically on every change so it survives a crashed run.
+    """
+
+    def __init__(self, path: str = ETLState.DEAD_LETTER_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict = self._load()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        return {f"{e['source']}::{e['key']}": e for e in entries}
+
+    def _flush(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(list(self._entries.values()), f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def push(
+        self,
+        source: str,
+        key: str,
+        payload: dict,
+        error: BaseException,
+        kind: ErrorKind,
+        attempts: int,
+    ) -> None:
+        with self._lock:
+            self._entries[f"{source}::{key}"] = {
+                "source": source,
+                "key": key,
+                "payload": payload,
+                "kind": kind,
+                "error": str(error) or type(error).__name__,
+                "attempts": attempts,
+                "failed_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            self._flush()
+        log_etl.info(
+            f"Extract: Dead lettered '{key}' after {attempts} attempt(s) ({kind}): {error}"
+        )
+
+    def discard(self, source: str, key: str) -> None:
+        with self._lock:
+            if self._entries.pop(f"{source}::{key}", None) is not None:
+                self._flush()
+
+    def items(self, source: str) -> List[dict]:
+        with self._lock:
+            return [e for e in self._entries.values() if e["source"] == source]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def run_with_retry(
+    func: Callable[..., None],
+    items: List[dict],
+    source: str,
+    key: str,
+    dead_letter: DeadLetterQueue,
+    retry_config: RetryConfig = RetryConfig(),
+) -> List[dict]:
+    """Run `func(**item)` for every item on a thread pool.
+
+    Transient failures are rescheduled after a jittered backoff instead of
+    sleeping inside the worker, so a struggling item never holds a thread
+    that other items could use. Permanent failures and items that run out of
+    attempts go to `dead_letter`; successful items are discarded from it.
+    Returns the items that were dead lettered.
+    """
+    try:
+        failed = []
+        delayed = []  # heap of (ready_at, tie_breaker, item, attempt)
+        counter = itertools.count()
+        func = track_pool(source, retry_config.max_workers, func)
+        with ThreadPoolExecutor(max_workers=retry_config.max_workers) as executor:
+            running = {executor.submit(func, **item): (item, 1) for item in items}
+            while running or delayed:
+                # resubmit items whose backoff has elapsed
+                now = time.monotonic()
+                while delayed and delayed[0][0] <= now:
+                    _, _, item, attempt = heapq.heappop(delayed)
+                    running[executor.submit(func, **item)] = (item, attempt)
+                timeout = max(0.0, delayed[0][0] - now) if delayed else None
+
+                if not running:
+                    time.sleep(timeout)
+                    continue
+
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item, attempt = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        dead_letter.discard(source, item[key])
+                        continue
+
+                    kind = classify_error(error)
+                    if kind == "transient" and attempt < retry_config.max_retries:
+                        delay = backoff_delay(
+                            attempt, retry_config.base_delay, retry_config.max_delay
+                        )
+                        log_etl.info(
+                            f"Extract: Retrying '{item[key]}' in {delay:.1f}s (attempt {attempt + 1}/{retry_config.max_retries})"
+                        )
+                        heapq.heappush(
+                            delayed,
+                            (
+                                time.monotonic() + delay,
+                                next(counter),
+                                item,
+                                attempt + 1,
+                            ),
+                        )
+                    else:
+                        dead_letter.push(source, item[key], item, error, kind, attempt)
+                        failed.append(item)
+
+        if failed:
+            log_etl.info(
+                f"Extract: {len(failed)} of {len(items)} '{source}' item(s) dead lettered"
+            )
+        return failed
+
+    except Exception as e:
+        LogException(e, "Extract", log_etl)
+        raise CustomException(e)
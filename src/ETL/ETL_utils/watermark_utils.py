@@ -0,0 +1,56 @@
+import os
+import json
+from datetime import datetime, timedelta
+from typing import List
+
+from src.ETL.ETL_config import DiscoveryConfig
+
+
+class BlogWatermarks:
+    """Per season record of the newest known article and every known article.
+
+    {
+        'season-url': {
+            'watermark': 'newest-article-link',
+            'articles': [['video_name', 'video_link'], ...],   # newest first
+            'last_full_crawl': '2025-01-31T10:00:00',
+        },
+    }
+    """
+
+    def __init__(self, discovery_config: DiscoveryConfig = DiscoveryConfig()) -> None:
+        self.config = discovery_config
+        self.path = discovery_config.watermark_path
+        self.seasons: dict = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.seasons = json.load(f)
+
+    def needs_full_crawl(self, base_url: str) -> bool:
+        season = self.seasons.get(base_url)
+        if not season or not season["articles"]:
+            return True
+        last_full = datetime.fromisoformat(season["last_full_crawl"])
+        return datetime.now() - last_full >= timedelta(days=self.config.full_crawl_days)
+
+    def articles(self, base_url: str) -> List[List[str]]:
+        return self.seasons.get(base_url, {}).get("articles", [])
+
+    def watermark(self, base_url: str) -> str:
+        return self.seasons.get(base_url, {}).get("watermark", "")
+
+    def update(self, base_url: str, articles: List[List[str]], full: bool) -> None:
+        season = self.seasons.setdefault(
+            base_url, {"last_full_crawl": datetime.min.isoformat()}
+        )
+        season["articles"] = articles
+        season["watermark"] = articles[0][1] if articles else ""
+        if full:
+            season["last_full_crawl"] = datetime.now().isoformat(timespec="seconds")
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.seasons, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,113 @@
+import os
+import pandas as pd
+from typing import List, Literal
+
+from src.ETL.ETL_constants import RawData
+
+# one row per episode, season level columns repeat so they are stored as categories
+WORK_ITEM_COLUMNS = [
+    "source",
+    "season_key",
+    "season_name",
+    "season_url",
+    "episode",
+    "video_name",
+    "video_url",
+    "file_name",
+    "save_dir",
+]
+CATEGORY_COLUMNS = ["source", "season_key", "season_name", "season_url", "save_dir"]
+# `KEY` + `E01-` + first 2 title characters, used by the manual youtube check
+PREFIX_LEN = 9
+
+
+def build_work_items(
+    data: dict,
+    source: Literal["youtube", "blog"],
+    season_col: str,
+    name_col: str,
+    link_col: str,
+    metadata: pd.DataFrame,
+    folder_col: str | None = None,
+) -> pd.DataFrame:
+    """Explode the mongo style nested lists into the work item table.
+
+    data = {
+        'base_url'  : ['url-1', 'url-3'],
+        'video_name': [['url-1_vids-1', 'url-1_vids-2'], ['url-3_vids-1']],
+        'video_link': [['url-1_link-1', 'url-1_link-2'], ['url-3_link-1']],
+    }
+    Season key / folder come from `metadata` joined on the season url, so the
+    row order of `data` and `metadata` no longer has to match. Blog lists are
+    newest first (as crawled), youtube playlists oldest first.
+    """
+    frame = pd.DataFrame(
+        {
+            "season_url": data[season_col],
+            "video_name": data[name_col],
+            "video_url": data[link_col],
+        }
+    )
+    if folder_col:
+        frame["season_name"] = data[folder_col]
+    frame = frame.explode(["video_name", "video_url"], ignore_index=True)
+    # episode number is the position in the season, count before dropping anything.
+    # Blog seasons list the newest article first, count those from the oldest so a
+    # new article does not renumber (and rename) every known one
+    frame["episode"] = (
+        frame.groupby("season_url", sort=False).cumcount(ascending=source != "blog") + 1
+    )
+    frame = frame[frame["video_name"].notna() & (frame["video_name"] != "")]
+
+    meta = metadata.rename(
+        columns={"URL": "season_url", "KEY": "season_key", "NAME": "season_name"}
+    )
+    meta_cols = ["season_url", "season_key"] + ([] if folder_col else ["season_name"])
+    frame = frame.merge(
+        meta[meta_cols].drop_duplicates("season_url"), on="season_url", how="left"
+    )
+
+    if source == "youtube":
+        # `vid_name` is already the full file name
+        frame["file_name"] = frame["video_name"]
+        frame["save_dir"] = RawData.RAW_CSJ_FREE + "/" + frame["season_name"] + "/"
+    else:
+        file_name = (
+            frame["season_key"].astype(str)
+            + "E"
+            + frame["episode"].astype(str).str.zfill(2)
+            + "-"
+            + frame["video_name"]
+            + " | CS Joseph.txt"
+        )
+        frame["file_name"] = file_name.str.replace("/", "&", regex=False)
+        frame["save_dir"] = RawData.RAW_CSJ_BLOG + "/" + frame["season_name"] + "/"
+    frame["source"] = source
+
+    frame = frame[WORK_ITEM_COLUMNS].reset_index(drop=True)
+    return frame.astype({col: "category" for col in CATEGORY_COLUMNS})
+
+
+def drop_local_duplicates(
+    items: pd.DataFrame,
+    files_local: List[str],
+    match: Literal["name", "prefix"] = "name",
+) -> pd.DataFrame:
+    """Remove work items whose transcript file already exists locally."""
+    local_names = pd.Series([os.path.basename(f) for f in files_local], dtype=str)
+    if match == "prefix":
+        is_present = (
+            items["file_name"].str[:PREFIX_LEN].isin(local_names.str[:PREFIX_LEN])
+        )
+    else:
+        is_present = items["file_name"].isin(local_names)
+    items = items[~is_present].reset_index(drop=True)
+    # forget seasons that have nothing left to scrape
+    for col in CATEGORY_COLUMNS:
+        items[col] = items[col].cat.remove_unused_categories()
+    return items
+
+
+def to_records(items: pd.DataFrame, columns: List[str]) -> List[dict]:
+    """Plain `str` keyed records, e.g. kwargs for the per item workers."""
+    return items[columns].astype(object).to_dict(orient="records")
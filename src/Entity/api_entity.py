@@ -0,0 +1,28 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class ChatRequest(BaseModel):
+    session_id: str = Field(min_length=1, max_length=128)
+    question: str = Field(min_length=1, max_length=2000)
+
+
+class Source(BaseModel):
+    title: str
+    url: str
+    source: str
+    # where the passage starts in the video and a link that opens it there
+    start_s: float | None = None
+    link: str
+
+
+class Usage(BaseModel):
+    prompt_tokens: int
+    cached_tokens: int
+    completion_tokens: int
+
+
+class ChatResponse(BaseModel):
+    answer: str
+    sources: List[Source]
+    usage: Usage
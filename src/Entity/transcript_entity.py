@@ -0,0 +1,178 @@
+import os
+import numpy as np
+from typing import Iterable, Tuple
+from urllib.parse import urlencode, urlparse, parse_qsl, urlunparse
+
+
+class CompactTranscript:
+    """Timestamped transcript held as one text buffer plus numpy arrays.
+
+    `text` is every snippet joined by a newline. Snippet `i` lives in
+    `text[offsets[i]:offsets[i + 1] - 1]` and starts at `starts[i]` seconds for
+    `durations[i]` seconds. Keeping three flat arrays instead of one Python
+    object per snippet keeps the per-snippet cost at 12 bytes plus its text.
+    """
+
+    __slots__ = ("text", "offsets", "starts", "durations")
+
+    def __init__(
+        self,
+        text: str,
+        offsets: np.ndarray,
+        starts: np.ndarray,
+        durations: np.ndarray,
+    ) -> None:
+        self.text = text
+        self.offsets = offsets
+        self.starts = starts
+        self.durations = durations
+
+    @classmethod
+    def from_snippets(cls, snippets: Iterable) -> "CompactTranscript":
+        """Build from `youtube_transcript_api` snippets (`.text`, `.start`, `.duration`)."""
+        snippets = list(snippets)
+        count = len(snippets)
+        texts = [snippet.text.replace("\n", " ") for snippet in snippets]
+        offsets = np.zeros(count + 1, dtype=np.int32)
+        np.cumsum(
+            np.fromiter((len(t) + 1 for t in texts), dtype=np.int32, count=count),
+            out=offsets[1:],
+        )
+        starts = np.fromiter((s.start for s in snippets), dtype=np.float32, count=count)
+        durations = np.fromiter(
+            (s.duration for s in snippets), dtype=np.float32, count=count
+        )
+        return cls("\n".join(texts), offsets, starts, durations)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def snippet(self, i: int) -> Tuple[str, float, float]:
+        return (
+            self.text[self.offsets[i] : self.offsets[i + 1] - 1],
+            float(self.starts[i]),
+            float(self.durations[i]),
+        )
+
+    def time_at(self, char_pos: int) -> float:
+        """Start time (seconds) of the snippet containing `text[char_pos]`."""
+        i = int(np.searchsorted(self.offsets, char_pos, side="right")) - 1
+        return float(self.starts[min(max(i, 0), len(self) - 1)])
+
+    @staticmethod
+    def deep_link(video_url: str, seconds: float) -> str:
+        """YouTube link that starts playback at `seconds`."""
+        parts = urlparse(video_url)
+        query = dict(parse_qsl(parts.query))
+        query["t"] = f"{int(seconds)}s"
+        return urlunparse(parts._replace(query=urlencode(query)))
+
+    @staticmethod
+    def sidecar_path(file_path: str) -> str:
+        """`.npz` file stored next to a transcript `.txt` file."""
+        return f"{os.path.splitext(file_path)[0]}.npz"
+
+    def save_arrays(self, file_path: str) -> None:
+        np.savez_compressed(
+            self.sidecar_path(file_path),
+            offsets=self.offsets,
+            starts=self.starts,
+            durations=self.durations,
+        )
+
+    @classmethod
+    def from_sidecar(cls, text: str, file_path: str) -> "CompactTranscript":
+        """`text` (the transcript body already read) with the arrays saved next to `file_path`."""
+        with np.load(cls.sidecar_path(file_path)) as arrays:
+            return cls(text, arrays["offsets"], arrays["starts"], arrays["durations"])
+
+    @classmethod
+    def load(cls, file_path: str, header_lines: int = 4) -> "CompactTranscript":
+        """Load a saved transcript `.txt` (skipping the title/url header) with its arrays."""
+        with open(file_path, "r", encoding="utf-8") as f:
+            text = "".join(f.readlines()[header_lines:])
+        return cls.from_sidecar(text, file_path)
+
+
+class TranscriptChunk:
+    """One retrieved passage of an episode transcript.
+
+    `start` / `end` are character offsets into the transcript body, so two
+    chunks of the same `doc_id` can be told apart, ordered and merged.
+    `start_s` is where the passage starts in the video, None for blog text.
+    """
+
+    __slots__ = (
+        "chunk_id",
+        "doc_id",
+        "start",
+        "end",
+        "text",
+        "score",
+        "title",
+        "url",
+        "source",
+        "start_s",
+    )
+
+    def __init__(
+        self,
+        chunk_id: int,
+        doc_id: int,
+        start: int,
+        end: int,
+        text: str,
+        score: float = 0.0,
+        title: str = "",
+        url: str = "",
+        source: str = "",
+        start_s: float | None = None,
+    ) -> None:
+        self.chunk_id = chunk_id
+        self.doc_id = doc_id
+        self.start = start
+        self.end = end
+        self.text = text
+        self.score = score
+        self.title = title
+        self.url = url
+        self.source = source
+        self.start_s = start_s
+
+    @property
+    def link(self) -> str:
+        """Source url, a youtube link opens the video at the passage."""
+        if self.start_s is None:
+            return self.url
+        return CompactTranscript.deep_link(self.url, self.start_s)
+
+    def touches(self, other: "TranscriptChunk") -> bool:
+        """Same episode and the two character ranges overlap or meet."""
+        return (
+            self.doc_id == other.doc_id
+            and other.start <= self.end
+            and self.start <= other.end
+        )
+
+    def merge(self, other: "TranscriptChunk") -> "TranscriptChunk":
+        """One chunk covering both ranges, the overlapping text is kept once."""
+        first, second = sorted((self, other), key=lambda c: c.start)
+        if second.end <= first.end:
+            text = first.text
+        else:
+            text = first.text + second.text[first.end - second.start :]
+        return TranscriptChunk(
+            chunk_id=first.chunk_id,
+            doc_id=first.doc_id,
+            start=first.start,
+            end=max(first.end, second.end),
+            text=text,
+            score=max(first.score, second.score),
+            title=first.title,
+            url=first.url,
+            source=first.source,
+            start_s=first.start_s,
+        )
+
+    def __repr__(self) -> str:
+        return f"TranscriptChunk(doc={self.doc_id}, {self.start}:{self.end}, score={self.score:.4f})"
@@ -8,6 +8,7 @@ from src.Logging.logger import log_ful
 class CustomException(Exception):
     def __init__(self, error: Exception | None = None):
         _, _, exc_tb = sys.exc_info()
+        self.error = error
         self.lineno = exc_tb.tb_lineno
         self.file_name = exc_tb.tb_frame.f_code.co_filename
         self.log_msg = f"Error: File - {self.file_name} , line - [{self.lineno}], error - [{str(error)}]"
@@ -4,13 +4,14 @@ from datetime import datetime
 from typing import Literal
 
 
-def get_logger(log_type: Literal["full", "etl", "flask"] = "etl"):
+def get_logger(log_type: Literal["full", "etl", "flask", "agent"] = "etl"):
     log_dirs = {
         "full": os.path.join(os.getcwd(), "logs", "full"),
         "train": os.path.join(os.getcwd(), "logs", "train"),
         "pred": os.path.join(os.getcwd(), "logs", "pred"),
         "etl": os.path.join(os.getcwd(), "logs", "etl"),
         "flask": os.path.join(os.getcwd(), "logs", "flask"),
+        "agent": os.path.join(os.getcwd(), "logs", "agent"),
     }
     log_dir = log_dirs.get(log_type)
     if not log_dir:
@@ -48,3 +49,4 @@ def get_logger(log_type: Literal["full", "etl", "flask"] = "etl"):
 log_ful = get_logger("full")
 log_etl = get_logger("etl")
 log_flk = get_logger("flask")
+log_agt = get_logger("agent")
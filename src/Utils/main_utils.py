@@ -0,0 +1,24 @@
+import os
+import json
+from typing import List
+
+
+def read_transcript_body(file_path: str, header_lines: int = 4) -> str:
+    """Transcript text without the `title / url` header written by the writers."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        return "".join(f.readlines()[header_lines:])
+
+
+def read_transcript_header(file_path: str) -> List[str]:
+    """`[title, url]` from the header written by the transcript writers."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        lines = [f.readline().strip() for _ in range(3)]
+    return [lines[0], lines[2]]
+
+
+def load_duplicate_paths(report_path: str) -> set:
+    """Transcripts that lost to a canonical document in the last dedup report."""
+    if not os.path.exists(report_path):
+        return set()
+    with open(report_path, "r", encoding="utf-8") as f:
+        return set(json.load(f)["skip"])
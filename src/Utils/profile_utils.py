@@ -0,0 +1,350 @@
+import os
+import sys
+import json
+import time
+import marshal
+import asyncio
+import inspect
+import functools
+import threading
+import numpy as np
+from datetime import datetime
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List
+
+from src.Entity.config_entity import ProfileConfig
+
+from src.Logging.logger import log_etl
+
+# the running `StageProfiler`, None outside of `--profile` runs
+_session: "StageProfiler | None" = None
+
+
+def stage(name: str):
+    """Profile the enclosed code as stage `name`, a no-op unless profiling."""
+    return _session.stage(name) if _session is not None else nullcontext()
+
+
+def staged(name: str) -> Callable:
+    """Decorator form of `stage`, for plain and async functions."""
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def _async(*args, **kwargs):
+                with stage(name):
+                    return await func(*args, **kwargs)
+
+            return _async
+
+        @functools.wraps(func)
+        def _sync(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+
+        return _sync
+
+    return decorator
+
+
+def track_pool(name: str, max_workers: int, func: Callable) -> Callable:
+    """`func` reporting busy time to the thread pool `name` while profiling."""
+    return _session.track_pool(name, max_workers, func) if _session else func
+
+
+async def run_profiled(coro):
+    """Await `coro`, timing its event loop's tasks while profiling."""
+    if _session is None:
+        return await coro
+    return await _session.watch_loop(coro)
+
+
+def _func_name(func: tuple) -> str:
+    filename, line, name = func
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+class StageProfiler:
+    """Per stage profiles, thread pool utilisation and asyncio task timing.
+
+    `cProfile` allows a single active profiler per process (python 3.12+),
+    so stages are profiled by sampling instead: every `sample_interval_s`
+    the stack of each thread inside a `stage` is recorded under that
+    thread's innermost stage. Samples are wall clock and see python frames
+    only, time blocked in C (sockets, locks, parsers) is charged to the
+    calling python function; `cpu_s` vs `stage_s` tells cpu from waiting.
+    Stages on the event loop also see whatever other task runs meanwhile,
+    the task timings tell those apart.
+
+    Writes `<stage>.prof` (pstats format: snakeviz, `python -m pstats`),
+    `<stage>.collapsed` (flamegraph.pl, speedscope) and `summary.json`.
+    """
+
+    def __init__(self, profile_config: ProfileConfig = ProfileConfig()) -> None:
+        self.config = profile_config
+        self.out_dir = os.path.join(
+            profile_config.profile_dir, datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        )
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stacks: Dict[int, list] = {}
+        self._stage_s: Dict[str, float] = defaultdict(float)
+        self._cpu_s: Dict[str, float] = defaultdict(float)
+        self._entries: Counter = Counter()
+        self._samples: Dict[str, Counter] = defaultdict(Counter)
+        self._pools: Dict[str, dict] = {}
+        self._tasks: Dict[str, List[float]] = defaultdict(list)
+        self._loop_lag: List[float] = []
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+            with self._lock:
+                self._stacks[threading.get_ident()] = stack
+        return stack
+
+    @contextmanager
+    def stage(self, name: str):
+        stack = self._stack()
+        entry = [name]
+        stack.append(entry)
+        start, start_cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            # coroutines on one loop can leave their stages out of order
+            stack.remove(entry)
+            with self._lock:
+                self._stage_s[name] += time.perf_counter() - start
+                self._cpu_s[name] += time.thread_time() - start_cpu
+                self._entries[name] += 1
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.config.sample_interval_s):
+            frames = sys._current_frames()
+            with self._lock:
+                active = [
+                    (ident, stack[-1][0])
+                    for ident, stack in self._stacks.items()
+                    if stack
+                ]
+            for ident, name in active:
+                frame = frames.get(ident)
+                funcs = []
+                while frame is not None:
+                    code = frame.f_code
+                    funcs.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                if funcs:
+                    self._samples[name][tuple(reversed(funcs))] += 1
+
+    def track_pool(self, name: str, max_workers: int, func: Callable) -> Callable:
+        with self._lock:
+            pool = self._pools.setdefault(
+                name,
+                {
+                    "workers": 0,
+                    "tasks": 0,
+                    "busy_s": 0.0,
+                    "wall_s": 0.0,
+                    "active": 0,
+                    "peak_active": 0,
+                    "started": None,
+                },
+            )
+            pool["workers"] = max(pool["workers"], max_workers)
+
+        def _tracked(*args, **kwargs):
+            start = time.perf_counter()
+            with self._lock:
+                pool["active"] += 1
+                pool["peak_active"] = max(pool["peak_active"], pool["active"])
+                pool["started"] = pool["started"] or start
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                with self._lock:
+                    pool["active"] -= 1
+                    pool["tasks"] += 1
+                    pool["busy_s"] += end - start
+                    pool["wall_s"] = end - pool["started"]
+
+        return _tracked
+
+    def _task_factory(self, loop, coro, **kwargs):
+        task = asyncio.Task(coro, loop=loop, **kwargs)
+        name = getattr(coro, "__qualname__", type(coro).__name__)
+        created = time.perf_counter()
+        task.add_done_callback(
+            lambda _: self._tasks[name].append(time.perf_counter() - created)
+        )
+        return task
+
+    async def _watch_lag(self, interval_s: float = 0.05) -> None:
+        # a late wake up means something blocked the loop (cpu work, sync io)
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval_s)
+            self._loop_lag.append(time.perf_counter() - start - interval_s)
+
+    async def watch_loop(self, coro):
+        loop = asyncio.get_running_loop()
+        watcher = asyncio.ensure_future(self._watch_lag())
+        loop.set_task_factory(self._task_factory)
+        try:
+            return await coro
+        finally:
+            loop.set_task_factory(None)
+            watcher.cancel()
+
+    def _write_stats(self, name: str, samples: Counter) -> tuple:
+        """Turn the stack samples of a stage into a pstats file, returns
+        the self / inclusive seconds per function."""
+        dt = self.config.sample_interval_s
+        self_s, total_s, callers = Counter(), Counter(), defaultdict(Counter)
+        for stack, count in samples.items():
+            self_s[stack[-1]] += count * dt
+            # recursion counts once towards inclusive time
+            for func in set(stack):
+                total_s[func] += count * dt
+            for caller, callee in set(zip(stack, stack[1:])):
+                callers[callee][caller] += count
+        stats = {
+            func: (
+                max(1, round(total_s[func] / dt)),
+                max(1, round(total_s[func] / dt)),
+                self_s[func],
+                total_s[func],
+                {caller: (n, n, 0.0, n * dt) for caller, n in callers[func].items()},
+            )
+            for func in total_s
+        }
+        with open(os.path.join(self.out_dir, f"{name}.prof"), "wb") as f:
+            marshal.dump(stats, f)
+        return self_s, total_s
+
+    def _stage_report(self, name: str) -> dict:
+        report = {
+            "entries": self._entries[name],
+            "stage_s": round(self._stage_s[name], 3),
+            # thread cpu time inside the stage, the rest is waiting
+            "cpu_s": round(self._cpu_s[name], 3),
+            "wait_share": round(
+                max(0.0, 1.0 - self._cpu_s[name] / (self._stage_s[name] or 1.0)), 3
+            ),
+            "samples": sum(self._samples[name].values()),
+        }
+        if not self._samples[name]:
+            return report
+
+        self_s, total_s = self._write_stats(name, self._samples[name])
+        report["hotspots"] = [
+            {
+                "function": _func_name(func),
+                "self_s": round(seconds, 3),
+                "total_s": round(total_s[func], 3),
+            }
+            for func, seconds in self_s.most_common(self.config.top_n)
+        ]
+        with open(
+            os.path.join(self.out_dir, f"{name}.collapsed"), "w", encoding="utf-8"
+        ) as f:
+            for stack, count in self._samples[name].most_common():
+                folded = ";".join(
+                    f"{os.path.basename(file)}:{func}" for file, _, func in stack
+                )
+                f.write(f"{folded} {count}\n")
+        return report
+
+    def start(self) -> "StageProfiler":
+        global _session
+        _session = self
+        self._sampler.start()
+        log_etl.info(f"Profile: Profiling run, output in '{self.out_dir}'")
+        return self
+
+    def stop(self) -> dict:
+        """Stop profiling, write the profile files and return the summary."""
+        global _session
+        _session = None
+        self._stop.set()
+        self._sampler.join()
+        os.makedirs(self.out_dir, exist_ok=True)
+
+        stages = [s for s in self.config.stages if s in self._entries]
+        stages += sorted(s for s in self._entries if s not in stages)
+        pools = {
+            name: {
+                "workers": pool["workers"],
+                "tasks": pool["tasks"],
+                "peak_active": pool["peak_active"],
+                "busy_s": round(pool["busy_s"], 3),
+                "wall_s": round(pool["wall_s"], 3),
+                # share of the pool's thread time spent running tasks
+                "utilization": round(
+                    pool["busy_s"] / (pool["workers"] * pool["wall_s"] or 1.0), 3
+                ),
+            }
+            for name, pool in self._pools.items()
+        }
+        tasks = {
+            name: {
+                "count": len(times),
+                "total_s": round(sum(times), 3),
+                "mean_ms": round(1e3 * sum(times) / len(times), 2),
+                "max_ms": round(1e3 * max(times), 2),
+            }
+            for name, times in sorted(
+                self._tasks.items(), key=lambda kv: sum(kv[1]), reverse=True
+            )
+        }
+        lag = np.array(self._loop_lag or [0.0]) * 1e3
+        summary = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "stages": {name: self._stage_report(name) for name in stages},
+            "thread_pools": pools,
+            "asyncio": {
+                "tasks": tasks,
+                "loop_lag_ms": {
+                    "p50": round(float(np.percentile(lag, 50)), 2),
+                    "p99": round(float(np.percentile(lag, 99)), 2),
+                    "max": round(float(lag.max()), 2),
+                },
+            },
+        }
+        with open(
+            os.path.join(self.out_dir, "summary.json"), "w", encoding="utf-8"
+        ) as f:
+            json.dump(summary, f, indent=2)
+
+        for name, report in summary["stages"].items():
+            log_etl.info(
+                f"Profile: Stage '{name}' {report['stage_s']:.2f}s "
+                f"({report['cpu_s']:.2f}s cpu, {report['wait_share']:.0%} waiting) "
+                f"over {report['entries']} entries"
+            )
+            for hotspot in report.get("hotspots", []):
+                log_etl.info(
+                    f"Profile:   {hotspot['self_s']:8.3f}s self "
+                    f"{hotspot['total_s']:8.3f}s total {hotspot['function']}"
+                )
+        for name, pool in pools.items():
+            log_etl.info(
+                f"Profile: Pool '{name}' {pool['utilization']:.0%} utilised "
+                f"({pool['tasks']} tasks, peak {pool['peak_active']}/{pool['workers']} threads)"
+            )
+        log_etl.info(f"Profile: Loop lag {summary['asyncio']['loop_lag_ms']} ms")
+        log_etl.info(f"Profile: Wrote profiles to '{self.out_dir}'")
+        return summary
+
+    def __enter__(self) -> "StageProfiler":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+from src.Agent.Agent_config import IndexConfig, StandInConfig
+from src.Agent.Agent_main import ChatAgent
+from src.Agent.Agent_utils import IndexManager, StandInLLM, content_hash, publish_index
+
+
+def make_agent(tmp_path) -> ChatAgent:
+    index_config = IndexConfig(gc_grace_s=0.0)
+    index_config.segment_dir = str(tmp_path / "segments")
+    index_config.manifest_path = str(tmp_path / "manifest.json")
+    bodies = [
+        f"episode {i} talks about topic{i} and the four sides " * 30 for i in range(5)
+    ]
+    publish_index(
+        [
+            {
+                "path": f"ep{i}.txt",
+                "title": f"Episode {i}",
+                "url": f"https://example.com/{i}",
+                "source": "youtube",
+                "body": body,
+                "hash": content_hash(body),
+            }
+            for i, body in enumerate(bodies)
+        ],
+        index_config,
+    )
+    manager = IndexManager(index_config)
+    manager.refresh()
+    llm = StandInLLM(
+        StandInConfig(prefill_ms_per_token=0.0, decode_ms_per_token=0.0, max_tokens=8)
+    )
+    return ChatAgent(index_manager=manager, llm=llm)
+
+
+def test_concurrent_turns_of_one_session_are_all_recorded(tmp_path):
+    agent = make_agent(tmp_path)
+    threads = [
+        threading.Thread(target=agent.respond, args=("s", f"what about topic{i}?"))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    questions = [turn["question"] for turn in agent.conversations["s"].turns]
+    assert sorted(questions) == sorted(f"what about topic{i}?" for i in range(8))
+
+
+def test_stream_waits_for_the_session_without_blocking_the_loop(tmp_path):
+    agent = make_agent(tmp_path)
+    _, lock = agent._session("s")
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        async def consume():
+            return "".join([piece async for piece in agent.stream("s", "topic1?")])
+
+        lock.acquire()
+        tick_task = asyncio.create_task(ticker())
+        answer_task = asyncio.create_task(consume())
+        await asyncio.sleep(0.1)
+        assert not answer_task.done() and ticks > 5
+        lock.release()
+        answer = await answer_task
+        tick_task.cancel()
+        return answer
+
+    answer = asyncio.run(main())
+    assert agent.conversations["s"].turns[0]["answer"] == answer
+    assert not lock.locked()
@@ -0,0 +1,87 @@
+import gzip
+
+from src.ETL.ETL_constants import BlogJSONSchema
+from src.ETL.ETL_utils.archive_utils import HtmlArchive, reextract_archive
+
+
+def page(transcript: str) -> str:
+    return (
+        '<html><body><div id="et-main-area"><div id="main-content">'
+        '<div class="et_pb_section et_pb_section_1">'
+        '<div class="et_pb_row et_pb_row_1">'
+        f'<div class="et_pb_column et_pb_column_4_4">{transcript}</div>'
+        "</div></div></div></div></body></html>"
+    )
+
+
+def make_archive(tmp_path) -> HtmlArchive:
+    return HtmlArchive(
+        html_dir=str(tmp_path / "html"), index_path=str(tmp_path / "index.jsonl")
+    )
+
+
+def index_lines(archive: HtmlArchive) -> int:
+    with open(archive.index_path, encoding="utf-8") as f:
+        return sum(1 for _ in f)
+
+
+def test_put_stores_html_once_and_indexes_changes_only(tmp_path):
+    archive = make_archive(tmp_path)
+    sha = archive.put("https://example.com/a", page("first"), "a.txt", "blog")
+    with gzip.open(archive.path_of(sha), "rt", encoding="utf-8") as f:
+        assert f.read() == page("first")
+
+    # a refetch of unchanged html adds nothing
+    assert archive.put("https://example.com/a", page("first"), "a.txt", "blog") == sha
+    archive.put("https://example.com/b", page("first"), "b.txt", "blog")
+    assert index_lines(archive) == 2
+
+    changed = archive.put("https://example.com/a", page("second"), "a.txt", "blog")
+    assert changed != sha
+    entries = archive.entries().set_index("url")
+    assert entries.loc["https://example.com/a", "sha"] == changed
+    assert entries.loc["https://example.com/b", "sha"] == sha
+    # loading compacts the superseded line away
+    assert index_lines(archive) == 2
+
+    # a fresh archive on the same index keeps deduplicating
+    reopened = make_archive(tmp_path)
+    reopened.put("https://example.com/a", page("second"), "a.txt", "blog")
+    assert index_lines(reopened) == 2
+
+
+def test_reextract_applies_the_schema_to_the_latest_fetch(tmp_path):
+    archive = make_archive(tmp_path)
+    archive.put_many(
+        [
+            {
+                "url": "https://example.com/a",
+                "html": page("old"),
+                "file_name": "a.txt",
+                "save_dir": "blog",
+            },
+            {
+                "url": "https://example.com/b",
+                "html": "",
+                "file_name": "b.txt",
+                "save_dir": "blog",
+            },
+            {
+                "url": "https://example.com/a",
+                "html": page("new"),
+                "file_name": "a.txt",
+                "save_dir": "blog",
+            },
+        ]
+    )
+    items = reextract_archive(
+        schema=BlogJSONSchema.SCHEMA_CSJ_BLOG_PAGE, archive=archive, max_workers=1
+    )
+    assert items.to_dict("records") == [
+        {
+            "video_url": "https://example.com/a",
+            "file_name": "a.txt",
+            "save_dir": "blog",
+            "trscps": "new",
+        }
+    ]
@@ -0,0 +1,61 @@
+import asyncio
+from types import SimpleNamespace
+
+from crawl4ai import MemoryAdaptiveDispatcher
+
+from src.ETL.ETL_utils import browser_utils
+from src.ETL.ETL_utils.browser_utils import BrowserPool
+
+
+class FakeCrawler:
+    def __init__(self, memory: list) -> None:
+        self.memory = memory
+        self.fetched_at = []
+        self.crawler_strategy = SimpleNamespace(
+            browser_manager=SimpleNamespace(sessions={})
+        )
+
+    async def arun(self, url, config):
+        self.fetched_at.append(self.memory[0])
+        return SimpleNamespace(_results=[url])
+
+
+class FakeRunConfig:
+    def clone(self, **kwargs):
+        return self
+
+
+def crawl(memory: list, dispatcher: MemoryAdaptiveDispatcher, monkeypatch) -> tuple:
+    readings = iter(memory)
+
+    def virtual_memory():
+        memory[0] = next(readings, memory[-1])
+        return SimpleNamespace(percent=memory[0])
+
+    monkeypatch.setattr(browser_utils.psutil, "virtual_memory", virtual_memory)
+    crawler = FakeCrawler(memory)
+    pool = BrowserPool(browser_config=None)
+    pool._crawler = crawler
+    urls = [f"https://csjoseph.life/post-{i}/" for i in range(3)]
+    results = asyncio.run(
+        pool.crawl_in_tabs(urls, FakeRunConfig(), tabs=2, dispatcher=dispatcher)
+    )
+    return results, crawler
+
+
+def test_pages_wait_while_memory_is_over_the_threshold(monkeypatch):
+    dispatcher = MemoryAdaptiveDispatcher(
+        memory_threshold_percent=80.0, check_interval=0.01
+    )
+    results, crawler = crawl([95.0, 95.0, 90.0, 50.0], dispatcher, monkeypatch)
+    assert results == [f"https://csjoseph.life/post-{i}/" for i in range(3)]
+    assert max(crawler.fetched_at) < 80.0
+
+
+def test_pages_fail_once_memory_stays_high(monkeypatch):
+    dispatcher = MemoryAdaptiveDispatcher(
+        memory_threshold_percent=80.0, check_interval=0.01, memory_wait_timeout=0.05
+    )
+    results, crawler = crawl([95.0], dispatcher, monkeypatch)
+    assert all(isinstance(r, MemoryError) for r in results)
+    assert crawler.fetched_at == []
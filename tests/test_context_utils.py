@@ -0,0 +1,95 @@
+import random
+
+from src.Agent.Agent_config import ContextConfig
+from src.Agent.Agent_utils.context_utils import (
+    ContextAssembler,
+    Conversation,
+    passage_text,
+)
+from src.Agent.Agent_utils.token_utils import count_tokens
+from src.Entity.transcript_entity import TranscriptChunk
+
+rng = random.Random(0)
+BODIES = [
+    " ".join(rng.choices(["ni", "fe", "ti", "se", "ne"], k=400)) for _ in range(3)
+]
+
+
+def chunk(doc_id: int, start: int, end: int, score: float) -> TranscriptChunk:
+    return TranscriptChunk(
+        chunk_id=doc_id * 10_000 + start,
+        doc_id=doc_id,
+        start=start,
+        end=end,
+        text=BODIES[doc_id][start:end],
+        score=score,
+        title=f"Episode {doc_id}",
+        source="youtube",
+    )
+
+
+def context_tokens(chunks) -> int:
+    return sum(count_tokens(passage_text(n, c)) for n, c in enumerate(chunks, 1))
+
+
+def test_pack_respects_the_context_budget():
+    chunks = [
+        chunk(doc_id, start, start + 200, score=rng.random())
+        for doc_id in range(3)
+        for start in range(0, 1000, 250)
+    ]
+    budget = context_tokens(chunks) // 3
+    assembler = ContextAssembler(ContextConfig(context_budget=budget))
+    packed = assembler.pack(chunks)
+    assert 0 < len(packed) < len(chunks)
+    assert context_tokens(packed) <= budget
+    # the best chunk is always in, passages ordered by episode and position
+    best = max(chunks, key=lambda c: c.score)
+    assert any(
+        c.touches(best) and c.start <= best.start < best.end <= c.end for c in packed
+    )
+    assert packed == sorted(packed, key=lambda c: (c.doc_id, c.start))
+
+    prompt = assembler.assemble("which function?", chunks)
+    assert prompt.chunks == packed and prompt.retrieved == len(chunks)
+    assert prompt.prompt_tokens < prompt.baseline_tokens
+
+
+def test_adjacent_chunks_of_one_episode_are_merged():
+    chunks = [
+        chunk(0, 0, 120, score=0.9),
+        chunk(0, 100, 220, score=0.8),
+        chunk(0, 220, 300, score=0.7),
+        chunk(0, 500, 600, score=0.6),
+        chunk(1, 100, 200, score=0.5),
+    ]
+    packed = ContextAssembler(ContextConfig(context_budget=10_000)).pack(chunks)
+    assert [(c.doc_id, c.start, c.end) for c in packed] == [
+        (0, 0, 300),
+        (0, 500, 600),
+        (1, 100, 200),
+    ]
+    assert packed[0].text == BODIES[0][0:300]
+    assert packed[0].score == 0.9
+
+
+def test_trim_history_drops_the_oldest_turns_first():
+    assembler = ContextAssembler(ContextConfig(history_budget=100, history_keep=0.5))
+    conversation = Conversation()
+    for n in range(6):
+        conversation.add_turn(f"question {n}", " ".join(["answer"] * 20), "")
+    per_turn = conversation.turns[0]["tokens"]
+    assert per_turn * 6 > 100
+
+    assembler.trim_history(conversation)
+    kept = conversation.history()
+    assert sum(t["tokens"] for t in kept) <= 50
+    # a suffix of the turns survives, the newest one included
+    assert kept == conversation.turns[-len(kept) :]
+    assert kept[-1]["question"] == "question 5"
+
+    # under budget again, the history prefix is left alone
+    start = conversation.start
+    conversation.add_turn("question 6", "short", "")
+    assembler.trim_history(conversation)
+    assert conversation.start == start
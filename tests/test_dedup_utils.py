@@ -0,0 +1,74 @@
+import random
+import itertools
+import numpy as np
+
+from src.ETL.ETL_utils.dedup_utils import (
+    lsh_candidate_pairs,
+    make_permutations,
+    minhash_signature,
+    shingle_hashes,
+)
+
+WORDS = [f"w{i}" for i in range(5000)]
+
+
+def signature(text: str, num_perm: int = 128) -> np.ndarray:
+    perm_a, perm_b = make_permutations(num_perm, seed=42)
+    return minhash_signature(shingle_hashes(text), perm_a, perm_b)
+
+
+def brute_force_pairs(signatures: np.ndarray, bands: int) -> set:
+    rows = signatures.shape[1] // bands
+    return {
+        (i, j)
+        for i, j in itertools.combinations(range(len(signatures)), 2)
+        for band in range(bands)
+        if np.array_equal(
+            signatures[i, band * rows : (band + 1) * rows],
+            signatures[j, band * rows : (band + 1) * rows],
+        )
+    }
+
+
+def test_minhash_estimates_jaccard():
+    rng = random.Random(0)
+    words = rng.choices(WORDS, k=3000)
+    # replace every 10th word, about a third of the 3-grams change
+    edited = [rng.choice(WORDS) if i % 10 == 0 else w for i, w in enumerate(words)]
+    a, b = shingle_hashes(" ".join(words)), shingle_hashes(" ".join(edited))
+    jaccard = len(np.intersect1d(a, b)) / len(np.union1d(a, b))
+
+    estimate = (
+        signature(" ".join(words), 256) == signature(" ".join(edited), 256)
+    ).mean()
+    assert abs(estimate - jaccard) < 0.08
+    assert (signature(" ".join(words)) == signature(" ".join(words))).all()
+
+
+def test_lsh_finds_near_duplicates_and_not_unrelated_docs():
+    rng = random.Random(1)
+    originals = [rng.choices(WORDS, k=800) for _ in range(20)]
+    # a lightly edited copy of every original, docs i and i + 20
+    copies = [
+        [rng.choice(WORDS) if rng.random() < 0.03 else w for w in words]
+        for words in originals
+    ]
+    signatures = np.stack([signature(" ".join(w)) for w in originals + copies])
+
+    pairs = {tuple(p) for p in lsh_candidate_pairs(signatures, bands=32).tolist()}
+    assert pairs == {(i, i + 20) for i in range(20)}
+
+
+def test_lsh_pairs_match_brute_force():
+    rng = np.random.default_rng(2)
+    # few distinct values per column so buckets of every size show up
+    signatures = rng.integers(0, 3, size=(60, 16), dtype=np.uint32)
+    pairs = lsh_candidate_pairs(signatures, bands=8, max_bucket=1000)
+    assert {tuple(p) for p in pairs.tolist()} == brute_force_pairs(signatures, 8)
+    assert (pairs[:, 0] < pairs[:, 1]).all()
+
+
+def test_oversized_buckets_are_linked_through_their_first_doc():
+    signatures = np.zeros((10, 4), dtype=np.uint32)
+    pairs = lsh_candidate_pairs(signatures, bands=2, max_bucket=4)
+    assert pairs.tolist() == [[0, j] for j in range(1, 10)]
@@ -0,0 +1,104 @@
+import asyncio
+import httpx
+
+from src.Agent.Agent_config import GatewayConfig
+from src.Agent.Agent_utils import LLMGateway
+
+
+class FakeBackend:
+    """Counts the requests reaching the backend and how many overlap."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.in_flight = self.peak = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        call = self.calls
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.02)
+        self.in_flight -= 1
+        return httpx.Response(
+            200,
+            json={
+                "choices": [
+                    {
+                        "message": {"role": "assistant", "content": str(call)},
+                        "finish_reason": "stop",
+                    }
+                ]
+            },
+        )
+
+
+def gateway_for(backend: FakeBackend, **config) -> LLMGateway:
+    gateway = LLMGateway(GatewayConfig(**config))
+    gateway._client = httpx.AsyncClient(
+        base_url="http://backend", transport=httpx.MockTransport(backend.handler)
+    )
+    gateway._slots = asyncio.Semaphore(gateway.config.max_concurrency)
+    return gateway
+
+
+def ask(question: str) -> list:
+    return [{"role": "user", "content": question}]
+
+
+def test_identical_deterministic_requests_share_one_call():
+    backend = FakeBackend()
+
+    async def main():
+        gateway = gateway_for(backend)
+        replies = await asyncio.gather(*(gateway.complete(ask("hi")) for _ in range(5)))
+        cached = await gateway.complete(ask("hi"))
+        return gateway.stats, replies, cached
+
+    stats, replies, cached = asyncio.run(main())
+    assert backend.calls == 1
+    assert {r["message"]["content"] for r in replies + [cached]} == {"1"}
+    assert (stats["backend"], stats["coalesced"], stats["cache"]) == (1, 4, 1)
+
+
+def test_sampled_requests_are_never_shared():
+    backend = FakeBackend()
+
+    async def main():
+        gateway = gateway_for(backend)
+        replies = await asyncio.gather(
+            *(gateway.complete(ask("hi"), temperature=0.7) for _ in range(3))
+        )
+        await gateway.complete(ask("hi"), temperature=0.7)
+        return gateway.stats, replies
+
+    stats, replies = asyncio.run(main())
+    assert backend.calls == 4
+    assert len({r["message"]["content"] for r in replies}) == 3
+    assert stats["backend"] == 4 and stats["coalesced"] == stats["cache"] == 0
+
+
+def test_cache_evicts_the_least_recently_used():
+    backend = FakeBackend()
+
+    async def main():
+        gateway = gateway_for(backend, cache_size=2)
+        for question in ["a", "b", "a", "c", "a", "b"]:
+            await gateway.complete(ask(question))
+        return gateway.stats
+
+    stats = asyncio.run(main())
+    # `b` was evicted by `c`, `a` stayed as the most recently used
+    assert backend.calls == 4
+    assert stats["cache"] == 2
+
+
+def test_backend_concurrency_is_bounded():
+    backend = FakeBackend()
+
+    async def main():
+        gateway = gateway_for(backend, max_concurrency=2)
+        await asyncio.gather(*(gateway.complete(ask(str(i))) for i in range(6)))
+
+    asyncio.run(main())
+    assert backend.calls == 6
+    assert backend.peak == 2
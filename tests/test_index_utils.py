@@ -0,0 +1,45 @@
+import random
+import numpy as np
+import pytest
+
+from src.Agent.Agent_config import IndexConfig
+from src.Agent.Agent_utils.index_utils import TranscriptIndex, index_terms
+
+WORDS = [f"word{i}" for i in range(300)]
+QUERIES = ["word1 word2 word3", "zebra word17", "word250 word251 word299"]
+
+
+@pytest.fixture
+def built() -> TranscriptIndex:
+    rng = random.Random(0)
+    documents = [
+        {
+            "path": f"ep{i:02d}.txt",
+            "title": f"Episode {i}",
+            "url": f"https://example.com/{i}",
+            "source": "youtube" if i % 2 else "blog",
+            "body": " ".join(rng.choices(WORDS + ["zebra"], k=rng.randint(200, 600))),
+        }
+        for i in range(12)
+    ]
+    return TranscriptIndex.build(documents, IndexConfig())
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_saved_index_scores_like_the_built_one(tmp_path, built, mmap):
+    built.save(str(tmp_path / "index"))
+    loaded = TranscriptIndex.load(str(tmp_path / "index"), IndexConfig(), mmap=mmap)
+    assert all(isinstance(a, np.memmap) == mmap for a in loaded.arrays.values())
+    assert loaded.warm() == built.nbytes == loaded.nbytes
+    assert loaded.live_docs == built.live_docs
+
+    for query in QUERIES:
+        terms = index_terms(query)
+        assert np.array_equal(loaded.lexical_scores(terms), built.lexical_scores(terms))
+        assert np.array_equal(loaded.dense_scores(terms), built.dense_scores(terms))
+        for source in (None, "blog"):
+            expected = built.search(query, k=8, source=source)
+            found = loaded.search(query, k=8, source=source)
+            assert [(c.chunk_id, c.score, c.text, c.url) for c in found] == [
+                (c.chunk_id, c.score, c.text, c.url) for c in expected
+            ]
@@ -0,0 +1,93 @@
+import time
+import functools
+from datetime import timedelta
+import mongomock
+import pytest
+
+from src.Entity.config_entity import MongoDBConfig
+from src.ETL.ETL_config import JobQueueConfig
+from src.ETL.ETL_utils import job_queue_utils
+from src.ETL.ETL_utils.job_queue_utils import JobQueue, LeaseKeeper
+
+LEASE_S = 0.2
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    monkeypatch.setenv("MONGO_DB_URL", "mongodb://localhost:27017")
+    monkeypatch.setattr(
+        job_queue_utils,
+        "MongoClient",
+        functools.partial(mongomock.MongoClient, tz_aware=True),
+    )
+    queue = JobQueue(
+        queue_config=JobQueueConfig(lease_s=LEASE_S, heartbeat_s=0.05),
+        db_config=MongoDBConfig(),
+    )
+    # seeded directly, mongomock cannot run pymongo's bulk `UpdateOne`
+    now = job_queue_utils._now()
+    queue.collection.insert_many(
+        {
+            "_id": f"https://example.com/{i}",
+            "source": "blog",
+            "payload": {"video_url": f"https://example.com/{i}"},
+            "status": "queued",
+            "attempts": 0,
+            "enqueued_at": now,
+            "available_at": now - timedelta(seconds=2 - i),
+        }
+        for i in range(2)
+    )
+    return queue
+
+
+def test_claim_leases_each_job_once(queue):
+    first = queue.claim("a", ["blog"])
+    second = queue.claim("b", ["blog"])
+    assert first["_id"] != second["_id"]
+    assert (first["status"], first["worker"], first["attempts"]) == ("leased", "a", 1)
+    assert queue.claim("c", ["blog"]) is None
+    assert queue.counts(["blog"])["leased"] == 2
+
+
+def test_expired_lease_is_reclaimed_and_stale_owner_cannot_finish(queue):
+    job = queue.claim("a", ["blog"])
+    time.sleep(LEASE_S * 1.5)
+    assert queue.counts(["blog"])["queued"] == 2
+
+    reclaimed = queue.claim("b", ["blog"])
+    assert reclaimed["_id"] == job["_id"]
+    assert (reclaimed["worker"], reclaimed["attempts"]) == ("b", 2)
+
+    # the stale owner wakes up late, its results must not land
+    assert queue.heartbeat([job["_id"]], "a") == [job["_id"]]
+    assert not queue.fail(job, "a", RuntimeError("late"), retry=True)
+    assert not queue.complete(job["_id"], "a")
+    stored = queue.collection.find_one({"_id": job["_id"]})
+    assert (stored["status"], stored["worker"]) == ("leased", "b")
+
+    assert queue.complete(job["_id"], "b")
+    assert queue.collection.find_one({"_id": job["_id"]})["status"] == "done"
+
+
+def test_fail_with_retry_requeues_after_the_delay(queue):
+    job = queue.claim("a", ["blog"])
+    assert queue.fail(job, "a", RuntimeError("timeout"), retry=True, delay_s=LEASE_S)
+    other = queue.claim("a", ["blog"])
+    assert other["_id"] != job["_id"]
+    assert queue.claim("a", ["blog"]) is None
+    assert queue.complete(other["_id"], "a")
+    time.sleep(LEASE_S * 1.5)
+    retried = queue.claim("a", ["blog"])
+    assert (retried["_id"], retried["attempts"]) == (job["_id"], 2)
+
+
+def test_lease_keeper_reports_lost_leases(queue):
+    job = queue.claim("a", ["blog"])
+    with LeaseKeeper(queue, "a", [job["_id"]]) as keeper:
+        time.sleep(LEASE_S * 1.5)
+        # renewed leases are not claimable
+        assert queue.claim("b", ["blog"])["_id"] != job["_id"]
+        queue.collection.update_one({"_id": job["_id"]}, {"$set": {"worker": "b"}})
+        time.sleep(LEASE_S)
+    assert keeper.lost == [job["_id"]]
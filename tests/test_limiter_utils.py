@@ -0,0 +1,86 @@
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from src.ETL.ETL_config import OrchestratorConfig
+from src.ETL.ETL_utils.browser_utils import BrowserPool
+from src.ETL.ETL_utils.limiter_utils import DomainLimiter
+
+INTERVAL = 0.05
+
+
+def make_limiter() -> DomainLimiter:
+    return DomainLimiter(
+        OrchestratorConfig(
+            domain_limits={"csjoseph.life": 2, "default": 1},
+            min_interval={"csjoseph.life": INTERVAL, "default": 0.0},
+        )
+    )
+
+
+class FakeCrawler:
+    def __init__(self) -> None:
+        self.starts = []
+        self.in_flight = self.peak = 0
+        self.crawler_strategy = SimpleNamespace(
+            browser_manager=SimpleNamespace(sessions={})
+        )
+
+    async def arun(self, url, config):
+        self.starts.append(time.monotonic())
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return SimpleNamespace(_results=[url])
+
+
+class FakeRunConfig:
+    def clone(self, **kwargs):
+        return self
+
+
+def test_blog_tabs_go_through_the_domain_gate():
+    limiter = make_limiter()
+    crawler = FakeCrawler()
+    pool = BrowserPool(browser_config=None)
+    pool._crawler = crawler
+    urls = [f"https://csjoseph.life/post-{i}/" for i in range(6)]
+
+    results = asyncio.run(
+        pool.crawl_in_tabs(urls, FakeRunConfig(), tabs=4, limiter=limiter)
+    )
+
+    assert results == urls
+    # 4 tabs, but only the domain's 2 slots fetch at once
+    assert crawler.peak <= 2
+    gaps = [b - a for a, b in zip(crawler.starts, crawler.starts[1:])]
+    assert min(gaps) >= INTERVAL * 0.9
+
+
+def test_threads_and_event_loop_share_the_spacing():
+    limiter = make_limiter()
+    starts = []
+
+    def fetch():
+        with limiter.acquire("https://csjoseph.life/a/"):
+            starts.append(time.monotonic())
+
+    async def fetch_async():
+        async with limiter.acquire_async("https://www.csjoseph.life/b/"):
+            starts.append(time.monotonic())
+
+    async def fetch_all():
+        await asyncio.gather(*(fetch_async() for _ in range(3)))
+
+    threads = [threading.Thread(target=fetch) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    asyncio.run(fetch_all())
+    for thread in threads:
+        thread.join()
+
+    starts.sort()
+    assert len(starts) == 6
+    assert min(b - a for a, b in zip(starts, starts[1:])) >= INTERVAL * 0.9
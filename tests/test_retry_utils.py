@@ -0,0 +1,116 @@
+import json
+import random
+import threading
+from collections import Counter
+from urllib.error import HTTPError
+
+import pytest
+from youtube_transcript_api import TranscriptsDisabled
+
+from src.ETL.ETL_config import RetryConfig
+from src.Exception.exception import CustomException
+from src.ETL.ETL_utils.retry_utils import (
+    DeadLetterQueue,
+    FetchError,
+    backoff_delay,
+    classify_error,
+    run_with_retry,
+)
+
+
+def wrapped(error: BaseException) -> CustomException:
+    try:
+        raise error
+    except Exception as e:
+        try:
+            raise CustomException(e)
+        except CustomException as outer:
+            return CustomException(outer)
+
+
+@pytest.mark.parametrize(
+    "error, kind",
+    [
+        (TimeoutError("slow"), "transient"),
+        (ConnectionError("reset"), "transient"),
+        (FetchError("no response"), "transient"),
+        (FetchError("throttled", 429), "transient"),
+        (FetchError("server", 503), "transient"),
+        (FetchError("gone", 404), "permanent"),
+        (HTTPError("https://x", 500, "boom", None, None), "transient"),
+        (HTTPError("https://x", 403, "no", None, None), "permanent"),
+        (TranscriptsDisabled("abc"), "permanent"),
+        (ValueError("bad schema"), "permanent"),
+    ],
+)
+def test_classify_error_looks_through_custom_exceptions(error, kind):
+    assert classify_error(error) == kind
+    assert classify_error(wrapped(error)) == kind
+
+
+def test_backoff_delay_stays_within_bounds():
+    random.seed(0)
+    for attempt in range(1, 10):
+        cap = min(30.0, 2.0 * 2**attempt)
+        delays = [backoff_delay(attempt, 2.0, 30.0) for _ in range(200)]
+        assert all(0.0 <= d <= cap for d in delays)
+        # full jitter spreads over the whole range
+        assert max(delays) > cap * 0.8 and min(delays) < cap * 0.2
+
+
+def test_dead_letter_round_trip(tmp_path):
+    path = str(tmp_path / "state" / "dead_letter.json")
+    queue = DeadLetterQueue(path=path)
+    payload = {"video_url": "https://x/1", "file_name": "a.txt"}
+    queue.push("blog", "https://x/1", payload, TimeoutError("slow"), "transient", 2)
+    # a second failure of the same item refreshes its entry
+    queue.push("blog", "https://x/1", payload, FetchError("gone", 404), "permanent", 3)
+    queue.push("youtube", "https://y/1", {}, ValueError(), "permanent", 1)
+
+    reloaded = DeadLetterQueue(path=path)
+    assert len(reloaded) == 2
+    [entry] = reloaded.items("blog")
+    assert (entry["payload"], entry["kind"], entry["attempts"]) == (
+        payload,
+        "permanent",
+        3,
+    )
+    assert entry["error"] == "gone"
+    assert reloaded.items("youtube")[0]["error"] == "ValueError"
+
+    reloaded.discard("blog", "https://x/1")
+    with open(path, "r", encoding="utf-8") as f:
+        assert [e["key"] for e in json.load(f)] == ["https://y/1"]
+
+
+def test_run_with_retry_retries_transient_and_dead_letters_the_rest(tmp_path):
+    config = RetryConfig(
+        max_retries=3, base_delay=0.001, max_delay=0.005, max_workers=4
+    )
+    dead_letter = DeadLetterQueue(path=str(tmp_path / "dead_letter.json"))
+    # left over from an earlier run, cleared once the item succeeds
+    dead_letter.push("test", "flaky", {}, TimeoutError(), "transient", 3)
+    calls = Counter()
+    lock = threading.Lock()
+
+    def fetch(url: str) -> None:
+        with lock:
+            calls[url] += 1
+            attempt = calls[url]
+        if url == "flaky" and attempt < 3:
+            raise TimeoutError("slow")
+        if url == "down":
+            raise ConnectionError("reset")
+        if url == "gone":
+            raise FetchError("not found", 404)
+
+    items = [{"url": url} for url in ["ok", "flaky", "down", "gone"]]
+    failed = run_with_retry(fetch, items, "test", "url", dead_letter, config)
+
+    assert sorted(item["url"] for item in failed) == ["down", "gone"]
+    # transient errors use every attempt, permanent ones stop at the first
+    assert calls == {"ok": 1, "flaky": 3, "down": 3, "gone": 1}
+    entries = {e["key"]: e for e in dead_letter.items("test")}
+    assert set(entries) == {"down", "gone"}
+    assert (entries["down"]["kind"], entries["down"]["attempts"]) == ("transient", 3)
+    assert (entries["gone"]["kind"], entries["gone"]["attempts"]) == ("permanent", 1)
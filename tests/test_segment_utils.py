@@ -0,0 +1,147 @@
+import os
+import random
+import pytest
+
+from src.Agent.Agent_config import IndexConfig
+from src.Agent.Agent_utils import IndexManager, content_hash, publish_index
+
+WORDS = [f"word{i}" for i in range(400)]
+QUERIES = [
+    "zebra quokka",
+    "word1 word2 word3",
+    "word17 zebra",
+    "word250 word251 word399",
+    "quokka word5",
+]
+
+
+def make_doc(path: str, body: str) -> dict:
+    return {
+        "path": path,
+        "title": path,
+        "url": f"https://example.com/{path}",
+        "source": "youtube",
+        "body": body,
+        "hash": content_hash(body),
+    }
+
+
+def corpus(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        make_doc(
+            f"ep{i:03d}.txt", " ".join(rng.choices(WORDS, k=rng.randint(200, 900)))
+        )
+        for i in range(n)
+    ]
+
+
+def config_in(tmp_path, name: str) -> IndexConfig:
+    index_config = IndexConfig(gc_grace_s=0.0)
+    index_config.segment_dir = str(tmp_path / name / "segments")
+    index_config.manifest_path = str(tmp_path / name / "manifest.json")
+    return index_config
+
+
+def ranking(index_config: IndexConfig, query: str, k: int = 20) -> list:
+    manager = IndexManager(index_config)
+    manager.refresh()
+    with manager.acquire() as index:
+        return [(c.url, c.start) for c in index.search(query, k=k)]
+
+
+def scored(index_config: IndexConfig, query: str) -> list:
+    """Every candidate with its fused score, equal scores in a fixed order."""
+    manager = IndexManager(index_config)
+    manager.refresh()
+    with manager.acquire() as index:
+        chunks = index.search(query, k=1000)
+    return sorted(((-c.score, c.url, c.start) for c in chunks))
+
+
+def test_segmented_ranking_matches_compacted(tmp_path):
+    documents = corpus(40)
+    # one small segment holding the only episode about the query
+    new_doc = make_doc("new.txt", "zebra quokka " * 20 + " ".join(WORDS[:40]))
+
+    segmented = config_in(tmp_path, "segmented")
+    publish_index(documents[:25], segmented)
+    publish_index(documents, segmented)
+    manifest = publish_index(documents + [new_doc], segmented)
+    assert len(manifest["segments"]) == 3
+
+    compacted = config_in(tmp_path, "compacted")
+    publish_index(documents + [new_doc], compacted, full=True)
+
+    assert ranking(segmented, "zebra quokka")[0][0] == new_doc["url"]
+    for query in QUERIES:
+        assert scored(segmented, query) == scored(compacted, query)
+
+
+def test_changed_and_removed_documents_are_replaced(tmp_path):
+    documents = corpus(20, seed=1)
+    segmented = config_in(tmp_path, "segmented")
+    publish_index(documents, segmented)
+
+    # re-extracted transcript and one that became a near duplicate
+    documents[3] = make_doc(documents[3]["path"], "zebra quokka " * 30)
+    removed = documents.pop(7)
+    manifest = publish_index(documents, segmented)
+    assert manifest["deleted"] == {manifest["segments"][0]: [3, 7]}
+    assert removed["path"] not in manifest["files"]
+
+    top = ranking(segmented, "zebra quokka")
+    assert top[0][0] == documents[3]["url"]
+    assert len(top) == len(set(top))
+    assert all(url != removed["url"] for url, _ in ranking(segmented, "word1 word2"))
+
+    compacted = config_in(tmp_path, "compacted")
+    publish_index(documents, compacted, full=True)
+    for query in QUERIES:
+        assert scored(segmented, query) == scored(compacted, query)
+
+    # nothing changed, nothing published
+    assert publish_index(documents, segmented)["version"] == manifest["version"]
+
+
+def test_segment_without_live_documents_is_dropped(tmp_path):
+    documents = corpus(10, seed=2)
+    segmented = config_in(tmp_path, "segmented")
+    publish_index(documents[:8], segmented)
+    first = publish_index(documents, segmented)["segments"]
+    manifest = publish_index(documents[:8], segmented)
+    assert manifest["segments"] == first[:1]
+    assert manifest["deleted"] == {}
+
+
+@pytest.mark.parametrize("full", [False, True])
+def test_legacy_manifest_is_compacted(tmp_path, full):
+    documents = corpus(6, seed=3)
+    segmented = config_in(tmp_path, "segmented")
+    manifest = publish_index(documents, segmented)
+    legacy = {k: v for k, v in manifest.items() if k not in ("files", "deleted")}
+    from src.Agent.Agent_utils.segment_utils import write_manifest
+
+    write_manifest(segmented.manifest_path, legacy)
+    manifest = publish_index(documents, segmented, full=full)
+    assert len(manifest["segments"]) == 1
+    assert manifest["segments"] != legacy["segments"]
+    assert len(manifest["files"]) == len(documents)
+
+
+def test_reset_index_with_lower_version_is_picked_up(tmp_path):
+    documents = corpus(8, seed=4)
+    segmented = config_in(tmp_path, "segmented")
+    publish_index(documents[:4], segmented)
+    publish_index(documents, segmented)
+    manager = IndexManager(segmented)
+    assert manager.refresh() and manager.version == 2
+    assert not manager.refresh()
+
+    # index wiped and rebuilt from scratch, its version starts over
+    os.remove(segmented.manifest_path)
+    rebuilt = [make_doc("reset.txt", "zebra quokka " * 20)]
+    assert publish_index(rebuilt, segmented)["version"] == 1
+    assert manager.refresh() and manager.version == 1
+    with manager.acquire() as index:
+        assert [c.url for c in index.search("zebra quokka", k=5)] == [rebuilt[0]["url"]]
@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.Entity.transcript_entity import CompactTranscript, TranscriptChunk
+
+SNIPPETS = [
+    SimpleNamespace(text="hello there", start=0.0, duration=1.5),
+    SimpleNamespace(text="two\nlines", start=1.5, duration=2.0),
+    SimpleNamespace(text="", start=3.5, duration=0.5),
+    SimpleNamespace(text="last one", start=90.25, duration=4.0),
+]
+
+
+@pytest.fixture
+def transcript() -> CompactTranscript:
+    return CompactTranscript.from_snippets(SNIPPETS)
+
+
+def test_snippets_round_trip(transcript):
+    assert transcript.text == "hello there\ntwo lines\n\nlast one"
+    assert len(transcript) == 4
+    assert [transcript.snippet(i) for i in range(4)] == [
+        ("hello there", 0.0, 1.5),
+        ("two lines", 1.5, 2.0),
+        ("", 3.5, 0.5),
+        ("last one", 90.25, 4.0),
+    ]
+    assert transcript.offsets.dtype == np.int32
+    assert transcript.starts.dtype == transcript.durations.dtype == np.float32
+
+
+def test_time_at_snippet_edges(transcript):
+    offsets = transcript.offsets
+    # first character of each snippet starts it
+    assert [transcript.time_at(int(o)) for o in offsets[:-1]] == [0.0, 1.5, 3.5, 90.25]
+    # the joining newline still belongs to the snippet before it
+    assert transcript.time_at(int(offsets[1]) - 1) == 0.0
+    assert transcript.time_at(int(offsets[3]) - 1) == 3.5
+    # out of range positions clamp to the first / last snippet
+    assert transcript.time_at(-5) == 0.0
+    assert transcript.time_at(len(transcript.text) + 10) == 90.25
+
+
+def test_deep_link_keeps_the_video_and_replaces_the_time():
+    link = CompactTranscript.deep_link("https://www.youtube.com/watch?v=abc&t=5s", 90.9)
+    assert link == "https://www.youtube.com/watch?v=abc&t=90s"
+
+
+def test_sidecar_save_and_load(tmp_path, transcript):
+    path = str(tmp_path / "S01E01-Title.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"S01E01-Title\n\nhttps://youtu.be/abc\n\n{transcript.text}")
+    transcript.save_arrays(path)
+
+    assert CompactTranscript.sidecar_path(path) == str(tmp_path / "S01E01-Title.npz")
+    loaded = CompactTranscript.load(path)
+    assert loaded.text == transcript.text
+    for name in ("offsets", "starts", "durations"):
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(transcript, name))
+    assert loaded.time_at(int(loaded.offsets[3])) == 90.25
+
+
+BODY = "".join(chr(ord("a") + i % 26) for i in range(100))
+
+
+def chunk(start: int, end: int, **kwargs) -> TranscriptChunk:
+    return TranscriptChunk(
+        chunk_id=start, doc_id=0, start=start, end=end, text=BODY[start:end], **kwargs
+    )
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [((0, 40), (30, 70)), ((0, 40), (40, 70)), ((10, 80), (20, 50))],
+    ids=["overlap", "meet", "contained"],
+)
+def test_merge_keeps_shared_text_once(a, b):
+    first = chunk(*a, score=0.2, start_s=12.0, url="https://youtu.be/abc")
+    second = chunk(*b, score=0.5, start_s=30.0)
+    for merged in (first.merge(second), second.merge(first)):
+        assert (merged.start, merged.end) == (a[0], max(a[1], b[1]))
+        assert merged.text == BODY[merged.start : merged.end]
+        assert merged.score == 0.5
+        # the merged passage starts where the earlier chunk does
+        assert merged.start_s == 12.0
+        assert merged.link == "https://youtu.be/abc?t=12s"
+
+
+def test_touches_needs_the_same_episode_and_overlapping_ranges():
+    assert chunk(0, 40).touches(chunk(40, 70))
+    assert not chunk(0, 40).touches(chunk(41, 70))
+    other_doc = chunk(30, 70)
+    other_doc.doc_id = 1
+    assert not chunk(0, 40).touches(other_doc)
+    assert chunk(0, 10).link == ""
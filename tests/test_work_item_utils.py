@@ -0,0 +1,43 @@
+import pandas as pd
+
+from src.ETL.ETL_utils.work_item_utils import build_work_items, drop_local_duplicates
+
+SEASON = "https://csjoseph.life/season-1/"
+METADATA = pd.DataFrame({"URL": [SEASON], "KEY": ["B01"], "NAME": ["Blog 1"]})
+
+
+def blog_items(articles: list) -> pd.DataFrame:
+    # newest first, like the pagination crawl and the watermarks
+    return build_work_items(
+        data={
+            "base_url": [SEASON],
+            "video_name": [[name for name, _ in articles]],
+            "video_link": [[link for _, link in articles]],
+        },
+        source="blog",
+        season_col="base_url",
+        name_col="video_name",
+        link_col="video_link",
+        metadata=METADATA,
+    )
+
+
+def test_oldest_blog_article_is_episode_one():
+    items = blog_items([["Newer", "https://x/2"], ["Older", "https://x/1"]])
+    names = dict(zip(items["video_url"], items["file_name"]))
+    assert names["https://x/1"] == "B01E01-Older | CS Joseph.txt"
+    assert names["https://x/2"] == "B01E02-Newer | CS Joseph.txt"
+
+
+def test_new_article_keeps_existing_file_names():
+    known = [[f"Article {i}", f"https://x/{i}"] for i in range(3, 0, -1)]
+    first = blog_items(known)
+    second = blog_items([["Article 4", "https://x/4"], *known])
+
+    before = dict(zip(first["video_url"], first["file_name"]))
+    after = dict(zip(second["video_url"], second["file_name"]))
+    assert {url: after[url] for url in before} == before
+
+    # only the new article is left to scrape once the first run's files exist
+    remaining = drop_local_duplicates(second, list(first["file_name"]))
+    assert list(remaining["video_url"]) == ["https://x/4"]